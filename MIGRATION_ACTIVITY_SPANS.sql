@@ -0,0 +1,11 @@
+-- Migration: Add duration_seconds column to activity table
+-- Run this on existing databases
+
+-- Agents roll up long offline backlogs into spans longer than one minute
+ALTER TABLE `activity` ADD COLUMN IF NOT EXISTS `duration_seconds` INT NOT NULL DEFAULT 60 AFTER `end_time`;
+
+-- Existing rows are minute windows; take the duration from their bounds
+UPDATE `activity` SET `duration_seconds` = GREATEST(TIMESTAMPDIFF(SECOND, `start_time`, `end_time`), 0)
+WHERE `duration_seconds` = 60 AND TIMESTAMPDIFF(SECOND, `start_time`, `end_time`) <> 60;
+
+SELECT 'Migration completed: activity duration_seconds column added' AS status;
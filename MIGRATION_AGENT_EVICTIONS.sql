@@ -0,0 +1,18 @@
+-- Migration: Add agent_evictions table
+-- Run this on existing databases
+
+-- Data shed by agents to stay within their offline disk budget (reported on sync)
+CREATE TABLE IF NOT EXISTS `agent_evictions` (
+  `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
+  `user_id` INT NULL,
+  `machine_id` INT NOT NULL,
+  `stream` VARCHAR(50) NOT NULL,
+  `items` INT NOT NULL DEFAULT 0,
+  `bytes` BIGINT NOT NULL DEFAULT 0,
+  `reported_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX `idx_machine_time` (`machine_id`, `reported_at`),
+  CONSTRAINT `fk_evictions_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE SET NULL,
+  CONSTRAINT `fk_evictions_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+SELECT 'Migration completed: agent_evictions table added' AS status;
@@ -0,0 +1,24 @@
+-- Migration: Add client ids for idempotent agent ingest
+-- Run this on existing databases
+
+-- Agents tag every row with a client-generated UUID; a resent row is skipped instead of inserted twice.
+-- Rows from older agents keep NULL, which the unique keys allow any number of times.
+ALTER TABLE `activity` ADD COLUMN IF NOT EXISTS `client_uid` CHAR(36) NULL AFTER `machine_id`;
+ALTER TABLE `activity` ADD UNIQUE KEY IF NOT EXISTS `uniq_activity_client_uid` (`client_uid`);
+
+ALTER TABLE `screenshots` ADD COLUMN IF NOT EXISTS `client_uid` CHAR(36) NULL AFTER `machine_id`;
+ALTER TABLE `screenshots` ADD UNIQUE KEY IF NOT EXISTS `uniq_screenshots_client_uid` (`client_uid`);
+
+ALTER TABLE `application_usage` ADD COLUMN IF NOT EXISTS `client_uid` CHAR(36) NULL AFTER `application_id`;
+ALTER TABLE `application_usage` ADD UNIQUE KEY IF NOT EXISTS `uniq_app_usage_client_uid` (`client_uid`);
+
+-- Ingest batches already received, by the agent's client-generated batch id
+CREATE TABLE IF NOT EXISTS `agent_batches` (
+  `batch_id` CHAR(36) NOT NULL PRIMARY KEY,
+  `machine_id` INT NOT NULL,
+  `received_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX `idx_received` (`received_at`),
+  CONSTRAINT `fk_batches_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+SELECT 'Migration completed: client ids for idempotent ingest added' AS status;
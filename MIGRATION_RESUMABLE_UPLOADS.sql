@@ -0,0 +1,17 @@
+-- Migration: Add resumable screenshot uploads
+-- Run this on existing databases
+
+-- Large screenshots arriving in parts through api/screenshot_parts.php, by the agent's client uid
+CREATE TABLE IF NOT EXISTS `screenshot_uploads` (
+  `client_uid` CHAR(36) NOT NULL PRIMARY KEY,
+  `machine_id` INT NOT NULL,
+  `filename` VARCHAR(255) NOT NULL,
+  `taken_at` DATETIME NOT NULL,
+  `total_bytes` INT UNSIGNED NOT NULL,
+  `received_bytes` INT UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX `idx_updated` (`updated_at`),
+  CONSTRAINT `fk_uploads_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+SELECT 'Migration completed: screenshot_uploads added' AS status;
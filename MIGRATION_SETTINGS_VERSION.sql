@@ -0,0 +1,10 @@
+-- Migration: Add versioned agent settings
+-- Run this on existing databases
+
+-- Bumped by settings.php on every save; ingest only resends settings to agents on an older revision
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('settings_revision', '1');
+
+-- Settings version each agent reported as applied on its last sync
+ALTER TABLE `machines` ADD COLUMN IF NOT EXISTS `settings_version` VARCHAR(32) NULL AFTER `last_seen`;
+
+SELECT 'Migration completed: settings_revision and machines.settings_version added' AS status;
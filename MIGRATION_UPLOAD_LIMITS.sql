@@ -0,0 +1,14 @@
+-- Migration: Add upload bandwidth limits and bulk upload windows
+-- Run this on existing databases
+
+-- Defaults for every agent (0 / empty = unlimited, any time)
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('upload_rate_kb_s', '0');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('upload_burst_kb', '0');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('bulk_upload_window', '');
+
+-- Per-machine overrides; NULL uses the default above
+ALTER TABLE `machines` ADD COLUMN IF NOT EXISTS `upload_rate_kb_s` INT UNSIGNED NULL AFTER `settings_version`;
+ALTER TABLE `machines` ADD COLUMN IF NOT EXISTS `upload_burst_kb` INT UNSIGNED NULL AFTER `upload_rate_kb_s`;
+ALTER TABLE `machines` ADD COLUMN IF NOT EXISTS `bulk_upload_window` VARCHAR(64) NULL AFTER `upload_burst_kb`;
+
+SELECT 'Migration completed: upload bandwidth limits added' AS status;
@@ -0,0 +1,114 @@
+"""
+Activity Writer Module for TrackerV3 Agent
+Buffers minute activity records and group-commits them to agent.db
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import ACTIVITY_FLUSH_ROWS, ACTIVITY_MAX_DELAY
+    from .store import get_store
+except ImportError:
+    from config import ACTIVITY_FLUSH_ROWS, ACTIVITY_MAX_DELAY
+    from store import get_store
+
+log = logging.getLogger('tracker_agent.activity_writer')
+
+_INSERT_SQL = (
+    'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses) '
+    'VALUES (?,?,?,?,?,?,?)'
+)
+
+
+class ActivityWriter:
+    """Holds activity records in memory and writes them in one transaction.
+
+    A flush happens when `max_rows` records are pending or the oldest pending
+    record has waited `max_delay` seconds (the maximum durability window), and
+    on shutdown via flush(). Records are keyed by their minute window so only
+    one row per real minute ever reaches the table.
+    """
+
+    def __init__(self, store=None, max_rows=None, max_delay=None):
+        self.store = store or get_store()
+        self.max_rows = max(1, int(max_rows if max_rows is not None else ACTIVITY_FLUSH_ROWS))
+        self.max_delay = max(0, int(max_delay if max_delay is not None else ACTIVITY_MAX_DELAY))
+        self._pending = OrderedDict()
+        self._oldest = None
+        self._last_minute = None
+        self._last_flushed_start = None
+        self._lock = threading.Lock()
+        log.info('ActivityWriter initialized (flush at %d rows or %ds)', self.max_rows, self.max_delay)
+
+    def minute_due(self, now=None):
+        """Return True once per wall-clock minute, when a new minute boundary is crossed.
+
+        The first call only records the current minute so the partial minute the
+        agent started in is not reported as a full one.
+        """
+        minute = int((now if now is not None else time.time()) // 60)
+        if self._last_minute is None:
+            self._last_minute = minute
+            return False
+        if minute == self._last_minute:
+            return False
+        self._last_minute = minute
+        return True
+
+    def add(self, record):
+        """Buffer one minute record; a second record for the same minute is merged into the first."""
+        key = record['start_time']
+        with self._lock:
+            if self._last_flushed_start is not None and key <= self._last_flushed_start:
+                log.debug('Dropping activity for already written minute %s', key)
+                return
+            existing = self._pending.get(key)
+            if existing is None:
+                self._pending[key] = dict(record)
+            else:
+                existing['mouse_moves'] += record['mouse_moves']
+                existing['key_presses'] += record['key_presses']
+                existing['idle_seconds'] = min(existing['idle_seconds'], record['idle_seconds'])
+                existing['productive_seconds'] = max(existing['productive_seconds'], record['productive_seconds'])
+                existing['unproductive_seconds'] = max(existing['unproductive_seconds'], record['unproductive_seconds'])
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def maybe_flush(self):
+        """Flush if the size or time threshold has been reached. Returns rows written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            due = (len(self._pending) >= self.max_rows
+                   or time.monotonic() - self._oldest >= self.max_delay)
+        return self.flush() if due else 0
+
+    def flush(self):
+        """Write every pending record in a single transaction. Returns rows written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            records = list(self._pending.values())
+            rows = [
+                (r['start_time'], r['end_time'], r['productive_seconds'], r['unproductive_seconds'],
+                 r['idle_seconds'], r['mouse_moves'], r['key_presses'])
+                for r in records
+            ]
+            try:
+                self.store.executemany(_INSERT_SQL, rows)
+            except Exception as e:
+                # Keep the records buffered; the next threshold check retries
+                log.warning('Activity flush failed (%d rows kept in memory): %s', len(rows), e)
+                return 0
+            self._last_flushed_start = max(self._pending)
+            self._pending.clear()
+            self._oldest = None
+        log.debug('Flushed %d activity rows (%s -> %s)', len(rows), rows[0][0], rows[-1][1])
+        return len(rows)
@@ -4,9 +4,11 @@ Refactored to use modular structure
 """
 import os
 import sys
+import io
+import json
 import time
-import base64
-import sqlite3
+import calendar
+import functools
 import threading
 from datetime import datetime, timedelta
 import logging
@@ -28,7 +30,6 @@ try:
         _HAS_MSS = False
     from PIL import ImageGrab, Image
     import requests
-    from concurrent.futures import ThreadPoolExecutor, as_completed
 except Exception as e:
     print("Missing dependencies: psutil, pynput, pillow, requests")
     print("Install with: pip install psutil pynput pillow requests")
@@ -37,10 +38,32 @@ except Exception as e:
 # Import modules
 try:
     from config import (
-        DB_PATH, SCREEN_DIR, LOG_PATH, INGEST_URL,
-        USERNAME, MACHINE_ID, HOSTNAME, SERVER_BASE
+        DB_PATH, SCREEN_DIR, LOG_PATH, INGEST_URL, SCREENSHOT_UPLOAD_URL, SCREENSHOT_PARTS_URL, PARALLEL_WORKERS,
+        USERNAME, MACHINE_ID, HOSTNAME, SERVER_BASE, STORAGE_CHECK_INTERVAL
     )
-    from config import update_from_server_response
+    from config import update_from_server_response, get_settings_version
+    from store import get_store, close_store
+    from activity_writer import ActivityWriter
+    import outbox
+    import sync_queue
+    import storage_governor
+    import compaction
+    import screenshot_store
+    import http_client
+    import http_compression
+    import resilience
+    import sync_tuning
+    import sync_worker
+    import upload_engine
+    import partition
+    import streaming
+    import sync_lanes
+    import bandwidth
+    import degradation
+    import resumable_upload
+    from client_ids import row_uid, batch_uid
+    import schema
+    from schema import utc_text
     import monitoring
     import permission
     import browser_monitoring
@@ -77,37 +100,47 @@ def setup_logging():
 
 log = setup_logging()
 
+# Upload queues over the local tables (created by init_db)
+_activity_queue = None
+_screenshot_queue = None
+_storage_governor = None
+_sync_tuner = None
+_degradation = None
+
+
+def configured_workers():
+    """parallel_sync_workers as last set by the server (1..10)"""
+    try:
+        workers = int(os.environ.get('TRACKER_PARALLEL_WORKERS', str(PARALLEL_WORKERS)))
+    except ValueError:
+        workers = PARALLEL_WORKERS
+    return min(max(workers, 1), 10)
+
+
+def sync_interval():
+    """Seconds between syncs, as last set by the server (TRACKER_SYNC_INTERVAL)"""
+    value = os.environ.get('TRACKER_SYNC_INTERVAL')
+    return int(value) if (value and value.isdigit()) else 10
+
+
+def storage_maintenance():
+    """Roll up a large activity backlog, keep the offline backlog within its disk budget and
+    adjust collection fidelity to the backlog"""
+    compaction.maybe_compact(_activity_queue)
+    _storage_governor.enforce()
+    resumable_upload.prune()
+    _degradation.update()
+
 
 def init_db():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS activity (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            start_time TEXT NOT NULL,
-            end_time TEXT NOT NULL,
-            productive_seconds INTEGER NOT NULL,
-            unproductive_seconds INTEGER NOT NULL,
-            idle_seconds INTEGER NOT NULL,
-            mouse_moves INTEGER NOT NULL,
-            key_presses INTEGER NOT NULL,
-            synced INTEGER NOT NULL DEFAULT 0
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS screenshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            taken_at TEXT NOT NULL,
-            filename TEXT NOT NULL,
-            synced INTEGER NOT NULL DEFAULT 0
-        )
-        """
-    )
-    con.commit()
-    con.close()
+    global _activity_queue, _screenshot_queue, _storage_governor, _sync_tuner, _degradation
+    schema.migrate(get_store())
+    _activity_queue = sync_queue.StreamQueue('activity', ('start_time', 'end_time', 'productive_seconds', 'unproductive_seconds', 'idle_seconds', 'mouse_moves', 'key_presses'))
+    _screenshot_queue = sync_queue.StreamQueue('screenshots', screenshot_store.QUEUE_COLUMNS)
+    _storage_governor = storage_governor.StorageGovernor(_activity_queue, _screenshot_queue)
+    _degradation = degradation.DegradationController(_activity_queue, _screenshot_queue)
+    screenshot_store.reconcile(_screenshot_queue)
+    _sync_tuner = sync_tuning.SyncTuner(configured_workers())
     log.info('Database initialized at %s', DB_PATH)
 
 
@@ -137,8 +170,9 @@ class ActivityTracker:
             self.key_presses += 1
             self.last_input_time = time.time()
 
-    def collect_minute(self):
-        now = datetime.utcnow()
+    def collect_minute(self, end=None):
+        """Close the minute window ending at `end` (default: the current UTC minute boundary)"""
+        now = end or datetime.utcnow().replace(second=0, microsecond=0)
         start = now - timedelta(minutes=1)
         with self.lock:
             mouse_moves = self.mouse_moves
@@ -155,8 +189,8 @@ class ActivityTracker:
         unproductive_seconds = 0
 
         record = {
-            'start_time': start.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'start_time': int(calendar.timegm(start.timetuple())),
+            'end_time': int(calendar.timegm(now.timetuple())),
             'productive_seconds': productive_seconds,
             'unproductive_seconds': unproductive_seconds,
             'idle_seconds': idle_seconds,
@@ -168,32 +202,16 @@ class ActivityTracker:
         return record
 
 
-def save_activity_local(record):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute(
-        'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses, synced) VALUES (?,?,?,?,?,?,?,0)',
-        (
-            record['start_time'], record['end_time'],
-            record['productive_seconds'], record['unproductive_seconds'],
-            record['idle_seconds'], record['mouse_moves'], record['key_presses']
-        )
-    )
-    con.commit()
-    con.close()
-    log.debug('Saved activity locally: %s -> %s', record['start_time'], record['end_time'])
-
-
 def capture_screenshot():
     now = datetime.utcnow()
     # Choose format and quality via env vars (defaults: JPEG, quality 40)
     fmt = os.environ.get('TRACKER_SCREENSHOT_FORMAT', 'JPEG').upper()
-    quality = int(os.environ.get('TRACKER_SCREENSHOT_QUALITY', '40'))
+    # Lowered while a sync backlog builds up (see degradation.py)
+    quality = _degradation.screenshot_quality(int(os.environ.get('TRACKER_SCREENSHOT_QUALITY', '40')))
     if fmt not in ('JPEG', 'WEBP', 'PNG'):
         fmt = 'JPEG'
     ext = 'jpg' if fmt == 'JPEG' else ('webp' if fmt == 'WEBP' else 'png')
     fname = now.strftime(f'sc_%Y%m%d_%H%M%S.{ext}')
-    path = os.path.join(SCREEN_DIR, fname)
 
     try:
         if _HAS_MSS:
@@ -204,6 +222,9 @@ def capture_screenshot():
                 img = Image.frombytes('RGB', frame.size, frame.rgb)
         else:
             img = ImageGrab.grab().convert('RGB')
+        scale = _degradation.screenshot_scale()
+        if scale < 1:
+            img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))))
 
         save_kwargs = {}
         if fmt in ('JPEG', 'WEBP'):
@@ -213,67 +234,67 @@ def capture_screenshot():
             if fmt == 'WEBP':
                 save_kwargs.update({'quality': quality})
 
-        img.save(path, format=fmt, **save_kwargs)
-
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute('INSERT INTO screenshots (taken_at, filename, synced) VALUES (?,?,0)', (now.strftime('%Y-%m-%d %H:%M:%S'), fname))
-        con.commit()
-        con.close()
-        try:
-            size_kb = int(os.path.getsize(path) / 1024)
-        except Exception:
-            size_kb = -1
+        buf = io.BytesIO()
+        img.save(buf, format=fmt, **save_kwargs)
+        data = buf.getvalue()
+        screenshot_store.get_packs().add(data, fname, calendar.timegm(now.timetuple()))
+        size_kb = int(len(data) / 1024)
         log.info('Captured screenshot %s (%s KB) using %s', fname, size_kb, 'mss' if _HAS_MSS else 'ImageGrab')
     except Exception as e:
         log.warning('Screenshot capture failed: %s', e)
 
 
-def load_unsynced():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute('SELECT id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses FROM activity WHERE synced = 0 ORDER BY id ASC LIMIT 500')
-    acts = cur.fetchall()
-    cur.execute('SELECT id, taken_at, filename FROM screenshots WHERE synced = 0 ORDER BY id ASC LIMIT 50')
-    shots = cur.fetchall()
-    con.close()
-    log.debug('Loaded unsynced: %d activity, %d screenshots', len(acts), len(shots))
+def load_unsynced(workers=1):
+    # Enough for one round: `workers` chunks of the current (adaptive) batch sizes
+    acts = _activity_queue.peek(_sync_tuner.activity_rows.value * workers)
+    shots = _screenshot_queue.peek(_sync_tuner.screenshots.value * workers)
+    log.debug('Loaded unsynced: %d activity, %d screenshots (%s)', len(acts), len(shots), _sync_tuner.summary())
     return acts, shots
 
 
 def mark_synced_and_cleanup(activity_ids, screenshot_items, delete_screenshots=True):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    # Delete activity rows
-    if activity_ids:
-        q = 'DELETE FROM activity WHERE id IN ({})'.format(','.join('?' * len(activity_ids)))
-        cur.execute(q, activity_ids)
-    # Delete screenshot rows and files
-    if screenshot_items:
-        shot_ids = [str(i[0]) for i in screenshot_items]
-        q = 'DELETE FROM screenshots WHERE id IN ({})'.format(','.join('?' * len(shot_ids)))
-        cur.execute(q, shot_ids)
-    con.commit()
-    con.close()
-    # Remove files on disk if configured
-    removed = 0
-    if delete_screenshots:
-        for rid, filename in screenshot_items:
-            path = os.path.join(SCREEN_DIR, filename)
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    removed += 1
-            except Exception as e:
-                log.debug('Failed to remove %s: %s', path, e)
-    log.info('Cleanup done: deleted %d activity rows, %d screenshots (%d files removed)', len(activity_ids), len(screenshot_items), removed)
+    # Delete acknowledged rows (contiguous id ranges) and advance each queue's watermark
+    _activity_queue.ack(activity_ids)
+    _screenshot_queue.ack([i[0] for i in screenshot_items])
+    # Remove files and fully acknowledged pack segments (keeping copies if configured)
+    removed = screenshot_store.release(screenshot_items, delete_screenshots)
+    log.info('Cleanup done: deleted %d activity rows, %d screenshots (%d files/segments removed)', len(activity_ids), len(screenshot_items), removed)
+
+
+def _sent_bytes(resp):
+    body = getattr(getattr(resp, 'request', None), 'body', None)
+    try:
+        return len(body)  # bytes, or a streamed body with a known length
+    except TypeError:
+        return 0
 
 
 def sync_chunk(payload_chunk, delete_screenshots=True):
     """Sync a single chunk of data. Returns (success: bool, activity_ids: list, screenshot_items: list, server_response: dict)"""
+    rows = len(payload_chunk.get('activity', []))
+    started = time.monotonic()
+    try:
+        result = _post_chunk(payload_chunk, delete_screenshots)
+    except resilience.CircuitOpenError as e:
+        # Nothing was sent, so there is no round trip to learn from
+        log.debug('Sync chunk deferred: %s', e)
+        return (False, [], [], {})
+    elapsed = time.monotonic() - started
+    log.debug('Sync chunk round trip: %d activity rows in %.2fs', rows, elapsed)
+    # Only a full chunk says anything about whether a bigger one would fit
+    _sync_tuner.activity_rows.record(result[0], elapsed, saturated=rows >= _sync_tuner.activity_rows.value)
+    return result
+
+
+def _post_chunk(payload_chunk, delete_screenshots):
     try:
         log.debug('Syncing chunk: %d activity, %d screenshots', len(payload_chunk.get('activity', [])), len(payload_chunk.get('screenshots', [])))
-        resp = requests.post(INGEST_URL, json=payload_chunk, timeout=30)
+        # From here on the server may commit these rows even if the response is lost
+        _activity_queue.mark_sent(payload_chunk.get('_activity_ids', []))
+        resp = http_compression.post_payload(INGEST_URL, payload_chunk)
+        sent = _sent_bytes(resp)
+        log.debug('Sync chunk: %d bytes, HTTP %s', sent, resp.status_code)
+        _sync_tuner.record_request_bytes(len(payload_chunk.get('activity', [])), sent)
         status = resp.status_code
         if status == 200:
             try:
@@ -281,6 +302,10 @@ def sync_chunk(payload_chunk, delete_screenshots=True):
             except Exception:
                 jr = {}
             if isinstance(jr, dict) and jr.get('status') == 'ok':
+                if jr.get('duplicate_batch'):
+                    log.info('Sync chunk: server already had this batch from an earlier attempt')
+                elif jr.get('duplicates'):
+                    log.info('Sync chunk: server already had %s row(s) from an earlier attempt', jr.get('duplicates'))
                 act_ids = payload_chunk.get('_activity_ids', [])
                 shot_items = payload_chunk.get('_screenshot_items', [])
                 jr['_delete_screenshots'] = delete_screenshots
@@ -291,131 +316,288 @@ def sync_chunk(payload_chunk, delete_screenshots=True):
         else:
             log.warning('Sync chunk failed: HTTP %s', status)
             return (False, [], [], {})
+    except resilience.CircuitOpenError:
+        raise
     except Exception as e:
         log.warning('Sync chunk error: %s', e)
         return (False, [], [], {})
 
 
+_IMAGE_TYPES = {'.jpg': 'image/jpeg', '.webp': 'image/webp', '.png': 'image/png'}
+
+
+def sync_screenshot_batch(rows):
+    """Upload one batch of screenshots as raw multipart file parts (no base64).
+    Returns (success: bool, stored rows, ids of rows whose data is gone)"""
+    files = []
+    meta = []
+    sent = []
+    unreadable = []
+    for row in rows:
+        rid, taken_at, filename = row[:3]
+        size = screenshot_store.size(row)
+        if not size:
+            unreadable.append(rid)
+            continue
+        content_type = _IMAGE_TYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+        # Read from the pack only when the request body reaches this file
+        files.append(('screenshots[]', filename, content_type, size, functools.partial(screenshot_store.read, row)))
+        meta.append({'client_uid': row_uid('screenshot', rid), 'filename': filename, 'taken_at': utc_text(taken_at)})
+        sent.append(row)
+    if not sent:
+        return (True, [], unreadable)
+    body = streaming.MultipartBody([
+        ('username', USERNAME),
+        ('machine_id', MACHINE_ID),
+        ('hostname', HOSTNAME),
+        ('meta', json.dumps(meta, separators=(',', ':'))),
+    ], files)
+    started = time.monotonic()
+    try:
+        ok, stored = _post_screenshots(body, sent)
+    except resilience.CircuitOpenError as e:
+        log.debug('Screenshot upload deferred: %s', e)
+        return (False, [], unreadable)
+    elapsed = time.monotonic() - started
+    _sync_tuner.screenshots.record(ok, elapsed, saturated=len(rows) >= _sync_tuner.screenshots.value)
+    return (ok, stored, unreadable)
+
+
+def _post_screenshots(body, sent):
+    try:
+        resp = http_client.post(SCREENSHOT_UPLOAD_URL, data=body, headers={'Content-Type': body.content_type})
+        log.debug('Screenshot upload: %d bytes, HTTP %s', _sent_bytes(resp), resp.status_code)
+        if resp.status_code != 200:
+            log.warning('Screenshot upload failed: HTTP %s', resp.status_code)
+            return (False, [])
+        jr = resp.json()
+        if not isinstance(jr, dict) or jr.get('status') != 'ok':
+            log.warning('Screenshot upload failed: unexpected JSON response')
+            return (False, [])
+        stored = [sent[i] for i in jr.get('stored', []) if isinstance(i, int) and 0 <= i < len(sent)]
+        if len(stored) < len(sent):
+            log.warning('Screenshot upload: server stored %d of %d', len(stored), len(sent))
+        return (True, stored)
+    except resilience.CircuitOpenError:
+        raise
+    except Exception as e:
+        log.warning('Screenshot upload error: %s', e)
+        return (False, [])
+
+
+def _screenshot_jobs(rows, parallel_workers=1):
+    """(size, dispatch) per upload request for the screenshots lane, in batches sized by the sync tuner.
+    Screenshots above the resumable threshold go one by one in parts, so a dropped connection costs one part."""
+    batch_size = _sync_tuner.screenshots.value
+    sizes = [screenshot_store.size(row) for row in rows]
+    size_of = dict(zip((row[0] for row in rows), sizes))
+    large = [row for row in rows if resumable_upload.wanted(size_of[row[0]])]
+    if large:
+        large_ids = {row[0] for row in large}
+        rows = [row for row in rows if row[0] not in large_ids]
+        sizes = [size_of[row[0]] for row in rows]
+    if parallel_workers > 1:
+        # Batches upload side by side, so balance them by bytes rather than by count
+        batches = [[rows[i] for i in indexes]
+                   for indexes in partition.pack_greedy(sizes, parallel_workers, max_items=batch_size)]
+    else:
+        # One after another, oldest first, each under the request ceiling
+        batches = [rows[start:end] for start, end in partition.split_contiguous(sizes, 1, max_items=batch_size)]
+    work = [(SCREENSHOT_UPLOAD_URL, sync_screenshot_batch, batch) for batch in batches]
+    work += [(SCREENSHOT_PARTS_URL, resumable_upload.upload_rows, [row]) for row in large]
+    if parallel_workers <= 1:
+        work.sort(key=lambda item: item[2][0][0])
+    engine = upload_engine.get_engine()
+    return [(sum(size_of[row[0]] for row in batch), functools.partial(engine.submit, url, func, list(batch)))
+            for url, func, batch in work]
+
+
+def _screenshots_uploaded(results, delete_screenshots=True):
+    """Dequeue what the screenshot uploads stored, and rows whose data is gone"""
+    stored = [row for _, batch_stored, _ in results for row in batch_stored]
+    unreadable = [rid for _, _, batch_unreadable in results for rid in batch_unreadable]
+    if unreadable:
+        # Nothing left to upload for these rows
+        _screenshot_queue.remove(unreadable)
+    if stored:
+        mark_synced_and_cleanup([], stored, delete_screenshots)
+        log.info('Uploaded %d screenshots', len(stored))
+
+
+def _activity_row(row):
+    """JSON form of an activity queue row"""
+    (rid, start_time, end_time, prod, unprod, idle, mouse_moves, key_presses) = row
+    return {
+        'client_uid': row_uid('activity', rid),
+        'start_time': utc_text(start_time),
+        'end_time': utc_text(end_time),
+        'duration_seconds': end_time - start_time,
+        'productive_seconds': prod,
+        'unproductive_seconds': unprod,
+        'idle_seconds': idle,
+        'mouse_moves': mouse_moves,
+        'key_presses': key_presses,
+    }
+
+
+# Encoded size of an activity row whose six counters are one digit each (uid and timestamps are fixed
+# width), plus the separating comma; every further digit adds a byte
+_ACTIVITY_ROW_BASE = len(json.dumps({
+    'client_uid': '0' * 36, 'start_time': '0' * 19, 'end_time': '0' * 19, 'duration_seconds': 0,
+    'productive_seconds': 0, 'unproductive_seconds': 0, 'idle_seconds': 0, 'mouse_moves': 0, 'key_presses': 0,
+}, separators=(',', ':'))) + 1 - 6
+
+
+def _activity_row_bytes(row):
+    """Encoded JSON size of _activity_row(row), without building it"""
+    _, start_time, end_time, prod, unprod, idle, mouse_moves, key_presses = row
+    return _ACTIVITY_ROW_BASE + sum(len(str(v)) for v in (end_time - start_time, prod, unprod, idle, mouse_moves, key_presses))
+
+
+def _ingest_payload(rows, app_sessions=None, app_outbox_ids=(), evicted=None):
+    """Ingest request for activity queue `rows`; application sessions and eviction counts ride along when given"""
+    act_ids = [str(row[0]) for row in rows]
+    payload = {
+        'username': USERNAME,
+        'machine_id': MACHINE_ID,
+        'hostname': HOSTNAME,
+        'activity': [_activity_row(row) for row in rows],
+        'settings_version': get_settings_version(),
+        '_activity_ids': act_ids,
+    }
+    if app_sessions is not None:
+        payload['application_usage'] = app_sessions
+        payload['_application_outbox_ids'] = app_outbox_ids
+        payload['evicted'] = evicted
+    payload['batch_id'] = batch_uid(act_ids, app_outbox_ids or (), evicted,
+                                    _storage_governor.report_sequence() if evicted else 0)
+    return payload
+
+
+def _ingest_jobs(acts, bounds, act_sizes, ride_along, app_sessions, app_outbox_ids, evicted):
+    """(size, build) per chunk, dispatched by sync_now() through the activity lane of its LaneScheduler;
+    the first chunk carries sessions and evictions"""
+    for n, (start, end) in enumerate(bounds):
+        if n == 0:
+            yield (sum(act_sizes[start:end]) + ride_along,
+                   functools.partial(_ingest_payload, acts[start:end], app_sessions, app_outbox_ids, evicted))
+        else:
+            yield sum(act_sizes[start:end]), functools.partial(_ingest_payload, acts[start:end])
+
+
 def sync_now():
-    acts, shots = load_unsynced()
-    if not acts and not shots:
-        log.debug('Nothing to sync')
+    # While offline nothing is sent: the local queues keep everything until a health probe succeeds
+    if not http_client.online():
+        log.debug('Sync skipped: %s', http_client.state.summary())
         return
-
-    from config import PARALLEL_WORKERS
-    parallel_workers = int(os.environ.get('TRACKER_PARALLEL_WORKERS', str(PARALLEL_WORKERS)))
-    if parallel_workers < 1:
-        parallel_workers = 1
-    if parallel_workers > 10:
-        parallel_workers = 10
-
-    # Prepare activity and screenshots
-    all_activity = []
-    all_act_ids = []
-    for row in acts:
-        (rid, start_time, end_time, prod, unprod, idle, mouse_moves, key_presses) = row
-        all_activity.append({
-            'start_time': start_time,
-            'end_time': end_time,
-            'productive_seconds': int(prod),
-            'unproductive_seconds': int(unprod),
-            'idle_seconds': int(idle),
-            'mouse_moves': int(mouse_moves),
-            'key_presses': int(key_presses),
-        })
-        all_act_ids.append(str(rid))
-
-    all_screenshots = []
-    all_shot_items = []
-    for row in shots:
-        rid, taken_at, filename = row
-        path = os.path.join(SCREEN_DIR, filename)
-        if os.path.exists(path):
-            with open(path, 'rb') as f:
-                data_b64 = base64.b64encode(f.read()).decode('ascii')
-            all_screenshots.append({
-                'taken_at': taken_at,
-                'filename': filename,
-                'data_base64': data_b64,
-            })
-        all_shot_items.append((rid, filename))
-
-    # Single sync or parallel sync
-    total_items = len(all_activity) + len(all_screenshots)
+    parallel_workers = _sync_tuner.worker_count(configured_workers())
+    acts, shots = load_unsynced(parallel_workers)
+    # A round that filled every worker's chunk leaves more backlog behind
+    full_round = len(acts) >= _sync_tuner.activity_rows.value * parallel_workers
+    app_sessions, app_outbox_ids = outbox.load_application_sessions()
+    evicted = _storage_governor.pending_report()
+    if not acts and not shots and not app_sessions and not evicted:
+        log.debug('Nothing to sync')
     delete_screenshots = os.environ.get('TRACKER_DELETE_SCREENSHOTS', '1') not in ('0', 'false', 'False')
-    
-    if parallel_workers == 1 or total_items <= 50:
-        payload = {
-            'username': USERNAME,
-            'machine_id': MACHINE_ID,
-            'hostname': HOSTNAME,
-            'activity': all_activity,
-            'screenshots': all_screenshots,
-            '_activity_ids': all_act_ids,
-            '_screenshot_items': all_shot_items,
-        }
-        success, act_ids, shot_items, jr = sync_chunk(payload, delete_screenshots)
+    engine = upload_engine.get_engine()
+    # Every request of the round is dispatched through its lane: device events first, then activity
+    # and visits, screenshots last, with the in-flight byte budget shared between them
+    scheduler = sync_lanes.LaneScheduler(streaming.get_budget())
+
+    # Website, application and device events queued by the collectors
+    outbox_futures = {}
+
+    def ship(kind, limit):
+        outbox_futures[kind] = outbox.submit(kind, limit)
+        return outbox_futures[kind]
+
+    # An open ingest circuit holds back only the JSON part; screenshots and events have their own
+    has_json = bool(acts or app_sessions or evicted) and http_client.ready(INGEST_URL)
+    # Completed application sessions go with the first ingest chunk. The application outbox holds
+    # those same rows until they are acknowledged, so it is shipped only after that, as before.
+    defer_application = bool(app_outbox_ids) and has_json
+
+    for kind in outbox.registered():
+        if kind == 'application' and defer_application:
+            continue
+        lane = sync_lanes.OUTBOX_LANES.get(kind, 'activity')
+        scheduler.add(lane, [(0, functools.partial(ship, kind, sync_lanes.LANES[lane].max_items))])
+    bounds = []
+    chunk_sent = {}
+    chunk_seconds = {}
+    round_started = time.monotonic()
+    if has_json:
+        # Activity rows only become JSON dicts when their chunk is dispatched under the byte budget.
+        # Chunks are contiguous id runs of similar encoded size, so each acknowledgement is a
+        # single range delete and no one chunk holds up the round.
+        act_sizes = [_activity_row_bytes(row) for row in acts]
+        ride_along = len(json.dumps([app_sessions, evicted], default=str, separators=(',', ':')))
+        bounds = partition.split_contiguous(act_sizes, parallel_workers, max_items=_sync_tuner.activity_rows.value,
+                                            first_extra=ride_along) or [(0, 0)]
+        if len(bounds) > 1:
+            log.info('Syncing in parallel (%d workers): %d total activity across %d chunks',
+                     parallel_workers, len(acts), len(bounds))
+
+        def send_chunk(build):
+            payload = build()
+            future = engine.submit(INGEST_URL, sync_chunk, payload, delete_screenshots)
+            chunk_sent[future] = (payload.get('_application_outbox_ids'), payload.get('evicted'))
+            future.add_done_callback(lambda f: chunk_seconds.setdefault(f, time.monotonic() - round_started))
+            return future
+
+        scheduler.add('activity', ((size, functools.partial(send_chunk, build)) for size, build in
+                                   _ingest_jobs(acts, bounds, act_sizes, ride_along, app_sessions, app_outbox_ids, evicted)))
+
+    # Screenshots are the bulk lane: outside the machine's upload window they wait in the local queue
+    if shots and not bandwidth.bulk_deferred() and http_client.ready(SCREENSHOT_UPLOAD_URL):
+        scheduler.add('screenshots', _screenshot_jobs(shots, parallel_workers), serial=parallel_workers <= 1)
+
+    lanes = scheduler.run()
+
+    all_synced_act_ids = []
+    all_synced_shot_items = []
+    server_settings = {}
+    round_results = []
+    sessions_acked = False
+    for future in chunk_sent:
+        success, act_ids, shot_items, jr = future.result()
+        round_results.append((success, chunk_seconds.get(future, time.monotonic() - round_started)))
         if success:
-            server_delete = jr.get('delete_screenshots_after_sync')
-            if server_delete is not None:
-                delete_screenshots = bool(server_delete) if isinstance(server_delete, bool) else str(server_delete) not in ('0', 'false', 'False')
-                os.environ['TRACKER_DELETE_SCREENSHOTS'] = '1' if delete_screenshots else '0'
-            mark_synced_and_cleanup(act_ids, shot_items, delete_screenshots)
-            log.info('Sync successful: %d activity, %d screenshots', len(act_ids), len(shot_items))
-            update_from_server_response(jr)
-    else:
-        # Parallel sync
-        chunks = [([], [], [], []) for _ in range(parallel_workers)]
-        for i, act in enumerate(all_activity):
-            chunk_idx = i % parallel_workers
-            chunks[chunk_idx][0].append(act)
-            chunks[chunk_idx][1].append(all_act_ids[i])
-        for i, shot in enumerate(all_screenshots):
-            chunk_idx = i % parallel_workers
-            chunks[chunk_idx][2].append(shot)
-            chunks[chunk_idx][3].append(all_shot_items[i])
-        
-        payloads = []
-        for chunk_acts, chunk_act_ids, chunk_shots, chunk_shot_items in chunks:
-            if chunk_acts or chunk_shots:
-                payloads.append({
-                    'username': USERNAME,
-                    'machine_id': MACHINE_ID,
-                    'hostname': HOSTNAME,
-                    'activity': chunk_acts,
-                    'screenshots': chunk_shots,
-                    '_activity_ids': chunk_act_ids,
-                    '_screenshot_items': chunk_shot_items,
-                })
-        
-        if payloads:
-            log.info('Syncing in parallel (%d workers): %d total activity, %d total screenshots across %d chunks',
-                     parallel_workers, len(all_activity), len(all_screenshots), len(payloads))
-            
-            all_synced_act_ids = []
-            all_synced_shot_items = []
-            server_settings = {}
-            
-            with ThreadPoolExecutor(max_workers=parallel_workers) as executor:
-                future_to_payload = {executor.submit(sync_chunk, payload, delete_screenshots): payload for payload in payloads}
-                for future in as_completed(future_to_payload):
-                    success, act_ids, shot_items, jr = future.result()
-                    if success:
-                        all_synced_act_ids.extend(act_ids)
-                        all_synced_shot_items.extend(shot_items)
-                        if jr:
-                            server_settings.update(jr)
-            
-            server_delete = server_settings.get('delete_screenshots_after_sync')
-            if server_delete is not None:
-                delete_screenshots = bool(server_delete) if isinstance(server_delete, bool) else str(server_delete) not in ('0', 'false', 'False')
-                os.environ['TRACKER_DELETE_SCREENSHOTS'] = '1' if delete_screenshots else '0'
-            
-            if all_synced_act_ids or all_synced_shot_items:
-                mark_synced_and_cleanup(all_synced_act_ids, all_synced_shot_items, delete_screenshots)
-                log.info('Parallel sync successful: %d activity, %d screenshots', len(all_synced_act_ids), len(all_synced_shot_items))
-            
-            update_from_server_response(server_settings)
+            sent_outbox_ids, sent_evicted = chunk_sent[future]
+            outbox.ack('application', sent_outbox_ids)
+            sessions_acked = sessions_acked or bool(sent_outbox_ids)
+            application_monitoring.report_blocked_applications(jr.get('blocked_applications'))
+            _storage_governor.clear_reported(sent_evicted)
+            all_synced_act_ids.extend(act_ids)
+            all_synced_shot_items.extend(shot_items)
+            if jr:
+                server_settings.update(jr)
+
+    if chunk_sent:
+        # Single-chunk rounds count too, or one worker could never grow into several. A round only
+        # argues for more workers when every worker had a full chunk.
+        _sync_tuner.record_round(round_results, saturated=full_round and len(chunk_sent) >= parallel_workers)
+
+    server_delete = server_settings.get('delete_screenshots_after_sync')
+    if server_delete is not None:
+        delete_screenshots = bool(server_delete) if isinstance(server_delete, bool) else str(server_delete) not in ('0', 'false', 'False')
+        os.environ['TRACKER_DELETE_SCREENSHOTS'] = '1' if delete_screenshots else '0'
+
+    if all_synced_act_ids or all_synced_shot_items:
+        mark_synced_and_cleanup(all_synced_act_ids, all_synced_shot_items, delete_screenshots)
+        log.info('Sync successful: %d activity', len(all_synced_act_ids))
+
+    if server_settings:
+        update_from_server_response(server_settings)
+
+    if lanes.get('screenshots'):
+        _screenshots_uploaded([future.result() for future in lanes['screenshots']], delete_screenshots)
+
+    # If the chunk with the sessions failed, the server may still have stored them: wait for next round
+    if defer_application and sessions_acked and 'application' in outbox.registered():
+        ship('application', sync_lanes.LANES[sync_lanes.OUTBOX_LANES['application']].max_items)
+
+    outbox.report(outbox_futures)
 
 
 def main():
@@ -435,6 +617,7 @@ def main():
         pass
 
     tracker = ActivityTracker()
+    activity_writer = ActivityWriter()
     m_listener = mouse.Listener(on_move=tracker.on_move, on_click=tracker.on_click, on_scroll=tracker.on_scroll)
     k_listener = keyboard.Listener(on_press=lambda key: tracker.on_key(key))
     m_listener.start()
@@ -464,29 +647,30 @@ def main():
     last_device_scan = time.time()
     last_website_scan = time.time()
     last_application_scan = time.time()
-    interval_env = os.environ.get('TRACKER_SYNC_INTERVAL')
-    loop_interval = int(interval_env) if (interval_env and interval_env.isdigit()) else 10
-    
+
     # Get screenshot settings from config
     screenshot_interval = get_screenshot_interval()
     website_monitoring_interval = get_website_monitoring_interval()
     application_monitoring_interval = get_application_monitoring_interval()
-    
-    # Real-time monitoring: use 1 second sleep for frequent checks
-    last_sync_time = time.time()
-    
+
+    # Sync and storage upkeep run on their own thread; this loop only collects into the local queues
+    worker = sync_worker.SyncWorker(sync_now, sync_interval, storage_maintenance, STORAGE_CHECK_INTERVAL).start()
+    # Device events drive blocking decisions, so ship them without waiting for the next interval
+    outbox.add_listener(lambda kind: worker.wake() if kind == 'device' else None)
+
     while True:
         try:
             current_time = time.time()
             
-            # Collect activity (every minute)
-            record = tracker.collect_minute()
-            save_activity_local(record)
+            # Collect activity once per real minute; rows are group-committed by the writer
+            if activity_writer.minute_due():
+                activity_writer.add(tracker.collect_minute())
+            activity_writer.maybe_flush()
 
             # Take screenshot if enabled and interval elapsed
             if is_screenshots_enabled():
                 # Update screenshot interval from environment (may have been updated by server)
-                screenshot_interval = get_screenshot_interval()
+                screenshot_interval = _degradation.screenshot_interval(get_screenshot_interval())
                 if current_time - last_screenshot >= screenshot_interval:
                     capture_screenshot()
                     last_screenshot = current_time
@@ -503,7 +687,7 @@ def main():
             # Website monitoring (browser tabs) - REAL-TIME (scans every 1 second when interval <= 1)
             if is_website_monitoring_enabled():
                 # Update interval from environment (may have been updated by server)
-                website_monitoring_interval = get_website_monitoring_interval()
+                website_monitoring_interval = _degradation.scan_interval(get_website_monitoring_interval())
                 # Scan based on interval (1 second = real-time)
                 if current_time - last_website_scan >= website_monitoring_interval:
                     try:
@@ -515,7 +699,7 @@ def main():
             # Application monitoring - REAL-TIME (scans every 2 seconds)
             if get_application_monitoring_enabled():
                 # Update interval from environment (may have been updated by server)
-                application_monitoring_interval = get_application_monitoring_interval()
+                application_monitoring_interval = _degradation.scan_interval(get_application_monitoring_interval())
                 # Scan based on interval
                 if current_time - last_application_scan >= application_monitoring_interval:
                     try:
@@ -524,14 +708,9 @@ def main():
                     except Exception as e:
                         log.warning(f"Application scan error: {e}")
 
-            # Sync (only at sync interval) - check every iteration but only sync when needed
-            if current_time - last_sync_time >= loop_interval:
-                sync_now()
-                last_sync_time = current_time
-            
-            # Sleep 1 second for real-time monitoring (allows frequent checks)
-            time.sleep(1)
-            
+            # Keep a 1 second cadence for real-time monitoring (the pass itself never waits on the network)
+            time.sleep(max(0.0, 1 - (time.time() - current_time)))
+
         except KeyboardInterrupt:
             log.info('Interrupted by user. Exiting...')
             break
@@ -539,6 +718,14 @@ def main():
             log.exception('Loop error: %s', e)
             time.sleep(5)
 
+    # Let a sync in progress finish (bounded), then write out what is still buffered
+    worker.stop(timeout=15)
+    upload_engine.close_engine(timeout=5)
+    activity_writer.flush()
+    screenshot_store.close_packs()
+    http_client.close()
+    close_store()
+
 
 if __name__ == '__main__':
     main()
@@ -6,7 +6,6 @@ import os
 import sys
 import time
 import logging
-import requests
 import threading
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -20,12 +19,14 @@ try:
         get_application_monitoring_enabled, get_application_monitoring_interval,
         APPLICATION_API_URL
     )
+    from . import outbox
 except ImportError:
     from config import (
         MACHINE_ID, USERNAME, HOSTNAME,
         get_application_monitoring_enabled, get_application_monitoring_interval,
         APPLICATION_API_URL
     )
+    import outbox
 
 log = logging.getLogger('tracker_agent.application_monitoring')
 
@@ -291,7 +292,7 @@ def scan_applications():
         log.error(f"Traceback: {traceback.format_exc()}")
 
 def report_application_usage(app_name, process_name, window_title=None, exe_path=None, is_productive=True):
-    """Report application usage to server"""
+    """Queue application usage for delivery to server (shipped by the sync path)"""
     try:
         payload = {
             'machine_id': MACHINE_ID,
@@ -303,29 +304,13 @@ def report_application_usage(app_name, process_name, window_title=None, exe_path
             'session_start': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
             'is_productive': 1 if is_productive else 0
         }
-        
-        response = requests.post(
-            APPLICATION_API_URL,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('is_blocked'):
-                log.warning(f"⚠️ BLOCKED APPLICATION ACCESSED: {app_name}")
-                _show_blocked_app_alert(app_name)
-            log.debug(f"Application usage reported: {app_name}")
-            return True
-        else:
-            log.warning(f"Failed to report application usage: Status {response.status_code}")
-            return False
+        return outbox.enqueue('application', 'report', payload)
     except Exception as e:
-        log.debug(f"Error reporting application usage: {e}")
+        log.warning(f"Error queueing application usage: {e}")
         return False
 
 def update_application_duration(app_name, process_name, duration_seconds, end_time):
-    """Update application usage duration on server"""
+    """Queue application usage duration update for delivery to server"""
     try:
         payload = {
             'action': 'update_duration',
@@ -336,23 +321,28 @@ def update_application_duration(app_name, process_name, duration_seconds, end_ti
             'duration_seconds': duration_seconds,
             'session_end': end_time.strftime('%Y-%m-%d %H:%M:%S')
         }
-        
-        response = requests.post(
-            APPLICATION_API_URL,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            log.debug(f"Application duration updated: {app_name} ({duration_seconds}s)")
-            return True
-        else:
-            log.debug(f"Failed to update application duration: Status {response.status_code}")
-            return False
+        return outbox.enqueue('application', 'update_duration', payload)
     except Exception as e:
-        log.debug(f"Error updating application duration: {e}")
+        log.warning(f"Error queueing application duration: {e}")
         return False
 
+def _on_application_response(action, payload, result):
+    """Handle the server's answer for a delivered application event"""
+    app_name = payload.get('application_name')
+    if action == 'report':
+        if result.get('is_blocked'):
+            log.warning(f"⚠️ BLOCKED APPLICATION ACCESSED: {app_name}")
+            _show_blocked_app_alert(app_name)
+        log.debug(f"Application usage reported: {app_name}")
+    else:
+        log.debug(f"Application duration updated: {app_name} ({payload.get('duration_seconds')}s)")
+
+def report_blocked_applications(app_names):
+    """Alert on blocked applications the server found among sessions sent through ingest"""
+    for app_name in app_names or ():
+        log.warning(f"⚠️ BLOCKED APPLICATION ACCESSED: {app_name}")
+        _show_blocked_app_alert(app_name)
+
 def _show_blocked_app_alert(app_name):
     """Show popup alert when blocked application is accessed - NON-BLOCKING"""
     def _show_alert_thread():
@@ -372,4 +362,4 @@ def _show_blocked_app_alert(app_name):
     alert_thread = threading.Thread(target=_show_alert_thread, daemon=True, name=f"AppAlert-{app_name}")
     alert_thread.start()
 
-
+outbox.register_handler('application', APPLICATION_API_URL, _on_application_response)
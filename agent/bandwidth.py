@@ -0,0 +1,178 @@
+"""
+Bandwidth Module for TrackerV3 Agent
+Upload rate limiting (a token bucket shared by every request body) and the time-of-day window for bulk uploads
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import get_upload_rate_kb_s, get_upload_burst_kb, get_bulk_upload_window
+except ImportError:
+    from config import get_upload_rate_kb_s, get_upload_burst_kb, get_bulk_upload_window
+
+log = logging.getLogger('tracker_agent.bandwidth')
+
+# Bytes handed to the socket per token request; small enough that concurrent uploads interleave
+CHUNK_BYTES = 64 * 1024
+
+
+class TokenBucket:
+    """Upload rate limiter shared by all requests.
+
+    Tokens (bytes) accrue at `rate` per second up to `burst`; sending a chunk
+    takes its size in tokens, waiting while the bucket is short. A rate of 0
+    turns limiting off. configure() can change both at any time (a new
+    server setting) and applies from the next chunk.
+    """
+
+    def __init__(self, rate=0, burst=0):
+        self._lock = threading.Lock()
+        self.rate = 0
+        self.burst = 0
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self.configure(rate, burst)
+
+    def configure(self, rate, burst=0):
+        rate = max(0, int(rate))
+        burst = max(0, int(burst)) or max(rate, CHUNK_BYTES)
+        with self._lock:
+            if (rate, burst) == (self.rate, self.burst):
+                return
+            self._refill()
+            # Turning the limit on starts with a full bucket
+            self._tokens = min(self._tokens, burst) if self.rate else float(burst)
+            self.rate, self.burst = rate, burst
+
+    @property
+    def limited(self):
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def take(self, size):
+        """Wait until `size` bytes may be sent (in burst-sized steps when larger than the burst)"""
+        while size > 0:
+            with self._lock:
+                if not self.rate:
+                    return
+                step = min(size, self.burst)
+                self._refill()
+                if self._tokens >= step:
+                    self._tokens -= step
+                    size -= step
+                    continue
+                delay = (step - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class Throttled:
+    """A request body that goes out no faster than `bucket` allows: the same bytes and length,
+    yielded CHUNK_BYTES at a time. Iterating again starts over, like the body it wraps."""
+
+    def __init__(self, body, bucket):
+        self.body = body
+        self.bucket = bucket
+
+    def __len__(self):
+        return len(self.body)
+
+    def __iter__(self):
+        pieces = (self.body,) if isinstance(self.body, (bytes, bytearray, memoryview)) else self.body
+        for piece in pieces:
+            view = memoryview(piece)
+            for start in range(0, len(view), CHUNK_BYTES):
+                chunk = view[start:start + CHUNK_BYTES]
+                self.bucket.take(len(chunk))
+                yield bytes(chunk)
+
+
+_bucket = TokenBucket()
+
+
+def get_bucket():
+    """Process-wide bucket, reconfigured from the current settings"""
+    _bucket.configure(get_upload_rate_kb_s() * 1024, get_upload_burst_kb() * 1024)
+    return _bucket
+
+
+def throttled(data):
+    """`data` wrapped so it is sent within the upload rate limit. Form dicts, text and bodies of
+    unknown length are left as they are, as is everything while no limit is set."""
+    bucket = get_bucket()
+    if not bucket.limited or data is None or isinstance(data, (str, dict, list, tuple)):
+        return data
+    if not isinstance(data, (bytes, bytearray, memoryview)) and not (hasattr(data, '__iter__') and hasattr(data, '__len__')):
+        return data
+    return Throttled(data, bucket)
+
+
+def parse_windows(text):
+    """Parse "HH:MM-HH:MM[,HH:MM-HH:MM...]" into [(start_minute, end_minute)]. A window may run past
+    midnight ("18:00-08:00"). Raises ValueError on a malformed window."""
+    windows = []
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, end = (t.strip() for t in part.split('-'))
+            minutes = []
+            for t in (start, end):
+                hours, mins = (int(v) for v in t.split(':'))
+                if not (0 <= hours <= 24 and 0 <= mins < 60) or hours * 60 + mins > 1440:
+                    raise ValueError
+                minutes.append(hours * 60 + mins)
+        except ValueError:
+            raise ValueError(f'bad upload window {part!r} (expected HH:MM-HH:MM)')
+        windows.append(tuple(minutes))
+    return windows
+
+
+def in_window(windows, minute):
+    """Is `minute` (minutes past local midnight) inside any of `windows`? No windows means always."""
+    if not windows:
+        return True
+    for start, end in windows:
+        if start <= end:
+            if start <= minute < end:
+                return True
+        elif minute >= start or minute < end:
+            return True
+    return False
+
+
+_window_lock = threading.Lock()
+_window_state = {'text': None, 'windows': [], 'deferred': False}
+
+
+def bulk_deferred(now=None):
+    """True while bulk uploads (screenshots) must wait for their time-of-day window"""
+    text = get_bulk_upload_window()
+    local = time.localtime(now)
+    with _window_lock:
+        if text != _window_state['text']:
+            try:
+                _window_state['windows'] = parse_windows(text)
+            except ValueError as e:
+                log.warning('Ignoring bulk upload window: %s', e)
+                _window_state['windows'] = []
+            _window_state['text'] = text
+        deferred = not in_window(_window_state['windows'], local.tm_hour * 60 + local.tm_min)
+        if deferred != _window_state['deferred']:
+            _window_state['deferred'] = deferred
+            if deferred:
+                log.info('Screenshot uploads deferred until the bulk upload window (%s)', text)
+            else:
+                log.info('Bulk upload window open (%s): uploading screenshots', text)
+        return deferred
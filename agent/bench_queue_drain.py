@@ -0,0 +1,96 @@
+"""
+Benchmark: drain a synthetic multi-day offline activity backlog from agent.db
+Compares the watermark/range-delete queue with the old synced = 0 / IN (...) path
+Usage: python bench_queue_drain.py [--rows 1000000] [--batch 500]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from store import LocalStore
+import schema
+import sync_queue
+
+COLUMNS = ('start_time', 'end_time', 'productive_seconds', 'unproductive_seconds', 'idle_seconds', 'mouse_moves', 'key_presses')
+
+
+def build_backlog(store, rows):
+    with store.transaction() as cur:
+        # Unversioned layout: the legacy path still needs the synced column
+        schema._v1_baseline(cur)
+        cur.executemany(
+            'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses, synced) VALUES (?,?,?,?,?,?,?,0)',
+            (('2025-01-01 00:00:00', '2025-01-01 00:01:00', i % 60, 0, 60 - i % 60, i % 97, i % 53) for i in range(rows))
+        )
+
+
+def drain_watermark(store, batch):
+    queue = sync_queue.StreamQueue('activity', COLUMNS, store=store)
+    latencies = []
+    total = 0
+    while True:
+        t0 = time.perf_counter()
+        rows = queue.peek(batch)
+        if not rows:
+            break
+        queue.ack([r[0] for r in rows])
+        latencies.append(time.perf_counter() - t0)
+        total += len(rows)
+    return total, latencies
+
+
+def drain_legacy(store, batch):
+    latencies = []
+    total = 0
+    while True:
+        t0 = time.perf_counter()
+        rows = store.query('SELECT id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses FROM activity WHERE synced = 0 ORDER BY id ASC LIMIT ?', (batch,))
+        if not rows:
+            break
+        ids = [str(r[0]) for r in rows]
+        store.execute('DELETE FROM activity WHERE id IN ({})'.format(','.join('?' * len(ids))), ids)
+        latencies.append(time.perf_counter() - t0)
+        total += len(rows)
+    return total, latencies
+
+
+def report(name, total, latencies, elapsed):
+    n = len(latencies)
+    tenth = max(1, n // 10)
+    first = sum(latencies[:tenth]) / tenth * 1000
+    last = sum(latencies[-tenth:]) / tenth * 1000
+    print(f"{name:<10} {total:>9} rows  {elapsed:7.2f}s  {total / elapsed:>10.0f} rows/s  "
+          f"batch ms: first10%={first:.2f} last10%={last:.2f} max={max(latencies) * 1000:.2f}")
+
+
+def run(label, drain, rows, batch):
+    tmp = tempfile.mkdtemp(prefix='tracker_bench_')
+    try:
+        store = LocalStore(os.path.join(tmp, 'agent.db'))
+        t0 = time.perf_counter()
+        build_backlog(store, rows)
+        print(f"{label}: built {rows} row backlog in {time.perf_counter() - t0:.2f}s")
+        t0 = time.perf_counter()
+        total, latencies = drain(store, batch)
+        report(label, total, latencies, time.perf_counter() - t0)
+        store.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--skip-legacy', action='store_true', help='only run the watermark queue')
+    args = parser.parse_args()
+
+    print("Queue drain benchmark")
+    print("=" * 50)
+    run('watermark', drain_watermark, args.rows, args.batch)
+    if not args.skip_legacy:
+        run('legacy', drain_legacy, args.rows, args.batch)
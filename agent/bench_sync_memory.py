@@ -0,0 +1,170 @@
+"""
+Benchmark: peak memory of one sync round as the screenshot backlog grows
+Compares the old all-in-memory build (every ingest chunk and every image, base64-encoded, built before
+anything is sent) with the streaming pipeline as sync_now() runs it: agent._ingest_jobs chunks and
+multipart screenshot bodies dispatched through sync_lanes.LaneScheduler under the in-flight byte budget
+Needs the agent's own dependencies (agent.py is imported for its ingest builders)
+Usage: python bench_sync_memory.py [--sizes 10,50,200] [--kb 300] [--activity 20000] [--workers 4] [--budget-mb 16]
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import functools
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def build_backlog(tmp, count, kb, activity):
+    """An agent.db with `activity` pending minutes and a pack store holding `count` screenshots of
+    about `kb` KB each; returns (store, activity rows, screenshot rows)"""
+    import store as local_store
+    import schema
+    import screenshot_store
+
+    # Process-wide, as agent.py's payload builders read this install's id from it
+    store = local_store._store = local_store.LocalStore(os.path.join(tmp, 'agent.db'))
+    schema.migrate(store)
+    store.executemany(
+        'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, '
+        'mouse_moves, key_presses) VALUES (?, ?, ?, 0, ?, ?, ?)',
+        ((1735689600 + i * 60, 1735689660 + i * 60, i % 60, 60 - i % 60, i % 97, i % 53) for i in range(activity))
+    )
+    packs = screenshot_store._packs = screenshot_store.ScreenshotPacks(pack_dir=os.path.join(tmp, 'packs'), store=store)
+    rng = random.Random(7)
+    for i in range(count):
+        packs.add(os.urandom(rng.randint(kb * 512, kb * 1536)), f'shot_{i}.jpg', 1735689600 + i * 300)
+    acts = store.query('SELECT id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, '
+                       'mouse_moves, key_presses FROM activity ORDER BY id')
+    shots = store.query('SELECT id, taken_at, filename, pack_segment, pack_offset, pack_length FROM screenshots ORDER BY id')
+    return store, acts, shots
+
+
+def _agent():
+    # Quiet: the child's last stdout line is its result
+    os.environ.setdefault('TRACKER_VERBOSE', '0')
+    # The agent modules put the repository root first on sys.path, where `agent` is this directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import agent
+    return agent
+
+
+def send(body):
+    """Stand-in for the socket: consume the body the way http.client does and drop it"""
+    if isinstance(body, bytes):
+        return len(body)
+    return sum(len(part) for part in body)
+
+
+def encode(payload):
+    return json.dumps({k: v for k, v in payload.items() if not k.startswith('_')}, separators=(',', ':')).encode('utf-8')
+
+
+def round_legacy(acts, shots, workers, budget_mb):
+    import screenshot_store
+    agent = _agent()
+
+    # Every chunk's dict, with base64 image strings, exists before the first request goes out
+    bodies = [encode(agent._ingest_payload(acts[start:start + 500])) for start in range(0, len(acts), 500)]
+    chunks = [[] for _ in range(workers)]
+    for i, row in enumerate(shots):
+        data = screenshot_store.read(row)
+        chunks[i % workers].append({'taken_at': row[1], 'filename': row[2],
+                                    'data_base64': base64.b64encode(data).decode('ascii')})
+    bodies += [json.dumps({'screenshots': chunk}).encode('utf-8') for chunk in chunks if chunk]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(send, bodies))
+
+
+def round_streaming(acts, shots, workers, budget_mb):
+    import streaming
+    import partition
+    import sync_lanes
+    import screenshot_store
+    agent = _agent()
+
+    # The lanes' weights, without the per-round screenshot cap, so both modes send the whole backlog
+    lanes = {name: sync_lanes.Lane(name, lane.weight) for name, lane in sync_lanes.LANES.items()}
+    scheduler = sync_lanes.LaneScheduler(streaming.ByteBudget(budget_mb * 1024 * 1024), lanes)
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def dispatch(build, to_body=None):
+        # Built on the worker thread, as engine.submit() does, once the scheduler let it through
+        return pool.submit(lambda: send(to_body(build()) if to_body else build()))
+
+    act_sizes = [agent._activity_row_bytes(row) for row in acts]
+    bounds = partition.split_contiguous(act_sizes, workers, max_items=500)
+    scheduler.add('activity', ((size, functools.partial(dispatch, build, encode))
+                               for size, build in agent._ingest_jobs(acts, bounds, act_sizes, 0, None, (), None)))
+
+    def body(batch):
+        files = [('screenshots[]', row[2], 'image/jpeg', row[5], functools.partial(screenshot_store.read, row))
+                 for row in batch]
+        return streaming.MultipartBody([('meta', json.dumps([row[2] for row in batch]))], files)
+
+    sizes = [screenshot_store.size(row) for row in shots]
+    batches = [[shots[i] for i in b] for b in partition.pack_greedy(sizes, workers, max_items=20)]
+    scheduler.add('screenshots', ((sum(row[5] for row in batch), functools.partial(dispatch, functools.partial(body, batch)))
+                                  for batch in batches))
+    with pool:
+        lanes = scheduler.run()
+    return sum(f.result() for futures in lanes.values() for f in futures)
+
+
+def child(mode, count, kb, activity, workers, budget_mb):
+    tmp = tempfile.mkdtemp(prefix='tracker_bench_')
+    try:
+        store, acts, shots = build_backlog(tmp, count, kb, activity)
+        backlog = sum(row[5] for row in shots)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        sent = (round_legacy if mode == 'legacy' else round_streaming)(acts, shots, workers, budget_mb)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(json.dumps({'backlog': backlog, 'sent': sent, 'peak': peak, 'seconds': elapsed,
+                          'rss_growth_kb': rss_after - rss_before}))
+        import screenshot_store
+        screenshot_store.close_packs()
+        store.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,50,200', help='screenshots pending per round, comma separated')
+    parser.add_argument('--kb', type=int, default=300, help='average screenshot size')
+    parser.add_argument('--activity', type=int, default=20000, help='activity minutes pending per round')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--budget-mb', type=int, default=16, help='in-flight byte budget (streaming)')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'COUNT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), args.kb, args.activity, args.workers, args.budget_mb)
+        sys.exit(0)
+
+    print(f"Sync memory benchmark: ~{args.kb} KB screenshots, {args.activity} activity rows, "
+          f"{args.workers} workers, {args.budget_mb} MB budget")
+    print("=" * 50)
+    # Each measurement runs in a fresh interpreter so peak RSS is not inherited from the previous one
+    for count in (int(n) for n in args.sizes.split(',')):
+        for mode in ('legacy', 'streaming'):
+            cmd = [sys.executable, os.path.abspath(__file__), '--kb', str(args.kb), '--activity', str(args.activity),
+                   '--workers', str(args.workers),
+                   '--budget-mb', str(args.budget_mb), '--child', mode, str(count)]
+            result = json.loads(subprocess.check_output(cmd).decode().strip().splitlines()[-1])
+            print(f"{mode:<10} {count:>5} shots  backlog {result['backlog'] / 1048576:7.1f} MB  "
+                  f"peak alloc {result['peak'] / 1048576:7.1f} MB  RSS growth {result['rss_growth_kb'] / 1024:7.1f} MB  "
+                  f"{result['seconds']:6.2f}s")
@@ -0,0 +1,85 @@
+"""
+Benchmark: encode/decode cost and body size of an ingest payload as JSON vs the columnar wire format
+Decode is timed in Python as a stand-in for api/ingest.php (json_decode vs decode_columnar_body)
+Usage: python bench_wire_format.py [--rows 5000] [--repeat 20]
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import uuid
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+import columnar
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def build_payload(rows):
+    rng = random.Random(42)
+    start = 1735689600  # 2025-01-01 00:00:00 UTC
+    activity = []
+    for i in range(rows):
+        begin = start + i * 60
+        idle = rng.randint(0, 60)
+        productive = rng.randint(0, 60 - idle)
+        activity.append({
+            'client_uid': str(uuid.UUID(int=rng.getrandbits(128), version=5)),
+            'start_time': time.strftime(TIME_FORMAT, time.gmtime(begin)),
+            'end_time': time.strftime(TIME_FORMAT, time.gmtime(begin + 60)),
+            'duration_seconds': 60,
+            'productive_seconds': productive,
+            'unproductive_seconds': 60 - idle - productive,
+            'idle_seconds': idle,
+            'mouse_moves': rng.randint(0, 3000),
+            'key_presses': rng.randint(0, 600),
+        })
+    return {
+        'username': 'bench',
+        'machine_id': 'BENCH-PC',
+        'hostname': 'BENCH-PC',
+        'activity': activity,
+        'application_usage': [],
+        'evicted': {},
+        'batch_id': str(uuid.uuid4()),
+        'settings_version': '1.0',
+    }
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run(label, encode, decode, payload, repeat):
+    encode_s, body = timed(lambda: encode(payload), repeat)
+    decode_s, decoded = timed(lambda: decode(body), repeat)
+    assert decoded['activity'] == payload['activity'], f'{label} round trip changed the rows'
+    gz = gzip.compress(body, compresslevel=6, mtime=0)
+    rows = len(payload['activity'])
+    print(f"{label:<9} {len(body):>10} B  {len(body) / rows:6.1f} B/row  gzip {len(gz):>9} B  "
+          f"encode {encode_s * 1000:8.2f} ms  decode {decode_s * 1000:8.2f} ms")
+    return len(body), len(gz)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20, help='best of N runs is reported')
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    print(f"Wire format benchmark: {args.rows} activity rows (best of {args.repeat})")
+    print("=" * 50)
+    json_size, json_gz = run('json', lambda p: json.dumps(p, separators=(',', ':')).encode('utf-8'),
+                             lambda b: json.loads(b), payload, args.repeat)
+    col_size, col_gz = run('columnar', columnar.encode, columnar.decode, payload, args.repeat)
+    print(f"columnar/json: raw {col_size / json_size:.1%}, gzip {col_gz / json_gz:.1%}")
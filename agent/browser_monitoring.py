@@ -7,7 +7,6 @@ import os
 import sys
 import time
 import logging
-import requests
 import re
 import sqlite3
 from datetime import datetime, timedelta
@@ -22,11 +21,13 @@ try:
         MACHINE_ID, USERNAME, HOSTNAME, is_website_monitoring_enabled, get_website_monitoring_interval,
         WEBSITE_API_URL
     )
+    from . import outbox
 except ImportError:
     from config import (
         MACHINE_ID, USERNAME, HOSTNAME, is_website_monitoring_enabled, get_website_monitoring_interval,
         WEBSITE_API_URL
     )
+    import outbox
 
 log = logging.getLogger('tracker_agent.browser_monitoring')
 
@@ -615,7 +616,7 @@ def scan_browser_tabs():
         log.error(f"Traceback: {traceback.format_exc()}")
 
 def report_website_visit(url, domain, title, browser, is_private=False):
-    """Report website visit to server"""
+    """Queue website visit for delivery to server (shipped by the sync path)"""
     try:
         payload = {
             'machine_id': MACHINE_ID,
@@ -629,29 +630,13 @@ def report_website_visit(url, domain, title, browser, is_private=False):
             'is_incognito': 1 if is_private else 0,
             'visit_start': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         }
-        
-        response = requests.post(
-            WEBSITE_API_URL,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('is_blocked'):
-                log.warning(f"⚠️ BLOCKED WEBSITE ACCESSED: {domain}")
-                _show_blocked_website_alert(domain)
-            log.debug(f"Website visit reported: {domain}")
-            return True
-        else:
-            log.warning(f"Failed to report website visit: Status {response.status_code}")
-            return False
+        return outbox.enqueue('website', 'report', payload)
     except Exception as e:
-        log.debug(f"Error reporting website visit: {e}")
+        log.warning(f"Error queueing website visit: {e}")
         return False
 
 def update_visit_duration(url, domain, duration_seconds, end_time):
-    """Update visit duration on server"""
+    """Queue visit duration update for delivery to server"""
     try:
         payload = {
             'action': 'update_duration',
@@ -662,23 +647,22 @@ def update_visit_duration(url, domain, duration_seconds, end_time):
             'duration_seconds': duration_seconds,
             'visit_end': end_time.strftime('%Y-%m-%d %H:%M:%S')
         }
-        
-        response = requests.post(
-            WEBSITE_API_URL,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            log.debug(f"Visit duration updated: {domain} ({duration_seconds}s)")
-            return True
-        else:
-            log.debug(f"Failed to update visit duration: Status {response.status_code}")
-            return False
+        return outbox.enqueue('website', 'update_duration', payload)
     except Exception as e:
-        log.debug(f"Error updating visit duration: {e}")
+        log.warning(f"Error queueing visit duration: {e}")
         return False
 
+def _on_website_response(action, payload, result):
+    """Handle the server's answer for a delivered website event"""
+    if action == 'report':
+        domain = payload.get('domain')
+        if result.get('is_blocked'):
+            log.warning(f"⚠️ BLOCKED WEBSITE ACCESSED: {domain}")
+            _show_blocked_website_alert(domain)
+        log.debug(f"Website visit reported: {domain}")
+    else:
+        log.debug(f"Visit duration updated: {payload.get('domain')} ({payload.get('duration_seconds')}s)")
+
 def _show_blocked_website_alert(domain):
     """Show popup alert when blocked website is accessed - NON-BLOCKING"""
     def _show_alert_thread():
@@ -697,3 +681,5 @@ def _show_blocked_website_alert(domain):
     
     alert_thread = threading.Thread(target=_show_alert_thread, daemon=True, name=f"WebsiteAlert-{domain}")
     alert_thread.start()
+
+outbox.register_handler('website', WEBSITE_API_URL, _on_website_response)
@@ -0,0 +1,65 @@
+"""
+Client IDs Module for TrackerV3 Agent
+Stable client-generated ids for rows and batches, so ingest can drop replays
+"""
+import os
+import sys
+import json
+import uuid
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .store import get_store
+    from .sync_queue import id_ranges
+except ImportError:
+    from store import get_store
+    from sync_queue import id_ranges
+
+log = logging.getLogger('tracker_agent.client_ids')
+
+_lock = threading.Lock()
+_namespace = None
+
+
+def client_id(store=None):
+    """This install's random id (created by schema v4), as a UUID"""
+    global _namespace
+    with _lock:
+        if _namespace is None:
+            row = (store or get_store()).query_one("SELECT value FROM agent_meta WHERE key = 'client_id'")
+            _namespace = uuid.UUID(row[0])
+        return _namespace
+
+
+def row_uid(stream, rid):
+    """Client id of queued row `rid` of `stream`.
+
+    Derived from the install id and the local row id (UUIDv5), so it is the
+    same on every resend without being stored, and never repeats across
+    installs even when a fresh agent.db starts its ids at 1 again.
+    """
+    return str(uuid.uuid5(client_id(), f'{stream}:{int(rid)}'))
+
+
+def batch_uid(activity_ids=(), application_ids=(), evicted=None, report_seq=0):
+    """Client id of one ingest request, derived from what it carries.
+
+    Resending the same rows (a retry after a lost response) gives the same id,
+    which lets the server skip the whole batch; rows re-chunked differently
+    are still deduplicated one by one through their row_uid. Eviction counts
+    have no row ids, so `report_seq` (StorageGovernor.report_sequence(), which
+    only moves on once a report is acknowledged) tells a retry of one report
+    from a later report that happens to carry the same counts.
+    """
+    parts = [
+        'activity:' + ','.join(f'{a}-{b}' for a, b in id_ranges(activity_ids)),
+        'application:' + ','.join(str(int(i)) for i in application_ids),
+        'evicted:' + json.dumps(evicted or {}, sort_keys=True, separators=(',', ':')),
+    ]
+    if evicted:
+        parts.append(f'report:{int(report_seq)}')
+    return str(uuid.uuid5(client_id(), ';'.join(parts)))
@@ -0,0 +1,157 @@
+"""
+Columnar Module for TrackerV3 Agent
+Compact binary wire format for ingest payloads: fixed-width column arrays under an explicit schema header
+"""
+import os
+import sys
+import json
+import time
+import struct
+import calendar
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+log = logging.getLogger('tracker_agent.columnar')
+
+CONTENT_TYPE = 'application/x-tracker-columnar'
+MAGIC = b'TRKC'
+VERSION = 1
+
+# Column types: unsigned 32/64-bit little-endian integers, UTC epoch seconds (sent as u64, read back as
+# 'YYYY-MM-DD HH:MM:SS' text) and UUIDs as 16 raw bytes (all zero = none)
+U32, U64, TIME, UUID = 'I', 'Q', 'T', 'U'
+_WIDTH = {U32: 4, U64: 8, TIME: 8, UUID: 16}
+_NO_UUID = bytes(16)
+
+# Lists of rows sent as columns; everything else in the payload goes in the JSON envelope.
+# duration_seconds is left out: the server derives it from end_time - start_time.
+TABLES = {
+    'activity': (
+        ('client_uid', UUID),
+        ('start_time', TIME),
+        ('end_time', TIME),
+        ('productive_seconds', U32),
+        ('unproductive_seconds', U32),
+        ('idle_seconds', U32),
+        ('mouse_moves', U32),
+        ('key_presses', U32),
+    ),
+}
+
+
+def _epoch(text, days=None):
+    # Fixed layout from schema.utc_text; much cheaper than strptime. `days` caches the date part.
+    date = text[:10]
+    day = days.get(date) if days is not None else None
+    if day is None:
+        day = calendar.timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]), 0, 0, 0))
+        if days is not None:
+            days[date] = day
+    return day + int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+
+
+def _uuid_bytes(value):
+    return bytes.fromhex(value.replace('-', '')) if value else _NO_UUID
+
+
+def _uuid_text(raw):
+    if raw == _NO_UUID:
+        return None
+    h = raw.hex()
+    return f'{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}'
+
+
+def _name(text):
+    raw = text.encode('utf-8')
+    return struct.pack('<B', len(raw)) + raw
+
+
+def _pack_column(kind, values):
+    n = len(values)
+    if kind == UUID:
+        if all(values):
+            return bytes.fromhex(''.join(values).replace('-', ''))
+        return b''.join(_uuid_bytes(v) for v in values)
+    if kind == TIME:
+        days = {}
+        return struct.pack(f'<{n}Q', *(_epoch(v, days) for v in values))
+    return struct.pack(f'<{n}{kind}', *(int(v or 0) for v in values))
+
+
+def encode(payload):
+    """Encode a payload dict as the columnar format. Keys starting with '_' are local bookkeeping and
+    are not sent.
+
+    Layout (little-endian): MAGIC, u8 version, u32 envelope length + envelope JSON, u8 table count,
+    then per table: name, u32 rows, u8 columns, per column name + type code, then each column's
+    values back to back. Names are u8 length + UTF-8. Raises ValueError when a value does not fit
+    its column (negative or too wide), so the caller can send JSON instead.
+    """
+    envelope = {k: v for k, v in payload.items() if not k.startswith('_') and k not in TABLES}
+    tables = [(name, payload[name]) for name in TABLES if payload.get(name)]
+    env = json.dumps(envelope, separators=(',', ':')).encode('utf-8')
+    parts = [MAGIC, struct.pack('<BI', VERSION, len(env)), env, struct.pack('<B', len(tables))]
+    try:
+        for name, rows in tables:
+            columns = TABLES[name]
+            parts.append(_name(name))
+            parts.append(struct.pack('<IB', len(rows), len(columns)))
+            for column, kind in columns:
+                parts.append(_name(column) + kind.encode('ascii'))
+            for column, kind in columns:
+                parts.append(_pack_column(kind, [row.get(column) for row in rows]))
+    except (struct.error, ValueError, TypeError) as e:
+        raise ValueError(f'payload does not fit the columnar schema: {e}')
+    return b''.join(parts)
+
+
+def decode(data):
+    """Decode a columnar body back into the JSON payload shape (what api/ingest.php does on its side)"""
+    if data[:4] != MAGIC:
+        raise ValueError('not a columnar body')
+    version, env_len = struct.unpack_from('<BI', data, 4)
+    if version != VERSION:
+        raise ValueError(f'unsupported columnar version {version}')
+    pos = 9
+    payload = json.loads(data[pos:pos + env_len].decode('utf-8'))
+    pos += env_len
+    (table_count,) = struct.unpack_from('<B', data, pos)
+    pos += 1
+
+    def name():
+        nonlocal pos
+        (length,) = struct.unpack_from('<B', data, pos)
+        text = data[pos + 1:pos + 1 + length].decode('utf-8')
+        pos += 1 + length
+        return text
+
+    for _ in range(table_count):
+        table = name()
+        rows, column_count = struct.unpack_from('<IB', data, pos)
+        pos += 5
+        columns = []
+        for _ in range(column_count):
+            column = name()
+            columns.append((column, chr(data[pos])))
+            pos += 1
+        values = {}
+        epochs = {}
+        for column, kind in columns:
+            width = _WIDTH[kind]
+            if kind == UUID:
+                values[column] = [_uuid_text(data[pos + i * width:pos + (i + 1) * width]) for i in range(rows)]
+            elif kind == TIME:
+                numbers = struct.unpack_from(f'<{rows}Q', data, pos)
+                values[column] = [time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(v)) for v in numbers]
+                epochs[column] = numbers
+            else:
+                values[column] = struct.unpack_from(f'<{rows}{kind}', data, pos)
+            pos += rows * width
+        out = [dict(zip(values, row)) for row in zip(*values.values())]
+        if 'start_time' in epochs and 'end_time' in epochs:
+            for row, start, end in zip(out, epochs['start_time'], epochs['end_time']):
+                row['duration_seconds'] = max(0, end - start)
+        payload[table] = out
+    return payload
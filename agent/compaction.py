@@ -0,0 +1,114 @@
+"""
+Compaction Module for TrackerV3 Agent
+Rolls old minute activity rows up into coarser spans while the upload backlog is large
+"""
+import os
+import sys
+import time
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import ROLLUP_BACKLOG_ROWS, ROLLUP_MIN_AGE_HOURS, ROLLUP_SPAN_SECONDS
+    from .store import get_store
+except ImportError:
+    from config import ROLLUP_BACKLOG_ROWS, ROLLUP_MIN_AGE_HOURS, ROLLUP_SPAN_SECONDS
+    from store import get_store
+
+log = logging.getLogger('tracker_agent.compaction')
+
+_PAGE_ROWS = 5000
+
+_UPDATE_SQL = (
+    'UPDATE activity SET end_time = ?, productive_seconds = ?, unproductive_seconds = ?, '
+    'idle_seconds = ?, mouse_moves = ?, key_presses = ? WHERE id = ?'
+)
+
+
+def _spans(rows, span_seconds, cutoff):
+    """Group rows (id, start, end, prod, unprod, idle, mouse, keys) into runs worth merging.
+
+    A run is a contiguous chain (each row starts where the previous one ended)
+    inside one span_seconds bucket, ending at or before `cutoff`. Gaps (agent
+    not running) start a new run, so a span's end - start is always the time it
+    actually covers. Buckets are aligned to UTC epoch, so spans never cross an
+    hour or day boundary.
+
+    Returns (runs, id of the first row of the last run seen); the last run may
+    continue past the end of `rows`.
+    """
+    runs = []
+    run = []
+    for row in rows:
+        if row[2] > cutoff:
+            break
+        if run and row[1] == run[-1][2] and row[2] - (run[0][1] // span_seconds) * span_seconds <= span_seconds:
+            run.append(row)
+            continue
+        if len(run) > 1:
+            runs.append(run)
+        run = [row]
+    if len(run) > 1:
+        runs.append(run)
+    return runs, (run[0][0] if run else None)
+
+
+def rollup(activity_queue, span_seconds=None, min_age_seconds=None, max_rows=None, store=None, now=None):
+    """Merge pending minute rows older than `min_age_seconds` into spans of up to `span_seconds`.
+
+    Each merged span keeps the first row's id and start, and sums the
+    productive, unproductive and idle seconds and the input counters of its
+    rows. The other rows are removed from the queue. Works through the backlog
+    oldest first, one transaction per page, until `max_rows` rows have been
+    removed or no eligible rows remain. Returns the number of rows removed.
+
+    Rows that have been sent before are left alone: the server may already
+    hold them under their client ids (a lost response), and merging them would
+    count those minutes twice.
+    """
+    store = store or get_store()
+    span_seconds = span_seconds or ROLLUP_SPAN_SECONDS
+    if min_age_seconds is None:
+        min_age_seconds = ROLLUP_MIN_AGE_HOURS * 3600
+    cutoff = int(now if now is not None else time.time()) - min_age_seconds
+    removed = 0
+    after = activity_queue.sent_watermark or None
+    while max_rows is None or removed < max_rows:
+        rows = activity_queue.peek(_PAGE_ROWS, after=after)
+        if not rows:
+            break
+        runs, tail_id = _spans(rows, span_seconds, cutoff)
+        drop = []
+        if runs:
+            with store.transaction() as cur:
+                cur.executemany(_UPDATE_SQL, [
+                    (run[-1][2],
+                     sum(r[3] for r in run), sum(r[4] for r in run), sum(r[5] for r in run),
+                     sum(r[6] for r in run), sum(r[7] for r in run), run[0][0])
+                    for run in runs
+                ])
+                for run in runs:
+                    drop.extend(r[0] for r in run[1:])
+                activity_queue.remove(drop)
+            removed += len(drop)
+        if rows[-1][2] > cutoff or len(rows) < _PAGE_ROWS:
+            break
+        # Re-read the last run so a span split by the page boundary still merges. A page that was
+        # one unmerged run is skipped past instead, or the same page would be read forever.
+        stuck = tail_id == rows[0][0] and not drop
+        after = rows[-1][0] if tail_id is None or stuck else tail_id - 1
+    return removed
+
+
+def maybe_compact(activity_queue, threshold=None, store=None):
+    """Roll up old minutes once the pending activity backlog exceeds `threshold` rows. Returns rows removed."""
+    threshold = ROLLUP_BACKLOG_ROWS if threshold is None else threshold
+    backlog = activity_queue.backlog()
+    if backlog <= threshold:
+        return 0
+    removed = rollup(activity_queue, store=store)
+    if removed:
+        log.info('Rolled up activity backlog: %d -> %d rows', backlog, backlog - removed)
+    return removed
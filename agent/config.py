@@ -29,10 +29,12 @@ if DATA_DIR is None:
 # Create directories if they don't exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(os.path.join(DATA_DIR, 'screenshots'), exist_ok=True)
+os.makedirs(os.path.join(DATA_DIR, 'packs'), exist_ok=True)
 
 # Paths
 DB_PATH = os.path.join(DATA_DIR, 'agent.db')
 SCREEN_DIR = os.path.join(DATA_DIR, 'screenshots')
+PACK_DIR = os.path.join(DATA_DIR, 'packs')  # append-only segments holding pending screenshots
 LOG_PATH = os.path.join(DATA_DIR, 'agent.log')
 
 # API endpoints
@@ -41,6 +43,9 @@ DEVICE_API_URL = f"{SERVER_BASE}/api/device.php"
 PERMISSION_API_URL = f"{SERVER_BASE}/api/permissions.php"
 WEBSITE_API_URL = f"{SERVER_BASE}/api/website.php"
 APPLICATION_API_URL = f"{SERVER_BASE}/api/application.php"
+SCREENSHOT_UPLOAD_URL = f"{SERVER_BASE}/api/screenshots.php"
+SCREENSHOT_PARTS_URL = f"{SERVER_BASE}/api/screenshot_parts.php"
+HEALTH_URL = f"{SERVER_BASE}/api/health.php"
 
 # User and machine info
 USERNAME = os.environ.get('USERNAME') or os.environ.get('USER') or 'unknown'
@@ -52,6 +57,66 @@ VERBOSE = os.environ.get('TRACKER_VERBOSE', '1') not in ('0', 'false', 'False')
 PARALLEL_WORKERS = int(os.environ.get('TRACKER_PARALLEL_WORKERS', '1'))
 DELETE_SCREENSHOTS = os.environ.get('TRACKER_DELETE_SCREENSHOTS', '1') not in ('0', 'false', 'False')
 
+# HTTP client (see http_client.py)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('TRACKER_HTTP_CONNECT_TIMEOUT', '5'))  # seconds to establish a connection
+UPLOAD_MAX_IN_FLIGHT = int(os.environ.get('TRACKER_UPLOAD_MAX_IN_FLIGHT', '12'))  # concurrent API calls across all endpoints (see upload_engine.py)
+
+# Circuit breakers and retry backoff (see resilience.py)
+BREAKER_FAILURES = int(os.environ.get('TRACKER_BREAKER_FAILURES', '3'))  # consecutive failures before an endpoint's circuit opens
+RETRY_BASE_SECONDS = float(os.environ.get('TRACKER_RETRY_BASE_SECONDS', '5'))  # first backoff delay, doubled per failed retry
+RETRY_MAX_SECONDS = float(os.environ.get('TRACKER_RETRY_MAX_SECONDS', '300'))  # backoff ceiling
+
+# Request body compression (see http_compression.py)
+COMPRESS_ENCODING = os.environ.get('TRACKER_COMPRESS', 'auto').lower()  # auto, gzip, zstd or off
+COMPRESS_MIN_BYTES = int(os.environ.get('TRACKER_COMPRESS_MIN_BYTES', '1024'))  # smaller bodies are sent as-is
+WIRE_FORMAT = os.environ.get('TRACKER_WIRE_FORMAT', 'auto').lower()  # ingest body: auto (columnar once the server offers it) or json
+
+# Local queue (agent.db) settings
+DB_SYNCHRONOUS = os.environ.get('TRACKER_DB_SYNCHRONOUS', 'NORMAL').upper()  # OFF, NORMAL, FULL or EXTRA (WAL journal)
+ACTIVITY_FLUSH_ROWS = int(os.environ.get('TRACKER_ACTIVITY_FLUSH_ROWS', '5'))  # buffered minute rows per commit
+ACTIVITY_MAX_DELAY = int(os.environ.get('TRACKER_ACTIVITY_MAX_DELAY', '120'))  # seconds a buffered row may wait (durability window)
+PACK_SEGMENT_MB = int(os.environ.get('TRACKER_PACK_SEGMENT_MB', '32'))  # screenshot pack segment size before rolling to a new one
+SCREENSHOT_UPLOAD_BATCH = int(os.environ.get('TRACKER_SCREENSHOT_UPLOAD_BATCH', '10'))  # initial screenshots per multipart upload
+SCREENSHOT_UPLOAD_MAX_BATCH = int(os.environ.get('TRACKER_SCREENSHOT_UPLOAD_MAX_BATCH', '20'))  # upper bound (PHP max_file_uploads defaults to 20)
+SCREENSHOT_RESUMABLE_KB = int(os.environ.get('TRACKER_SCREENSHOT_RESUMABLE_KB', '1024'))  # screenshots this large upload in resumable parts (0 = never)
+SCREENSHOT_PART_KB = int(os.environ.get('TRACKER_SCREENSHOT_PART_KB', '512'))  # bytes per resumable part
+
+# Adaptive sync batching (see sync_tuning.py)
+SYNC_TARGET_SECONDS = float(os.environ.get('TRACKER_SYNC_TARGET_SECONDS', '5'))  # round trip a chunk should stay under
+SYNC_ACTIVITY_MIN_ROWS = int(os.environ.get('TRACKER_SYNC_ACTIVITY_MIN_ROWS', '20'))
+SYNC_ACTIVITY_MAX_ROWS = int(os.environ.get('TRACKER_SYNC_ACTIVITY_MAX_ROWS', '5000'))
+SYNC_MAX_REQUEST_MB = int(os.environ.get('TRACKER_SYNC_MAX_REQUEST_MB', '7'))  # encoded bytes per request (PHP post_max_size defaults to 8M)
+SYNC_INFLIGHT_MB = int(os.environ.get('TRACKER_SYNC_INFLIGHT_MB', '16'))  # request bodies built or in flight at once (see streaming.py)
+OUTBOX_BATCH_SIZE = int(os.environ.get('TRACKER_OUTBOX_BATCH', '200'))  # queued website/application/device events shipped per kind per sync
+
+# Sync priority lanes (see sync_lanes.py): share of dispatch when lanes compete, and per-lane batch limits
+SYNC_WEIGHT_CONTROL = int(os.environ.get('TRACKER_SYNC_WEIGHT_CONTROL', '16'))  # device events
+SYNC_WEIGHT_ACTIVITY = int(os.environ.get('TRACKER_SYNC_WEIGHT_ACTIVITY', '4'))  # activity chunks, website and application events
+SYNC_WEIGHT_SCREENSHOTS = int(os.environ.get('TRACKER_SYNC_WEIGHT_SCREENSHOTS', '1'))
+SYNC_CONTROL_BATCH = int(os.environ.get('TRACKER_SYNC_CONTROL_BATCH', '500'))  # device events shipped per sync
+SYNC_SCREENSHOT_ROUND_MB = int(os.environ.get('TRACKER_SYNC_SCREENSHOT_ROUND_MB', '24'))  # screenshot bytes sent per sync; the rest waits (0 = no cap)
+
+# Offline backlog disk budget, per stream (see storage_governor.py for the eviction order)
+SCREENSHOT_BUDGET_MB = int(os.environ.get('TRACKER_SCREENSHOT_BUDGET_MB', '500'))
+ACTIVITY_BUDGET_MB = int(os.environ.get('TRACKER_ACTIVITY_BUDGET_MB', '50'))
+EVENTS_BUDGET_MB = int(os.environ.get('TRACKER_EVENTS_BUDGET_MB', '20'))
+STORAGE_CHECK_INTERVAL = int(os.environ.get('TRACKER_STORAGE_CHECK_INTERVAL', '60'))  # seconds between budget checks
+
+# Roll-up of old minute activity into spans while the backlog is large (see compaction.py)
+ROLLUP_BACKLOG_ROWS = int(os.environ.get('TRACKER_ROLLUP_BACKLOG_ROWS', '2000'))  # pending activity rows before roll-up starts
+ROLLUP_MIN_AGE_HOURS = int(os.environ.get('TRACKER_ROLLUP_MIN_AGE_HOURS', '6'))  # only minutes older than this are merged
+ROLLUP_SPAN_SECONDS = int(os.environ.get('TRACKER_ROLLUP_SPAN_SECONDS', '900'))  # span length; should divide 3600
+
+# Upload bandwidth (can be overridden by server, per machine; see bandwidth.py)
+UPLOAD_RATE_KB_S = int(os.environ.get('TRACKER_UPLOAD_RATE_KB_S', '0'))  # average upload rate across all requests (0 = unlimited)
+UPLOAD_BURST_KB = int(os.environ.get('TRACKER_UPLOAD_BURST_KB', '0'))  # bytes that may go out at once (0 = one second at the rate)
+BULK_UPLOAD_WINDOW = os.environ.get('TRACKER_BULK_UPLOAD_WINDOW', '')  # local times screenshots may upload, e.g. "18:00-08:00" (empty = any time)
+
+# Collection fidelity under a growing sync backlog (see degradation.py for the ladder)
+DEGRADE_ENABLED = os.environ.get('TRACKER_DEGRADE', '1') not in ('0', 'false', 'False')
+DEGRADE_START_SCREENSHOTS = int(os.environ.get('TRACKER_DEGRADE_START_SCREENSHOTS', '50'))  # pending screenshots that reach level 1
+DEGRADE_START_HOURS = float(os.environ.get('TRACKER_DEGRADE_START_HOURS', '2'))  # age of the oldest pending row that reaches level 1
+
 # Device monitoring settings (can be overridden by server)
 # Note: This is loaded dynamically and should be checked via os.environ in monitoring module
 DEVICE_MONITORING_ENABLED = os.environ.get('TRACKER_DEVICE_MONITORING', '0') not in ('0', 'false', 'False')
@@ -97,10 +162,34 @@ def get_application_monitoring_interval():
     """Get application monitoring interval in seconds (reads from environment)"""
     return int(os.environ.get('TRACKER_APPLICATION_MONITORING_INTERVAL', '2'))
 
+def get_upload_rate_kb_s():
+    """Get the upload rate limit in KB/s, 0 for none (reads from environment)"""
+    return int(os.environ.get('TRACKER_UPLOAD_RATE_KB_S', str(UPLOAD_RATE_KB_S)))
+
+def get_upload_burst_kb():
+    """Get the upload burst size in KB, 0 for one second at the rate (reads from environment)"""
+    return int(os.environ.get('TRACKER_UPLOAD_BURST_KB', str(UPLOAD_BURST_KB)))
+
+def get_bulk_upload_window():
+    """Get the local time windows in which screenshots may upload, empty for any time (reads from environment)"""
+    return os.environ.get('TRACKER_BULK_UPLOAD_WINDOW', BULK_UPLOAD_WINDOW)
+
+# Settings version applied from the last ingest response (None until the first full settings block,
+# so a restarted agent always gets one)
+_settings_version = None
+
+def get_settings_version():
+    """Settings version this agent has applied, sent with every sync"""
+    return _settings_version
+
 def update_from_server_response(server_response):
     """Update configuration from server response and log changes"""
+    global _settings_version
     if not isinstance(server_response, dict):
         return
+    # Server confirmed our version: no settings block, nothing to rewrite
+    if server_response.get('settings_unchanged') and 'sync_interval_seconds' not in server_response:
+        return
     
     import logging
     log = logging.getLogger('tracker_agent.config')
@@ -212,6 +301,26 @@ def update_from_server_response(server_response):
         except Exception:
             pass
     
+    # Update upload bandwidth limits
+    for key, env, default in (('upload_rate_kb_s', 'TRACKER_UPLOAD_RATE_KB_S', UPLOAD_RATE_KB_S), ('upload_burst_kb', 'TRACKER_UPLOAD_BURST_KB', UPLOAD_BURST_KB)):
+        if key in server_response:
+            try:
+                value = int(server_response[key])
+                if value >= 0:
+                    old_val = os.environ.get(env, str(default))
+                    os.environ[env] = str(value)
+                    if old_val != str(value):
+                        settings_updated.append(f"{key}={old_val}→{value}")
+            except Exception:
+                pass
+
+    if 'bulk_upload_window' in server_response:
+        val = str(server_response['bulk_upload_window'] or '')
+        old_val = os.environ.get('TRACKER_BULK_UPLOAD_WINDOW', BULK_UPLOAD_WINDOW)
+        os.environ['TRACKER_BULK_UPLOAD_WINDOW'] = val
+        if old_val != val:
+            settings_updated.append(f"bulk_upload_window={old_val or 'any time'}→{val or 'any time'}")
+
     # Log all setting changes
     if settings_updated:
         log.info('Settings updated from server: %s', ', '.join(settings_updated))
@@ -227,6 +336,8 @@ def update_from_server_response(server_response):
         'website_monitoring': os.environ.get('TRACKER_WEBSITE_MONITORING', '1'),
         'website_monitoring_interval': os.environ.get('TRACKER_WEBSITE_MONITORING_INTERVAL', '1')
     }
+    if 'settings_version' in server_response:
+        _settings_version = server_response['settings_version']
     if settings_updated:
         log.info('Current active settings: sync_interval=%ss, parallel_workers=%s, delete_screenshots=%s, device_monitoring=%s, screenshots_enabled=%s, screenshot_interval=%ss, website_monitoring=%s, website_monitoring_interval=%ss',
                  current_settings['sync_interval'], current_settings['parallel_workers'],
@@ -0,0 +1,111 @@
+"""
+Degradation Module for TrackerV3 Agent
+Lowers collection fidelity step by step while the sync backlog grows, and restores it as the backlog drains
+"""
+import os
+import sys
+import time
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import DEGRADE_ENABLED, DEGRADE_START_SCREENSHOTS, DEGRADE_START_HOURS
+    from . import bandwidth
+except ImportError:
+    from config import DEGRADE_ENABLED, DEGRADE_START_SCREENSHOTS, DEGRADE_START_HOURS
+    import bandwidth
+
+log = logging.getLogger('tracker_agent.degradation')
+
+# Degradation ladder. Backlog pressure is the larger of pending screenshots / DEGRADE_START_SCREENSHOTS
+# and age of the oldest pending activity or screenshot / DEGRADE_START_HOURS. Screenshots give up
+# fidelity first (they are most of the bytes), and scans slow down only once screenshots are at their
+# floor; device scans are never slowed, since blocking depends on them.
+#   level  pressure  JPEG/WebP quality  resolution  screenshot interval  website/application scans
+#   0      -         100%               100%        x1                   x1
+#   1      1         75%                100%        x1                   x1
+#   2      2         50%                75%         x1                   x1
+#   3      4         50%                50%         x2                   x1
+#   4      8         50%                50%         x4                   x2
+#   5      16        50%                50%         x4                   x4
+LADDER = (
+    # (pressure, quality factor, resolution scale, screenshot interval factor, scan interval factor)
+    (0, 1.0, 1.0, 1, 1),
+    (1, 0.75, 1.0, 1, 1),
+    (2, 0.5, 0.75, 1, 1),
+    (4, 0.5, 0.5, 2, 1),
+    (8, 0.5, 0.5, 4, 2),
+    (16, 0.5, 0.5, 4, 4),
+)
+
+# A level is left only once pressure is below this share of what entered it
+_RESTORE_BELOW = 0.5
+_MIN_QUALITY = 10
+
+
+class DegradationController:
+    """Moves one rung along LADDER per update(): up while backlog pressure has reached the next
+    level, down once it has fallen well below the current one, so fidelity does not flap
+    around a threshold. Collectors read the current level's settings through the helpers."""
+
+    def __init__(self, activity_queue, screenshot_queue, start_screenshots=None, start_hours=None, enabled=None):
+        self.activity_queue = activity_queue
+        self.screenshot_queue = screenshot_queue
+        self.start_screenshots = max(1, start_screenshots or DEGRADE_START_SCREENSHOTS)
+        self.start_seconds = max(60.0, (start_hours or DEGRADE_START_HOURS) * 3600)
+        self.enabled = DEGRADE_ENABLED if enabled is None else enabled
+        self.level = 0
+
+    def pressure(self, now=None):
+        """Backlog pressure in units of the level 1 threshold"""
+        now = time.time() if now is None else now
+        oldest = [self.activity_queue.oldest('start_time')]
+        depth = 0.0
+        # Screenshots held back on purpose until their upload window are not a backlog
+        if not bandwidth.bulk_deferred(now):
+            depth = self.screenshot_queue.backlog() / self.start_screenshots
+            oldest.append(self.screenshot_queue.oldest('taken_at'))
+        oldest = [t for t in oldest if t is not None]
+        age = (now - min(oldest)) / self.start_seconds if oldest else 0.0
+        return max(depth, age)
+
+    def update(self, now=None):
+        """Re-measure the backlog and move at most one level. Returns the current level."""
+        if not self.enabled:
+            return self.level
+        pressure = self.pressure(now)
+        old = self.level
+        if self.level + 1 < len(LADDER) and pressure >= LADDER[self.level + 1][0]:
+            self.level += 1
+        elif self.level > 0 and pressure < LADDER[self.level][0] * _RESTORE_BELOW:
+            self.level -= 1
+        if self.level > old:
+            log.warning('Sync backlog growing (pressure %.1f): collection fidelity down to level %d of %d (%s)',
+                        pressure, self.level, len(LADDER) - 1, self.describe())
+        elif self.level < old:
+            log.info('Sync backlog draining (pressure %.1f): collection fidelity back to level %d (%s)',
+                     pressure, self.level, self.describe() if self.level else 'full')
+        return self.level
+
+    def describe(self):
+        _, quality, scale, shot_factor, scan_factor = LADDER[self.level]
+        return 'quality x%g, resolution x%g, screenshot interval x%d, scan intervals x%d' % (
+            quality, scale, shot_factor, scan_factor)
+
+    def screenshot_quality(self, quality):
+        """JPEG/WebP quality to use instead of the configured `quality`"""
+        factor = LADDER[self.level][1]
+        return quality if factor >= 1 else max(min(quality, _MIN_QUALITY), int(quality * factor))
+
+    def screenshot_scale(self):
+        """Factor to scale screenshots by before encoding (1.0 = full resolution)"""
+        return LADDER[self.level][2]
+
+    def screenshot_interval(self, seconds):
+        return seconds * LADDER[self.level][3]
+
+    def scan_interval(self, seconds):
+        """Interval for website and application scans"""
+        return seconds * LADDER[self.level][4]
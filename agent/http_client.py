@@ -0,0 +1,162 @@
+"""
+HTTP Client Module for TrackerV3 Agent
+One pooled, keep-alive requests.Session shared by every module that talks to the server
+"""
+import os
+import sys
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import (
+        INGEST_URL, SCREENSHOT_UPLOAD_URL, DEVICE_API_URL, PERMISSION_API_URL,
+        WEBSITE_API_URL, APPLICATION_API_URL, HEALTH_URL, PARALLEL_WORKERS, HTTP_CONNECT_TIMEOUT,
+        UPLOAD_MAX_IN_FLIGHT
+    )
+    from . import resilience
+    from . import bandwidth
+    from .streaming import BodySourceError
+except ImportError:
+    from config import (
+        INGEST_URL, SCREENSHOT_UPLOAD_URL, DEVICE_API_URL, PERMISSION_API_URL,
+        WEBSITE_API_URL, APPLICATION_API_URL, HEALTH_URL, PARALLEL_WORKERS, HTTP_CONNECT_TIMEOUT,
+        UPLOAD_MAX_IN_FLIGHT
+    )
+    import resilience
+    import bandwidth
+    from streaming import BodySourceError
+
+log = logging.getLogger('tracker_agent.http_client')
+
+# (connect, read) timeouts per endpoint; the read timeout reflects how much work the server does per request
+ENDPOINT_TIMEOUTS = {
+    INGEST_URL: (HTTP_CONNECT_TIMEOUT, 30),
+    SCREENSHOT_UPLOAD_URL: (HTTP_CONNECT_TIMEOUT, 60),
+    PERMISSION_API_URL: (HTTP_CONNECT_TIMEOUT, 5),
+    DEVICE_API_URL: (HTTP_CONNECT_TIMEOUT, 10),
+    WEBSITE_API_URL: (HTTP_CONNECT_TIMEOUT, 10),
+    APPLICATION_API_URL: (HTTP_CONNECT_TIMEOUT, 10),
+    HEALTH_URL: (HTTP_CONNECT_TIMEOUT, 5),
+}
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, 15)
+
+# Connections kept for the collectors' event posts on top of the parallel sync workers
+_EXTRA_CONNECTIONS = 2
+
+_lock = threading.Lock()
+_session = None
+_pool_size = 0
+
+
+def _endpoint(url):
+    return url.split('?', 1)[0]
+
+
+def timeout_for(url):
+    """(connect, read) timeout for `url` (query string ignored)"""
+    return ENDPOINT_TIMEOUTS.get(_endpoint(url), DEFAULT_TIMEOUT)
+
+
+def _wanted_pool_size():
+    try:
+        workers = int(os.environ.get('TRACKER_PARALLEL_WORKERS', str(PARALLEL_WORKERS)))
+    except ValueError:
+        workers = PARALLEL_WORKERS
+    # The upload engine caps concurrent calls at UPLOAD_MAX_IN_FLIGHT; one more for calls made outside it
+    return max(min(max(workers, 1), 10) + _EXTRA_CONNECTIONS, UPLOAD_MAX_IN_FLIGHT + 1)
+
+
+def _mount(session, size):
+    # All endpoints live on one server, so one pool per scheme is enough
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=False)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def get_session():
+    """Return the shared Session, growing its pool if the server raised parallel_sync_workers"""
+    global _session, _pool_size
+    wanted = _wanted_pool_size()
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _mount(_session, wanted)
+            _pool_size = wanted
+        elif wanted > _pool_size:
+            # Existing pooled connections are dropped with the old adapter; new ones are opened on demand
+            _mount(_session, wanted)
+            log.debug('HTTP pool resized %d -> %d', _pool_size, wanted)
+            _pool_size = wanted
+        return _session
+
+
+def _probe_health():
+    """Half-open probe: is the server answering (and its database reachable) again?"""
+    response = get_session().get(HEALTH_URL, timeout=timeout_for(HEALTH_URL))
+    return response.status_code == 200
+
+
+# Circuit breakers and offline state for every request made through this module
+state = resilience.ServerState(probe=_probe_health)
+
+
+def online():
+    """False while the agent is offline (probes the server when a retry is due)"""
+    return state.online()
+
+
+def ready(url):
+    """True if a request to `url` would be attempted now (probes the server when a retry is due)"""
+    return state.ready(_endpoint(url))
+
+
+def request(method, url, timeout=None, **kwargs):
+    """Send through the shared session, guarded by the endpoint's circuit breaker.
+
+    Raises resilience.CircuitOpenError without touching the network while the
+    agent is offline or the endpoint's circuit is open.
+    """
+    endpoint = _endpoint(url)
+    state.check(endpoint)
+    if 'data' in kwargs:
+        kwargs['data'] = bandwidth.throttled(kwargs['data'])
+    try:
+        response = get_session().request(method, url, timeout=timeout or timeout_for(url), **kwargs)
+    except BodySourceError:
+        # A local file changed under a streamed body: says nothing about the server
+        state.breaker(endpoint).release()
+        raise
+    except requests.exceptions.ConnectionError:
+        # Includes connect timeouts; a read timeout (below) means the server was reached but is struggling
+        state.record_error(endpoint, unreachable=True)
+        raise
+    except Exception:
+        state.record_error(endpoint, unreachable=False)
+        raise
+    state.record_response(endpoint, response.status_code,
+                          resilience.parse_retry_after(response.headers.get('Retry-After')))
+    return response
+
+
+def post(url, timeout=None, **kwargs):
+    """POST through the shared session, using the endpoint's timeout unless one is given"""
+    return request('POST', url, timeout=timeout, **kwargs)
+
+
+def get(url, timeout=None, **kwargs):
+    """GET through the shared session, using the endpoint's timeout unless one is given"""
+    return request('GET', url, timeout=timeout, **kwargs)
+
+
+def close():
+    global _session, _pool_size
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+            _pool_size = 0
@@ -0,0 +1,233 @@
+"""
+HTTP Compression Module for TrackerV3 Agent
+Content-encoded (gzip, optionally zstd) request bodies, JSON or columnar, with fallback for older servers
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import COMPRESS_ENCODING, COMPRESS_MIN_BYTES, WIRE_FORMAT
+    from . import http_client
+    from . import columnar
+except ImportError:
+    from config import COMPRESS_ENCODING, COMPRESS_MIN_BYTES, WIRE_FORMAT
+    import http_client
+    import columnar
+
+# zstd is optional: only used when the zstandard package is installed and the server advertises it
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except Exception:
+    _HAS_ZSTD = False
+
+log = logging.getLogger('tracker_agent.http_compression')
+
+# Re-try compression this long after a server turned out not to understand it
+_REPROBE_SECONDS = 3600
+
+_lock = threading.Lock()
+_server_encodings = None  # set advertised by the server (Accept-Encoding response header), None until seen
+_disabled_until = 0.0  # identity only until then (server did not decode a compressed body)
+_server_formats = {}  # endpoint -> body content types it advertised (Accept-Post response header)
+_columnar_disabled_until = {}  # endpoint -> JSON only until then (server did not decode a columnar body)
+_local = threading.local()  # per-thread zstd compressor
+
+
+def _zstd_compress(data):
+    # A ZstdCompressor must not be used by two threads at once: keep one per thread
+    compressor = getattr(_local, 'zstd', None)
+    if compressor is None:
+        compressor = _local.zstd = zstandard.ZstdCompressor(level=6)
+    return compressor.compress(data)
+
+
+def _encoders():
+    encoders = {'gzip': lambda data: gzip.compress(data, compresslevel=6, mtime=0)}
+    if _HAS_ZSTD:
+        encoders['zstd'] = _zstd_compress
+    return encoders
+
+
+_ENCODERS = _encoders()
+
+
+def _parse_encodings(value):
+    return {part.split(';')[0].strip().lower() for part in (value or '').split(',') if part.strip()}
+
+
+def choose_encoding(size):
+    """Content-Encoding to use for a body of `size` bytes, or None to send it as-is"""
+    configured = (COMPRESS_ENCODING or 'auto').lower()
+    if configured in ('off', 'none', 'identity', '0') or size < COMPRESS_MIN_BYTES:
+        return None
+    with _lock:
+        if time.time() < _disabled_until:
+            return None
+        advertised = _server_encodings
+    if configured in _ENCODERS:
+        wanted = [configured]
+    else:
+        wanted = ['zstd', 'gzip']
+    for encoding in wanted:
+        if encoding not in _ENCODERS:
+            continue
+        # Until the server has advertised what it takes, only gzip is assumed
+        if advertised is None and encoding != 'gzip':
+            continue
+        if advertised is not None and encoding not in advertised:
+            continue
+        return encoding
+    return None
+
+
+def encode_body(data, encoding):
+    """Return (body, extra headers) for raw bytes `data` under `encoding` (None = identity)"""
+    if encoding is None:
+        return data, {}
+    return _ENCODERS[encoding](data), {'Content-Encoding': encoding}
+
+
+def _learn(response, url=None):
+    global _server_encodings
+    advertised = response.headers.get('Accept-Encoding') if response is not None else None
+    if advertised:
+        with _lock:
+            _server_encodings = _parse_encodings(advertised)
+    formats = response.headers.get('Accept-Post') if response is not None and url is not None else None
+    if formats:
+        with _lock:
+            _server_formats[_endpoint(url)] = _parse_encodings(formats)
+
+
+def _endpoint(url):
+    return url.split('?', 1)[0]
+
+
+def choose_format(url):
+    """Body content type to use for `url`: columnar once the endpoint has advertised it, else JSON"""
+    configured = (WIRE_FORMAT or 'auto').lower()
+    if configured == 'json':
+        return 'application/json'
+    endpoint = _endpoint(url)
+    with _lock:
+        if time.time() < _columnar_disabled_until.get(endpoint, 0.0):
+            return 'application/json'
+        advertised = _server_formats.get(endpoint, set())
+    return columnar.CONTENT_TYPE if columnar.CONTENT_TYPE in advertised else 'application/json'
+
+
+def _rejection(response, encoding, content_type):
+    """What a refused POST says the server could not read: 'encoding', 'format' or None.
+
+    Only a 415, or a 400 whose error names the body encoding or format, counts;
+    any other 400 is about the payload and is returned to the caller as-is.
+    Servers that predate compressed or columnar bodies try to read them as
+    JSON, so their "Invalid JSON" blames whichever of the two was not JSON.
+    """
+    if response.status_code not in (400, 415):
+        return None
+    try:
+        error = str(response.json().get('error', '')).lower()
+    except Exception:
+        error = ''
+    if 'encoding' in error or 'compressed' in error:
+        return 'encoding' if encoding is not None else None
+    if 'columnar' in error or 'content-type' in error:
+        return 'format' if content_type != 'application/json' else None
+    if 'json' in error or response.status_code == 415:
+        if encoding is not None:
+            return 'encoding'
+        if content_type != 'application/json':
+            return 'format'
+    return None
+
+
+def _send(url, data, content_type, encoding, headers, timeout, kwargs):
+    body, extra = encode_body(data, encoding)
+    response = http_client.post(url, data=body, headers={**headers, 'Content-Type': content_type, **extra},
+                                timeout=timeout, **kwargs)
+    _learn(response, url)
+    if encoding is not None:
+        log.debug('POST %s: %d -> %d bytes (%s)', url, len(data), len(body), encoding)
+    return response
+
+
+def _refuse_encoding(url, response, encoding, size):
+    """Stop using `encoding` after the server refused it. Returns the encoding to retry with."""
+    global _disabled_until, _server_encodings
+    with _lock:
+        if response.status_code == 415:
+            # The server says what it takes: drop this encoding for the rest of the session
+            _server_encodings = (_server_encodings if _server_encodings is not None else {'gzip'}) - {encoding}
+        else:
+            # An older server that never decoded the body: identity only until the next reprobe
+            _disabled_until = time.time() + _REPROBE_SECONDS
+    retry_encoding = choose_encoding(size)
+    log.info('%s did not accept a %s request body, retrying with %s', _endpoint(url), encoding, retry_encoding or 'identity')
+    return retry_encoding
+
+
+def post_payload(url, payload, timeout=None, **kwargs):
+    """POST `payload` in the most compact format `url` accepts. Returns the Response.
+
+    JSON until the server lists the columnar type in an Accept-Post response
+    header (api/ingest.php does; older servers never will), columnar after
+    that. Payloads that do not fit the columnar schema go as JSON. A refused
+    columnar body (see _rejection) is sent once more as JSON under the same
+    Content-Encoding, and the endpoint takes JSON for _REPROBE_SECONDS.
+    """
+    if choose_format(url) != columnar.CONTENT_TYPE:
+        return post_json(url, payload, timeout=timeout, **kwargs)
+    try:
+        data = columnar.encode(payload)
+    except ValueError as e:
+        log.debug('Sending JSON instead of columnar: %s', e)
+        return post_json(url, payload, timeout=timeout, **kwargs)
+    headers = dict(kwargs.pop('headers', None) or {})
+    encoding = choose_encoding(len(data))
+    response = _send(url, data, columnar.CONTENT_TYPE, encoding, headers, timeout, kwargs)
+    refused = _rejection(response, encoding, columnar.CONTENT_TYPE)
+    if refused is None:
+        return response
+    if refused == 'encoding':
+        encoding = _refuse_encoding(url, response, encoding, len(data))
+        return _send(url, data, columnar.CONTENT_TYPE, encoding, headers, timeout, kwargs)
+    with _lock:
+        _columnar_disabled_until[_endpoint(url)] = time.time() + _REPROBE_SECONDS
+    log.info('Server did not accept a columnar body; sending JSON to %s for %d s', _endpoint(url), _REPROBE_SECONDS)
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return _send(url, data, 'application/json', encoding, headers, timeout, kwargs)
+
+
+def post_json(url, payload, timeout=None, **kwargs):
+    """POST `payload` as JSON through the shared session, compressed when worthwhile. Returns the Response."""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return post_body(url, data, 'application/json', timeout=timeout, **kwargs)
+
+
+def post_body(url, data, content_type, timeout=None, **kwargs):
+    """POST raw bytes `data` through the shared session, compressed when worthwhile. Returns the Response.
+
+    Negotiation: gzip is tried first; servers advertise what they decode in an
+    Accept-Encoding response header, which enables zstd when both sides have
+    it. A body the server could not decode (see _rejection) is sent once more
+    with what it accepts: a 415 drops the encoding for the rest of the
+    session, a 400 from an older server sends uncompressed for
+    _REPROBE_SECONDS. Any other 400 is the payload's and is not retried.
+    """
+    headers = dict(kwargs.pop('headers', None) or {})
+    encoding = choose_encoding(len(data))
+    response = _send(url, data, content_type, encoding, headers, timeout, kwargs)
+    if _rejection(response, encoding, content_type) != 'encoding':
+        return response
+    encoding = _refuse_encoding(url, response, encoding, len(data))
+    return _send(url, data, content_type, encoding, headers, timeout, kwargs)
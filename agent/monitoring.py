@@ -7,7 +7,6 @@ import sys
 import time
 import hashlib
 import logging
-import requests
 import re
 from datetime import datetime
 
@@ -19,11 +18,13 @@ try:
         DEVICE_CHECK_INTERVAL, DEVICE_API_URL, MACHINE_ID, USERNAME, HOSTNAME, is_device_monitoring_enabled
     )
     from .permission import is_device_blocked, is_device_allowed, get_device_permission
+    from . import outbox
 except ImportError:
     from config import (
         DEVICE_CHECK_INTERVAL, DEVICE_API_URL, MACHINE_ID, USERNAME, HOSTNAME, is_device_monitoring_enabled
     )
     from permission import is_device_blocked, is_device_allowed, get_device_permission
+    import outbox
 
 log = logging.getLogger('tracker_agent.monitoring')
 
@@ -711,7 +712,7 @@ def scan_devices():
                 try:
                     report_device(device, device_hash, 'connected', is_blocked)
                     _seen_devices[device_hash]['reported'] = True
-                    log.info(f"Device info synced to server: {device_name}")
+                    log.info(f"Device info queued for server: {device_name}")
                     
                     if monitoring_enabled and is_blocked:
                         log.warning(f"⚠️ Device {device_name} is BLOCKED - popup will be shown")
@@ -837,7 +838,7 @@ def scan_devices():
         log.error(f"Scan devices traceback: {traceback.format_exc()}")
 
 def report_device(device, device_hash, action, is_blocked):
-    """Report device event to server"""
+    """Queue device event for delivery to server (shipped by the sync path)"""
     try:
         payload = {
             'machine_id': MACHINE_ID,
@@ -855,22 +856,15 @@ def report_device(device, device_hash, action, is_blocked):
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        response = requests.post(
-            DEVICE_API_URL,
-            json=payload,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            log.debug(f"Device event reported: {action} - {device.get('name')}")
-            return True
-        else:
-            log.warning(f"Failed to report device event: {response.status_code}")
-            return False
+        return outbox.enqueue('device', action, payload)
     except Exception as e:
-        log.debug(f"Error reporting device: {e}")
+        log.warning(f"Error queueing device event: {e}")
         return False
 
+def _on_device_response(action, payload, result):
+    """Handle the server's answer for a delivered device event"""
+    log.debug(f"Device event reported: {action} - {payload.get('device_name')} (permission: {result.get('permission')})")
+
 def block_device_action(device):
     """Attempt to block/eject device (platform specific) - called repeatedly to prevent access"""
     device_name = device.get('name', 'Unknown Device')
@@ -1008,3 +1002,4 @@ def block_device_action(device):
         except Exception as e:
             log.debug(f"Could not eject device: {e}")
 
+outbox.register_handler('device', DEVICE_API_URL, _on_device_response)
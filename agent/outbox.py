@@ -0,0 +1,219 @@
+"""
+Outbox Module for TrackerV3 Agent
+Durable local queue for website, application and device events
+"""
+import os
+import sys
+import json
+import time
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import OUTBOX_BATCH_SIZE
+    from .store import get_store
+    from .sync_queue import StreamQueue
+    from . import http_compression
+    from .client_ids import row_uid
+    from . import upload_engine
+except ImportError:
+    from config import OUTBOX_BATCH_SIZE
+    from store import get_store
+    from sync_queue import StreamQueue
+    import http_compression
+    from client_ids import row_uid
+    import upload_engine
+
+log = logging.getLogger('tracker_agent.outbox')
+
+# One table per event type so each stream drains (and fails) independently
+OUTBOX_TABLES = {
+    'website': 'outbox_website',
+    'application': 'outbox_application',
+    'device': 'outbox_device',
+}
+
+# kind -> (url, on_response callback or None); registered by the monitoring modules
+_handlers = {}
+_queues = {}
+# Callbacks run with the kind after every enqueue (the agent wakes its sync worker)
+_listeners = []
+
+# HTTP statuses worth retrying; any other 4xx means the event itself is bad and is dropped
+_RETRY_STATUSES = (404, 408, 429)
+
+
+def _queue(kind):
+    queue = _queues.get(kind)
+    if queue is None:
+        queue = _queues[kind] = StreamQueue(OUTBOX_TABLES[kind], ('action', 'payload'), stream=f'outbox_{kind}')
+    return queue
+
+
+def register_handler(kind, url, on_response=None):
+    """Register the endpoint (and optional response callback) used to ship events of `kind`"""
+    if kind not in OUTBOX_TABLES:
+        raise ValueError(f'Unknown outbox kind: {kind}')
+    _handlers[kind] = (url, on_response)
+
+
+def registered():
+    """Event kinds that have a delivery endpoint"""
+    return list(_handlers)
+
+
+def add_listener(callback):
+    """Call `callback(kind)` after each event is queued. It must not block."""
+    _listeners.append(callback)
+
+
+def enqueue(kind, action, payload):
+    """Persist one event for later delivery. Never touches the network."""
+    table = OUTBOX_TABLES[kind]
+    get_store().execute(
+        f'INSERT INTO {table} (created_at, action, payload) VALUES (?,?,?)',
+        (int(time.time()), action, json.dumps(payload, separators=(',', ':')))
+    )
+    log.debug('Queued %s event: %s', kind, action)
+    for callback in _listeners:
+        try:
+            callback(kind)
+        except Exception as e:
+            log.debug('Outbox listener error: %s', e)
+    return True
+
+
+def pending(kind, limit=None):
+    """Return up to `limit` pending events of `kind` as (id, action, payload_dict), oldest first"""
+    rows = _queue(kind).peek(limit or OUTBOX_BATCH_SIZE)
+    return [(rid, action, json.loads(payload)) for rid, action, payload in rows]
+
+
+def ack(kind, ids):
+    """Delete delivered events"""
+    if not ids:
+        return
+    _queue(kind).ack(ids)
+
+
+def drop_oldest(kind, limit):
+    """Discard up to `limit` of the oldest pending events of `kind`. Returns (count, payload bytes)."""
+    queue = _queue(kind)
+    rows = get_store().query(
+        f'SELECT id, LENGTH(payload) FROM {queue.table} WHERE id > ? ORDER BY id ASC LIMIT ?',
+        (queue.watermark, int(limit))
+    )
+    if not rows:
+        return 0, 0
+    queue.remove([r[0] for r in rows])
+    return len(rows), sum(r[1] for r in rows)
+
+
+def payload_bytes():
+    """Approximate bytes held by all pending events"""
+    store = get_store()
+    total = 0
+    for table in OUTBOX_TABLES.values():
+        count, size = store.query_one(f'SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM {table}')
+        total += size + count * 24  # rowid, created_at and action per row
+    return total
+
+
+def load_application_sessions(limit=None):
+    """Pair queued application start reports with their duration updates.
+
+    A 'report' row that is the oldest pending row for its application and is
+    directly followed (for that application) by an 'update_duration' row is a
+    completed session. Those are returned in api/ingest.php's
+    `application_usage` format so a backlog ships in one request; everything
+    else stays queued and goes out event by event through submit(), which
+    sync_now() runs in the activity lane. The server matches duration updates
+    to the most recent session_start, so shipping completed (older) sessions
+    this way never re-targets a later update.
+
+    Returns (sessions, outbox_ids).
+    """
+    rows = pending('application', limit)
+    open_reports = {}
+    blocked_keys = set()
+    sessions = []
+    ids = []
+    for rid, action, payload in rows:
+        key = (payload.get('application_name'), payload.get('process_name'))
+        if key in blocked_keys:
+            continue
+        if action == 'report':
+            if key in open_reports:
+                # Two starts in a row: the first one stays open, stop pairing this app
+                blocked_keys.add(key)
+                continue
+            open_reports[key] = (rid, payload)
+        elif action == 'update_duration' and key in open_reports:
+            report_id, report = open_reports.pop(key)
+            sessions.append({
+                'client_uid': row_uid('application', report_id),
+                'application_name': report.get('application_name'),
+                'process_name': report.get('process_name'),
+                'window_title': report.get('window_title'),
+                'executable_path': report.get('executable_path'),
+                'session_start': report.get('session_start'),
+                'session_end': payload.get('session_end'),
+                'duration_seconds': payload.get('duration_seconds', 0),
+                'is_productive': report.get('is_productive'),
+            })
+            ids.extend((report_id, rid))
+        else:
+            # Orphan update for a session reported earlier: must be shipped first
+            blocked_keys.add(key)
+    return sessions, ids
+
+
+def _ship_kind(kind, limit):
+    url, on_response = _handlers[kind]
+    delivered = []
+    for rid, action, payload in pending(kind, limit):
+        try:
+            response = http_compression.post_json(url, payload)
+        except Exception as e:
+            log.debug('Outbox %s delivery failed, will retry: %s', kind, e)
+            break
+        status = response.status_code
+        if status == 200:
+            if on_response is not None:
+                try:
+                    on_response(action, payload, response.json())
+                except Exception as e:
+                    log.debug('Outbox %s response handler error: %s', kind, e)
+            delivered.append(rid)
+        elif 400 <= status < 500 and status not in _RETRY_STATUSES:
+            log.warning('Dropping rejected %s event (%s): HTTP %s', kind, action, status)
+            delivered.append(rid)
+        else:
+            log.debug('Outbox %s delivery got HTTP %s, will retry', kind, status)
+            break
+    ack(kind, delivered)
+    return len(delivered)
+
+
+def submit(kind, limit=None):
+    """Start delivering one batch of `kind` on the upload engine. Returns a Future of the count delivered."""
+    url, _ = _handlers[kind]
+    return upload_engine.get_engine().submit(url, _ship_kind, kind, limit)
+
+
+def report(futures):
+    """Wait for submit() futures ({kind: future}) and log what was shipped. Returns {kind: count}."""
+    shipped = {}
+    for kind, future in futures.items():
+        try:
+            count = future.result()
+        except Exception as e:
+            log.warning('Outbox %s shipping error: %s', kind, e)
+            continue
+        if count:
+            shipped[kind] = count
+    if shipped:
+        log.info('Outbox shipped: %s', ', '.join(f'{k}={v}' for k, v in shipped.items()))
+    return shipped
@@ -0,0 +1,117 @@
+"""
+Partition Module for TrackerV3 Agent
+Byte-size-aware splitting of a sync round into requests of similar encoded size
+"""
+import os
+import sys
+import heapq
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import SYNC_MAX_REQUEST_MB
+except ImportError:
+    from config import SYNC_MAX_REQUEST_MB
+
+log = logging.getLogger('tracker_agent.partition')
+
+MAX_REQUEST_BYTES = SYNC_MAX_REQUEST_MB * 1024 * 1024
+
+
+def _bins_needed(sizes, parts, max_bytes, max_items):
+    total = sum(sizes)
+    needed = max(1, parts, -(-total // max_bytes))
+    if max_items:
+        needed = max(needed, -(-len(sizes) // max_items))
+    return min(needed, max(1, len(sizes)))
+
+
+def split_contiguous(sizes, parts, max_bytes=None, max_items=None, first_extra=0):
+    """Split items (given by their encoded sizes, in order) into runs of similar byte size.
+
+    Returns [(start, end), ...] slice bounds. Runs keep the items' order, so
+    ids stay contiguous and each acknowledgement remains a range delete. The
+    target per run is the total divided over at least `parts` runs, more if
+    needed to keep every run under `max_bytes` and `max_items`. `first_extra`
+    bytes ride along with the first run (application sessions, eviction
+    counts), which therefore gets correspondingly fewer items. A single item
+    larger than `max_bytes` gets a run of its own.
+    """
+    if not sizes:
+        return []
+    max_bytes = max_bytes or MAX_REQUEST_BYTES
+    total = sum(sizes) + first_extra
+    runs = _bins_needed(sizes, parts, max_bytes, max_items)
+    # Cut where the running byte total crosses each 1/runs mark (an item goes where its middle falls)
+    bounds = []
+    start = 0
+    current = 0
+    cumulative = first_extra
+    for i, size in enumerate(sizes):
+        run = min(runs - 1, int((cumulative + size / 2) * runs // max(total, 1)))
+        if run != current and i > start:
+            bounds.append((start, i))
+            start, current = i, run
+        cumulative += size
+    bounds.append((start, len(sizes)))
+
+    if all(_fits(sizes, first, end, first_extra if first == 0 else 0, max_bytes, max_items) for first, end in bounds):
+        return bounds
+
+    # Item granularity pushed a run over a ceiling: fill runs up to the ceilings in order instead,
+    # which gives the fewest runs that fit
+    bounds = []
+    start = 0
+    load = first_extra
+    for i, size in enumerate(sizes):
+        over = load + size > max_bytes or (max_items and i - start >= max_items)
+        if i > start and over:
+            bounds.append((start, i))
+            start, load = i, 0
+        load += size
+    bounds.append((start, len(sizes)))
+    return bounds
+
+
+def _fits(sizes, start, end, extra, max_bytes, max_items):
+    if max_items and end - start > max_items:
+        return False
+    return end - start == 1 or extra + sum(sizes[start:end]) <= max_bytes
+
+
+def pack_greedy(sizes, parts, max_bytes=None, max_items=None):
+    """Greedy bin packing of independent items (given by their sizes) into balanced requests.
+
+    Largest item first, each into the currently lightest bin that still has
+    room under `max_bytes` and `max_items` (longest-processing-time first),
+    with at least `parts` bins and more when the ceilings require it.
+    Returns lists of item indexes, oldest item first within each bin.
+    """
+    if not sizes:
+        return []
+    max_bytes = max_bytes or MAX_REQUEST_BYTES
+    count = _bins_needed(sizes, parts, max_bytes, max_items)
+    heap = [(0, b) for b in range(count)]  # (bytes, bin)
+    bins = [[] for _ in range(count)]
+    for i in sorted(range(len(sizes)), key=lambda k: sizes[k], reverse=True):
+        size = sizes[i]
+        skipped = []
+        placed = None
+        while heap:
+            load, b = heapq.heappop(heap)
+            fits = (load + size <= max_bytes or not bins[b]) and (not max_items or len(bins[b]) < max_items)
+            if fits:
+                placed = (load + size, b)
+                break
+            skipped.append((load, b))
+        if placed is None:
+            # No bin has room: open another request
+            placed = (size, len(bins))
+            bins.append([])
+        bins[placed[1]].append(i)
+        heapq.heappush(heap, placed)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+    return [sorted(b) for b in bins if b]
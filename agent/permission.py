@@ -2,19 +2,25 @@
 Permission Module for TrackerV3 Agent
 Handles device blocking and permission checking
 """
-import requests
 import logging
 import sys
 import os
 import time
+import threading
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from .config import PERMISSION_API_URL, MACHINE_ID, is_device_monitoring_enabled
+    from . import http_compression
+    from . import upload_engine
+    from .resilience import CircuitOpenError
 except ImportError:
     from config import PERMISSION_API_URL, MACHINE_ID, is_device_monitoring_enabled
+    import http_compression
+    import upload_engine
+    from resilience import CircuitOpenError
 
 log = logging.getLogger('tracker_agent.permission')
 
@@ -22,6 +28,9 @@ log = logging.getLogger('tracker_agent.permission')
 _permission_cache = {}
 _cache_timeout = 10  # 10 seconds - reduced for faster permission updates from UI
 _cache_timestamps = {}
+# Devices whose stale cache entry is being refreshed in the background
+_refreshing = set()
+_refreshing_lock = threading.Lock()
 
 def get_device_permission(device_hash, device_name=None):
     """
@@ -35,7 +44,26 @@ def get_device_permission(device_hash, device_name=None):
     if device_hash in _permission_cache:
         if time.time() - _cache_timestamps.get(device_hash, 0) < _cache_timeout:
             return _permission_cache[device_hash]
+        # Stale: answer with the last decision and refresh in the background so the device scan never waits
+        with _refreshing_lock:
+            start_refresh = device_hash not in _refreshing
+            _refreshing.add(device_hash)
+        if start_refresh:
+            upload_engine.get_engine().fire(PERMISSION_API_URL, _refresh_permission, device_hash, device_name)
+        return _permission_cache[device_hash]
     
+    # First check for this device: wait for the server's answer
+    return upload_engine.get_engine().call(PERMISSION_API_URL, _fetch_permission, device_hash, device_name)
+
+def _refresh_permission(device_hash, device_name):
+    try:
+        return _fetch_permission(device_hash, device_name)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(device_hash)
+
+def _fetch_permission(device_hash, device_name=None):
+    """Ask the server for a device's permission and cache it. Returns the permission or None."""
     try:
         # Query server for device permission
         payload = {
@@ -43,10 +71,9 @@ def get_device_permission(device_hash, device_name=None):
             'device_hash': device_hash,
             'device_name': device_name
         }
-        response = requests.post(
+        response = http_compression.post_json(
             f"{PERMISSION_API_URL}?action=check",
-            json=payload,
-            timeout=5
+            payload
         )
         
         if response.status_code == 200:
@@ -63,6 +90,9 @@ def get_device_permission(device_hash, device_name=None):
             return permission
         else:
             log.warning(f"Permission API returned status {response.status_code} for device: {device_name}")
+    except CircuitOpenError:
+        # Offline: keep enforcing the last known decision instead of forgetting it
+        return _permission_cache.get(device_hash)
     except Exception as e:
         log.warning(f"Error checking device permission for {device_name}: {e}")
     
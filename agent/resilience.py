@@ -0,0 +1,213 @@
+"""
+Resilience Module for TrackerV3 Agent
+Per-endpoint circuit breakers, jittered exponential backoff and the agent's offline state
+"""
+import os
+import sys
+import time
+import random
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import BREAKER_FAILURES, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS
+except ImportError:
+    from config import BREAKER_FAILURES, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS
+
+log = logging.getLogger('tracker_agent.resilience')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Responses that say the endpoint is overloaded or broken, rather than that the request was bad
+FAILURE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while its circuit is open (or the agent is offline)"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f'{name} unavailable, retrying in {retry_in:.0f}s')
+        self.name = name
+        self.retry_in = retry_in
+
+
+def backoff_delay(attempt, base=None, maximum=None):
+    """Delay before retry number `attempt` (1-based): exponential, capped, with "equal jitter".
+
+    Half of the exponential delay is fixed and half is random, so agents that
+    lost the server at the same moment spread their retries out without any
+    of them retrying immediately.
+    """
+    base = RETRY_BASE_SECONDS if base is None else base
+    maximum = RETRY_MAX_SECONDS if maximum is None else maximum
+    delay = min(maximum, base * (2 ** max(0, attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures; open -> half-open once the
+    backoff delay has passed, letting a single trial call through; its outcome closes the
+    circuit or re-opens it with a longer delay.
+    """
+
+    def __init__(self, name, failure_threshold=None, base=None, maximum=None):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold or BREAKER_FAILURES)
+        self.base = base
+        self.maximum = maximum
+        self.state = CLOSED
+        self.failures = 0  # consecutive failures while closed
+        self.trips = 0  # consecutive openings, drives the backoff
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go ahead now. Moving to half-open admits exactly one caller."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.retry_at:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def retry_in(self):
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+        if recovered:
+            log.info('%s recovered, circuit closed', self.name)
+        return recovered
+
+    def record_failure(self, min_delay=0):
+        """Count a failure; `min_delay` is a server-requested wait (Retry-After). Returns True if it opened."""
+        with self._lock:
+            self.failures += 1
+            if self.state != HALF_OPEN and self.failures < self.failure_threshold:
+                return False
+            self.trips += 1
+            delay = max(min_delay, backoff_delay(self.trips, self.base, self.maximum))
+            self.state = OPEN
+            self.failures = 0
+            self.retry_at = time.monotonic() + delay
+            first = self.trips == 1
+        # One warning per outage; the retries that keep failing are only worth a debug line
+        (log.warning if first else log.debug)('%s failing, circuit open; retrying in %.0fs', self.name, delay)
+        return True
+
+    def release(self):
+        """Give back a half-open trial slot that was not used for a call"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+
+class ServerState:
+    """Endpoint breakers plus the server breaker behind the offline state.
+
+    Failing to connect at all takes the whole agent offline: every request
+    fails fast with CircuitOpenError (collectors keep writing to the local
+    queues) until the backoff delay has passed and a GET of api/health.php
+    succeeds. Errors and overload statuses from a reachable server only open
+    that endpoint's breaker, whose half-open trial is the next real request.
+    """
+
+    def __init__(self, probe=None):
+        self.server = CircuitBreaker('Server', failure_threshold=1)
+        self._probe = probe
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(endpoint.rsplit('/', 1)[-1])
+            return breaker
+
+    def offline(self):
+        return self.server.state != CLOSED
+
+    def _check_server(self):
+        if self.server.state == CLOSED:
+            return
+        if not self.server.allow():
+            raise CircuitOpenError('Server', self.server.retry_in())
+        # This caller holds the half-open slot: probe before letting real traffic through
+        try:
+            ok = self._probe() if self._probe is not None else True
+        except Exception as e:
+            log.debug('Health probe failed: %s', e)
+            ok = False
+        if ok:
+            self.server.record_success()
+            return
+        self.server.record_failure()
+        raise CircuitOpenError('Server', self.server.retry_in())
+
+    def check(self, endpoint):
+        """Raise CircuitOpenError unless a request to `endpoint` may be made now"""
+        self._check_server()
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.name, breaker.retry_in())
+
+    def online(self):
+        """False while offline. Probes the server if a retry is due."""
+        try:
+            self._check_server()
+        except CircuitOpenError:
+            return False
+        return True
+
+    def ready(self, endpoint):
+        """check() as a bool, without using up a half-open trial. Probes the server if one is due."""
+        if not self.online():
+            return False
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            return False
+        breaker.release()
+        return True
+
+    def record_response(self, endpoint, status_code, retry_after=None):
+        self.server.record_success()
+        breaker = self.breaker(endpoint)
+        if status_code in FAILURE_STATUSES:
+            breaker.record_failure(min_delay=retry_after or 0)
+        else:
+            breaker.record_success()
+
+    def record_error(self, endpoint, unreachable):
+        """A request raised. `unreachable`: no connection could be made (offline), else the endpoint failed."""
+        if unreachable:
+            if self.server.record_failure() and self.server.trips == 1:
+                log.warning('Working offline; events are kept in the local queues until the server answers')
+            # Not the endpoint's fault; free its trial slot if this was one
+            self.breaker(endpoint).release()
+        else:
+            self.breaker(endpoint).record_failure()
+
+    def summary(self):
+        opened = [b.name for b in list(self._breakers.values()) if b.state != CLOSED]
+        if self.offline():
+            return 'offline (retry in %.0fs)' % self.server.retry_in()
+        return 'open: ' + ', '.join(opened) if opened else 'online'
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds form only), or None"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,155 @@
+"""
+Resumable Upload Module for TrackerV3 Agent
+Large screenshots sent in parts to api/screenshot_parts.php, resuming from the last acknowledged byte
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import SCREENSHOT_PARTS_URL, SCREENSHOT_RESUMABLE_KB, SCREENSHOT_PART_KB, MACHINE_ID
+    from .store import get_store
+    from .client_ids import row_uid
+    from .schema import utc_text
+    from . import http_client
+    from . import resilience
+    from . import screenshot_store
+except ImportError:
+    from config import SCREENSHOT_PARTS_URL, SCREENSHOT_RESUMABLE_KB, SCREENSHOT_PART_KB, MACHINE_ID
+    from store import get_store
+    from client_ids import row_uid
+    from schema import utc_text
+    import http_client
+    import resilience
+    import screenshot_store
+
+log = logging.getLogger('tracker_agent.resumable_upload')
+
+MIN_BYTES = SCREENSHOT_RESUMABLE_KB * 1024
+PART_BYTES = max(64, SCREENSHOT_PART_KB) * 1024
+
+# Offset disagreements (409) tolerated per screenshot per attempt before giving up until the next round
+_MAX_CONFLICTS = 3
+# Try the parts endpoint again this long after a server turned out not to have it
+_REPROBE_SECONDS = 3600
+
+_lock = threading.Lock()
+_unsupported_until = 0.0
+
+
+def available():
+    """False while the server is known not to have api/screenshot_parts.php"""
+    with _lock:
+        return time.time() >= _unsupported_until
+
+
+def wanted(size):
+    """Should a screenshot of `size` bytes go through the resumable channel?"""
+    return MIN_BYTES > 0 and size >= MIN_BYTES and available()
+
+
+def acked_bytes(screenshot_id, store=None):
+    """Bytes of a screenshot the server has acknowledged so far (0 if none)"""
+    row = (store or get_store()).query_one('SELECT acked_bytes FROM screenshot_uploads WHERE screenshot_id = ?', (screenshot_id,))
+    return row[0] if row else 0
+
+
+def _record(store, screenshot_id, offset):
+    store.execute(
+        'INSERT INTO screenshot_uploads (screenshot_id, acked_bytes, updated_at) VALUES (?, ?, ?) '
+        'ON CONFLICT (screenshot_id) DO UPDATE SET acked_bytes = excluded.acked_bytes, updated_at = excluded.updated_at',
+        (screenshot_id, offset, int(time.time()))
+    )
+
+
+def prune(store=None):
+    """Forget progress of screenshots that are no longer queued (uploaded, or evicted while offline)"""
+    store = store or get_store()
+    return store.execute('DELETE FROM screenshot_uploads WHERE screenshot_id NOT IN (SELECT id FROM screenshots)')
+
+
+def upload(row, store=None):
+    """Send one queued screenshot row in parts, starting at the offset acknowledged last time.
+    Returns (success: bool, stored: bool, unreadable: bool)."""
+    global _unsupported_until
+    store = store or get_store()
+    rid, taken_at, filename = row[:3]
+    data = screenshot_store.read(row)
+    if data is None:
+        return (True, False, True)
+    view = memoryview(data)
+    total = len(data)
+    params = {
+        'machine_id': MACHINE_ID,
+        'client_uid': row_uid('screenshot', rid),
+        'filename': filename,
+        'taken_at': utc_text(taken_at),
+        'total': total,
+    }
+    offset = min(acked_bytes(rid, store), total)
+    if offset:
+        log.debug('Resuming upload of %s at %d of %d bytes', filename, offset, total)
+    conflicts = 0
+    while True:
+        part = view[offset:offset + PART_BYTES]
+        try:
+            resp = http_client.post(SCREENSHOT_PARTS_URL, params={**params, 'offset': offset}, data=bytes(part),
+                                    headers={'Content-Type': 'application/octet-stream'})
+        except resilience.CircuitOpenError as e:
+            log.debug('Resumable upload deferred: %s', e)
+            return (False, False, False)
+        except Exception as e:
+            log.warning('Upload of %s interrupted at %d of %d bytes: %s', filename, offset, total, e)
+            return (False, False, False)
+
+        if resp.status_code == 404:
+            with _lock:
+                _unsupported_until = time.time() + _REPROBE_SECONDS
+            log.info('Server has no resumable upload endpoint; sending screenshots whole for %d s', _REPROBE_SECONDS)
+            return (False, False, False)
+        try:
+            jr = resp.json()
+        except Exception:
+            jr = None
+        if not isinstance(jr, dict):
+            log.warning('Upload of %s failed: HTTP %s', filename, resp.status_code)
+            return (False, False, False)
+        if resp.status_code == 409 and conflicts < _MAX_CONFLICTS:
+            # The server has a different byte count (e.g. a part landed but its response was lost): continue from it
+            conflicts += 1
+            offset = min(max(0, int(jr.get('offset') or 0)), total)
+            _record(store, rid, offset)
+            continue
+        if resp.status_code != 200 or jr.get('status') != 'ok':
+            log.warning('Upload of %s failed: HTTP %s', filename, resp.status_code)
+            return (False, False, False)
+        if jr.get('stored'):
+            store.execute('DELETE FROM screenshot_uploads WHERE screenshot_id = ?', (rid,))
+            return (True, True, False)
+        acked = min(max(0, int(jr.get('offset') or 0)), total)
+        if acked <= offset:
+            log.warning('Upload of %s made no progress at %d of %d bytes', filename, offset, total)
+            return (False, False, False)
+        offset = acked
+        _record(store, rid, offset)
+
+
+def upload_rows(rows):
+    """Upload rows one after another (the sync_screenshot_batch contract).
+    Returns (success: bool, stored rows, ids of rows whose data is gone)."""
+    stored = []
+    unreadable = []
+    for row in rows:
+        ok, done, gone = upload(row)
+        if gone:
+            unreadable.append(row[0])
+        elif done:
+            stored.append(row)
+        if not ok:
+            return (False, stored, unreadable)
+    return (True, stored, unreadable)
@@ -0,0 +1,222 @@
+"""
+Schema Module for TrackerV3 Agent
+Versioned migrations for agent.db, keyed on PRAGMA user_version
+"""
+import os
+import sys
+import time
+import uuid
+import sqlite3
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+log = logging.getLogger('tracker_agent.schema')
+
+# STRICT tables need SQLite 3.37+; older builds get the same layout without type enforcement
+_STRICT = ' STRICT' if sqlite3.sqlite_version_info >= (3, 37, 0) else ''
+
+# Timestamps are stored as integer epoch seconds (UTC); the server still takes this text form
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def utc_text(epoch):
+    """Format stored epoch seconds as the UTC datetime string api/ingest.php expects"""
+    return time.strftime(TIME_FORMAT, time.gmtime(epoch))
+
+
+def _v1_baseline(cur):
+    """Tables as created by agents before versioning (no-op on existing databases).
+
+    Frozen: any later change to these tables is a new migration step.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS activity (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            productive_seconds INTEGER NOT NULL,
+            unproductive_seconds INTEGER NOT NULL,
+            idle_seconds INTEGER NOT NULL,
+            mouse_moves INTEGER NOT NULL,
+            key_presses INTEGER NOT NULL,
+            synced INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS screenshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            taken_at TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            synced INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox_website (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox_application (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox_device (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS queue_watermarks (
+            stream TEXT PRIMARY KEY,
+            acked_id INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS storage_evictions (
+            stream TEXT PRIMARY KEY,
+            items INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _rebuild(cur, table, create_sql, copy_sql):
+    """Replace `table` with a new layout, keeping ids and the AUTOINCREMENT high-water mark.
+
+    Queue watermarks refer to ids, so a rebuilt table must never hand out an id
+    at or below one that was already used.
+    """
+    row = cur.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+    seq = row[0] if row else 0
+    cur.execute(create_sql.format(table=f'{table}_new'))
+    cur.execute(copy_sql.format(table=f'{table}_new'))
+    cur.execute(f'DROP TABLE {table}')
+    cur.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+    seq = max(seq, cur.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0])
+    cur.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+    cur.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table, seq))
+
+
+def _v2_compact(cur):
+    """Integer epoch seconds (UTC) instead of TEXT timestamps, STRICT tables, no unused synced column"""
+    _rebuild(
+        cur, 'activity',
+        """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER NOT NULL,
+            productive_seconds INTEGER NOT NULL,
+            unproductive_seconds INTEGER NOT NULL,
+            idle_seconds INTEGER NOT NULL,
+            mouse_moves INTEGER NOT NULL,
+            key_presses INTEGER NOT NULL
+        )""" + _STRICT,
+        """
+        INSERT INTO {table} (id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses)
+        SELECT id, CAST(strftime('%s', start_time) AS INTEGER), CAST(strftime('%s', end_time) AS INTEGER),
+               productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses
+        FROM activity ORDER BY id
+        """
+    )
+    _rebuild(
+        cur, 'screenshots',
+        """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            taken_at INTEGER NOT NULL,
+            filename TEXT NOT NULL
+        )""" + _STRICT,
+        """
+        INSERT INTO {table} (id, taken_at, filename)
+        SELECT id, CAST(strftime('%s', taken_at) AS INTEGER), filename
+        FROM screenshots ORDER BY id
+        """
+    )
+
+
+def _v3_screenshot_packs(cur):
+    """Location of screenshots held in pack segments (NULL for rows backed by a file in SCREEN_DIR)"""
+    cur.execute('ALTER TABLE screenshots ADD COLUMN pack_segment INTEGER')
+    cur.execute('ALTER TABLE screenshots ADD COLUMN pack_offset INTEGER')
+    cur.execute('ALTER TABLE screenshots ADD COLUMN pack_length INTEGER')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_screenshots_pack_segment ON screenshots (pack_segment)')
+
+
+def _v4_client_id(cur):
+    """Per-install random id; the namespace for the client ids on rows and batches sent to ingest"""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS agent_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute('INSERT OR IGNORE INTO agent_meta (key, value) VALUES (?, ?)', ('client_id', str(uuid.uuid4())))
+
+
+def _v5_screenshot_uploads(cur):
+    """Bytes of each large screenshot the server has acknowledged, so an interrupted upload resumes"""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS screenshot_uploads (
+            screenshot_id INTEGER PRIMARY KEY,
+            acked_bytes INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )""" + _STRICT
+    )
+
+
+# (version, description, function). Append only; never edit a shipped step.
+MIGRATIONS = (
+    (1, 'baseline tables', _v1_baseline),
+    (2, 'compact integer-epoch STRICT activity/screenshots', _v2_compact),
+    (3, 'screenshot pack segment index', _v3_screenshot_packs),
+    (4, 'client id for idempotent ingest', _v4_client_id),
+    (5, 'resumable screenshot upload offsets', _v5_screenshot_uploads),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(store):
+    """Bring agent.db up to SCHEMA_VERSION, one transaction per step. Returns the resulting version."""
+    current = store.query_one('PRAGMA user_version')[0]
+    if current > SCHEMA_VERSION:
+        log.warning('agent.db schema version %d is newer than this agent (%d)', current, SCHEMA_VERSION)
+        return current
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        with store.transaction() as cur:
+            step(cur)
+            cur.execute(f'PRAGMA user_version = {int(version)}')
+        log.info('Migrated agent.db to schema v%d (%s)', version, description)
+        current = version
+    return current
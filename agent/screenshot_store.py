@@ -0,0 +1,319 @@
+"""
+Screenshot Store Module for TrackerV3 Agent
+Pending screenshots in append-only pack segments, indexed by their rows in agent.db
+"""
+import os
+import sys
+import mmap
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import SCREEN_DIR, PACK_DIR, PACK_SEGMENT_MB
+    from .store import get_store
+except ImportError:
+    from config import SCREEN_DIR, PACK_DIR, PACK_SEGMENT_MB
+    from store import get_store
+
+log = logging.getLogger('tracker_agent.screenshot_store')
+
+# Columns read by the screenshot upload queue; the last three are NULL for file-backed rows
+QUEUE_COLUMNS = ('taken_at', 'filename', 'pack_segment', 'pack_offset', 'pack_length')
+
+SEGMENT_PREFIX = 'seg_'
+SEGMENT_SUFFIX = '.pack'
+
+# Older agents wrote one file per screenshot (encoded under TMP_SUFFIX, then renamed)
+TMP_SUFFIX = '.part'
+FILENAME_PREFIX = 'sc_'
+FILENAME_EXTENSIONS = ('.jpg', '.webp', '.png')
+
+# Not available on Windows, where mapped file pages are trimmed from the working set by the OS
+_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+
+def _segment_name(segment):
+    return f'{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}'
+
+
+def _segment_number(name):
+    if not (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)):
+        return None
+    try:
+        return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+    except ValueError:
+        return None
+
+
+class ScreenshotPacks:
+    """Append-only segment files holding encoded screenshots until they are uploaded.
+
+    Each capture is appended to the active segment and fsynced before its row
+    (segment, offset, length) is inserted, so a row never points at bytes that
+    are not on disk; a crash in between only leaves unreferenced bytes at the
+    end of a segment. Uploads read through a cached read-only mmap per segment.
+    A segment is deleted as a whole once no row refers to it, which replaces
+    one open/read/unlink per screenshot with one per segment.
+    """
+
+    def __init__(self, pack_dir=None, segment_bytes=None, store=None):
+        self.pack_dir = pack_dir or PACK_DIR
+        self.segment_bytes = segment_bytes or PACK_SEGMENT_MB * 1024 * 1024
+        self.store = store or get_store()
+        self._lock = threading.Lock()
+        self._active = None  # segment number being appended to
+        self._writer = None
+        self._maps = {}  # segment -> (file, mmap)
+        os.makedirs(self.pack_dir, exist_ok=True)
+
+    # ---- segments ----------------------------------------------------
+
+    def _path(self, segment):
+        return os.path.join(self.pack_dir, _segment_name(segment))
+
+    def segments(self):
+        """Return {segment: size in bytes} for every segment file on disk"""
+        found = {}
+        try:
+            with os.scandir(self.pack_dir) as it:
+                for entry in it:
+                    segment = _segment_number(entry.name)
+                    if segment is not None and entry.is_file():
+                        found[segment] = entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return found
+
+    def disk_bytes(self):
+        return sum(self.segments().values())
+
+    def _open_writer(self, size_hint):
+        if self._writer is not None and self._writer.tell() + size_hint <= self.segment_bytes:
+            return
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            log.debug('Sealed screenshot segment %d', self._active)
+        existing = self.segments()
+        segment = max(existing) + 1 if existing else 1
+        self._writer = open(self._path(segment), 'ab')
+        self._active = segment
+
+    def _unmap(self, segment):
+        entry = self._maps.pop(segment, None)
+        if entry is not None:
+            f, m = entry
+            m.close()
+            f.close()
+
+    # ---- public API --------------------------------------------------
+
+    def add(self, data, filename, taken_at):
+        """Append one encoded screenshot and queue it. Returns the row id."""
+        with self._lock:
+            self._open_writer(len(data))
+            offset = self._writer.tell()
+            self._writer.write(data)
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            return self.store.execute(
+                'INSERT INTO screenshots (taken_at, filename, pack_segment, pack_offset, pack_length) VALUES (?,?,?,?,?)',
+                (int(taken_at), filename, self._active, offset, len(data))
+            )
+
+    def read(self, segment, offset, length):
+        """Return the bytes of one packed screenshot"""
+        with self._lock:
+            entry = self._maps.get(segment)
+            if entry is None or len(entry[1]) < offset + length:
+                # Not mapped yet, or mapped before this entry was appended
+                self._unmap(segment)
+                f = open(self._path(segment), 'rb')
+                try:
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except Exception:
+                    f.close()
+                    raise
+                entry = self._maps[segment] = (f, m)
+            if len(entry[1]) < offset + length:
+                raise ValueError(f'Segment {segment} is truncated')
+            data = entry[1][offset:offset + length]
+            if _DONTNEED is not None:
+                # The caller has its copy: drop the segment's mapped pages (including those the kernel
+                # faulted in around this entry) so a long upload run does not pile up in RSS. They are
+                # file-backed and simply read again if ever needed.
+                try:
+                    entry[1].madvise(_DONTNEED)
+                except (OSError, ValueError):
+                    pass
+            return data
+
+    def collect(self):
+        """Delete every segment no queued row refers to. Returns (segments deleted, bytes freed)."""
+        with self._lock:
+            referenced = {r[0] for r in self.store.query(
+                'SELECT DISTINCT pack_segment FROM screenshots WHERE pack_segment IS NOT NULL')}
+            deleted = freed = 0
+            for segment, size in self.segments().items():
+                if segment in referenced:
+                    continue
+                if segment == self._active and self._writer is not None:
+                    # Nothing pending in the active segment either: start a fresh one on the next capture
+                    self._writer.close()
+                    self._writer = None
+                    self._active = None
+                self._unmap(segment)
+                try:
+                    os.remove(self._path(segment))
+                except OSError as e:
+                    log.debug('Could not delete screenshot segment %d: %s', segment, e)
+                    continue
+                deleted += 1
+                freed += size
+        if deleted:
+            log.debug('Deleted %d screenshot segment(s), %d KB', deleted, freed // 1024)
+        return deleted, freed
+
+    def close(self):
+        with self._lock:
+            for segment in list(self._maps):
+                self._unmap(segment)
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                self._active = None
+
+
+_packs = None
+_packs_lock = threading.Lock()
+
+
+def get_packs():
+    """Return the process-wide ScreenshotPacks instance"""
+    global _packs
+    with _packs_lock:
+        if _packs is None:
+            _packs = ScreenshotPacks()
+        return _packs
+
+
+def close_packs():
+    global _packs
+    with _packs_lock:
+        if _packs is not None:
+            _packs.close()
+            _packs = None
+
+
+def read(row, screen_dir=None):
+    """Bytes of a queued screenshot row (id, *QUEUE_COLUMNS), or None if its data is gone"""
+    _, _, filename, segment, offset, length = row
+    try:
+        if segment is not None:
+            return get_packs().read(segment, offset, length)
+        with open(os.path.join(screen_dir or SCREEN_DIR, filename), 'rb') as f:
+            return f.read()
+    except (OSError, ValueError) as e:
+        log.warning('Screenshot %s is unreadable: %s', filename, e)
+        return None
+
+
+def size(row, screen_dir=None):
+    """Stored size in bytes of a queued screenshot row, 0 if its data is gone"""
+    _, _, filename, segment, _, length = row
+    if segment is not None:
+        return length or 0
+    try:
+        return os.path.getsize(os.path.join(screen_dir or SCREEN_DIR, filename))
+    except OSError:
+        return 0
+
+
+def release(rows, delete_screenshots=True, screen_dir=None):
+    """Clean up after uploaded rows were acknowledged. Returns the number of files/segments removed.
+
+    File-backed rows lose their file. Packed rows are freed with their segment;
+    when delete-after-sync is off they are first written out to SCREEN_DIR so a
+    copy is kept, as before.
+    """
+    screen_dir = screen_dir or SCREEN_DIR
+    packs = get_packs()
+    removed = 0
+    for row in rows:
+        _, _, filename, segment, offset, length = row
+        path = os.path.join(screen_dir, filename)
+        try:
+            if segment is None:
+                if delete_screenshots and os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+            elif not delete_screenshots:
+                with open(path, 'wb') as f:
+                    f.write(packs.read(segment, offset, length))
+        except (OSError, ValueError) as e:
+            log.debug('Failed to clean up screenshot %s: %s', filename, e)
+    removed += packs.collect()[0]
+    return removed
+
+
+def reconcile(screenshot_queue, store=None, screen_dir=None):
+    """Repair SCREEN_DIR, the pack segments and the screenshots table after an unclean shutdown.
+
+    Run once at startup, before capturing starts. SCREEN_DIR and PACK_DIR are
+    each listed once with os.scandir, then in bulk:
+      - leftover temp files from interrupted per-file captures are deleted,
+      - rows whose file or pack bytes are gone are removed from the queue,
+      - segments no row refers to are deleted.
+    Unreferenced files in SCREEN_DIR are left alone: new captures only go to
+    packs, so those are copies kept after upload (delete-after-sync off) and
+    the storage governor ages them out.
+
+    Returns {'temp_files': n, 'dangling_rows': n, 'segments': n}.
+    """
+    store = store or get_store()
+    screen_dir = screen_dir or SCREEN_DIR
+    packs = get_packs()
+    files = set()
+    temp_files = []
+    try:
+        with os.scandir(screen_dir) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(TMP_SUFFIX):
+                    temp_files.append(entry.path)
+                elif entry.name.startswith(FILENAME_PREFIX) and entry.name.lower().endswith(FILENAME_EXTENSIONS):
+                    files.add(entry.name)
+    except FileNotFoundError:
+        pass
+
+    removed_temp = 0
+    for path in temp_files:
+        try:
+            os.remove(path)
+            removed_temp += 1
+        except OSError as e:
+            log.debug('Could not remove temp screenshot %s: %s', path, e)
+
+    segments = packs.segments()
+    rows = store.query('SELECT id, filename, pack_segment, pack_offset, pack_length FROM screenshots')
+    dangling = []
+    for rid, filename, segment, offset, length in rows:
+        if segment is None:
+            if filename not in files:
+                dangling.append(rid)
+        elif segments.get(segment, -1) < offset + length:
+            dangling.append(rid)
+    if dangling:
+        screenshot_queue.remove(dangling)
+
+    deleted_segments = packs.collect()[0]
+
+    result = {'temp_files': removed_temp, 'dangling_rows': len(dangling), 'segments': deleted_segments}
+    if removed_temp or dangling:
+        log.warning('Screenshot reconciliation: removed %d temp files, dropped %d rows without data',
+                    removed_temp, len(dangling))
+    return result
@@ -0,0 +1,227 @@
+"""
+Storage Governor Module for TrackerV3 Agent
+Keeps the offline backlog (screenshots, activity, events) under a disk budget per stream
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import SCREEN_DIR, SCREENSHOT_BUDGET_MB, ACTIVITY_BUDGET_MB, EVENTS_BUDGET_MB
+    from .store import get_store
+    from . import outbox
+    from . import compaction
+    from . import screenshot_store
+except ImportError:
+    from config import SCREEN_DIR, SCREENSHOT_BUDGET_MB, ACTIVITY_BUDGET_MB, EVENTS_BUDGET_MB
+    from store import get_store
+    import outbox
+    import compaction
+    import screenshot_store
+
+log = logging.getLogger('tracker_agent.storage_governor')
+
+# Eviction order. Each step only runs while its stream is over budget, and
+# the cheapest loss comes first:
+#   1. screenshot files already uploaded (kept because delete-after-sync is off)
+#   2. oldest pending screenshots
+#   3. roll the oldest activity minutes up into spans (compaction.py)
+#   4. oldest activity rows
+#   5. oldest website/application/device events
+EVICTION_LADDER = (
+    ('screenshots', 'synced_files'),
+    ('screenshots', 'oldest'),
+    ('activity', 'coarsen'),
+    ('activity', 'oldest'),
+    ('events', 'oldest'),
+)
+
+_ACTIVITY_ROW_BYTES = 72  # estimate used when SQLite is built without the dbstat table
+_UNREFERENCED_FILE_GRACE = 300  # seconds; a fresh file may not have its row yet
+
+
+class StorageGovernor:
+    """Enforces the per-stream byte caps and keeps count of what was shed.
+
+    Counts survive restarts (storage_evictions table) and are sent with the next
+    successful sync so the server knows data was dropped or coarsened.
+    """
+
+    def __init__(self, activity_queue, screenshot_queue, store=None, screen_dir=None, budgets=None):
+        self.activity_queue = activity_queue
+        self.screenshot_queue = screenshot_queue
+        self.store = store or get_store()
+        self.screen_dir = screen_dir or SCREEN_DIR
+        mb = 1024 * 1024
+        self.budgets = budgets or {
+            'screenshots': SCREENSHOT_BUDGET_MB * mb,
+            'activity': ACTIVITY_BUDGET_MB * mb,
+            'events': EVENTS_BUDGET_MB * mb,
+        }
+
+    # ---- measurement -------------------------------------------------
+
+    def _screenshot_files(self):
+        files = []
+        try:
+            with os.scandir(self.screen_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        files.append((st.st_mtime, entry.name, st.st_size))
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _table_bytes(self, table):
+        try:
+            row = self.store.query_one('SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = ?', (table,))
+            return int(row[0])
+        except sqlite3.Error:
+            return self.store.query_one(f'SELECT COUNT(*) FROM {table}')[0] * _ACTIVITY_ROW_BYTES
+
+    def usage(self):
+        """Current bytes used per stream"""
+        return {
+            'screenshots': sum(f[2] for f in self._screenshot_files()) + screenshot_store.get_packs().disk_bytes(),
+            'activity': self._table_bytes('activity'),
+            'events': outbox.payload_bytes(),
+        }
+
+    # ---- enforcement -------------------------------------------------
+
+    def enforce(self):
+        """Walk the eviction ladder for every stream over budget. Returns {counter: items} evicted."""
+        usage = self.usage()
+        evicted = {}
+        for stream, step in EVICTION_LADDER:
+            over = usage[stream] - self.budgets[stream]
+            if over <= 0:
+                continue
+            try:
+                counter, items, freed = getattr(self, f'_evict_{stream}_{step}')(over)
+            except Exception as e:
+                log.warning('Storage eviction step %s/%s failed: %s', stream, step, e)
+                continue
+            if items:
+                usage[stream] -= freed
+                if counter:
+                    self._record(counter, items, freed)
+                    evicted[counter] = evicted.get(counter, 0) + items
+                log.warning('Storage budget: %s over by %d KB, %s/%s freed %d KB (%d items)',
+                            stream, over // 1024, stream, step, freed // 1024, items)
+        return evicted
+
+    def _evict_screenshots_synced_files(self, over):
+        referenced = {r[0] for r in self.store.query('SELECT filename FROM screenshots')}
+        cutoff = time.time() - _UNREFERENCED_FILE_GRACE
+        freed = items = 0
+        for mtime, name, size in sorted(self._screenshot_files()):
+            if freed >= over:
+                break
+            if name in referenced or mtime > cutoff:
+                continue
+            try:
+                os.remove(os.path.join(self.screen_dir, name))
+            except OSError:
+                continue
+            freed += size
+            items += 1
+        # Already uploaded: nothing is lost, so nothing to report
+        return None, items, freed
+
+    def _evict_screenshots_oldest(self, over):
+        packs = screenshot_store.get_packs()
+        freed = items = 0
+        while freed < over:
+            rows = self.screenshot_queue.peek(50)
+            if not rows:
+                break
+            victims = []
+            # Packed bytes only come back once a whole segment is unreferenced, so they are
+            # counted from what collect() actually deletes; this just sizes the batch
+            released = 0
+            for rid, taken_at, filename, segment, offset, length in rows:
+                if freed + released >= over:
+                    break
+                if segment is not None:
+                    released += length
+                else:
+                    path = os.path.join(self.screen_dir, filename)
+                    try:
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                    except OSError:
+                        size = 0
+                    freed += size
+                victims.append(rid)
+            items += self.screenshot_queue.remove(victims)
+            freed += packs.collect()[1]
+        return 'screenshots', items, freed
+
+    def _evict_activity_coarsen(self, over):
+        # Under budget pressure every minute is eligible, not just the ones past ROLLUP_MIN_AGE_HOURS
+        removed = compaction.rollup(self.activity_queue, min_age_seconds=0,
+                                    max_rows=over // _ACTIVITY_ROW_BYTES + 1, store=self.store)
+        return 'activity_coarsened', removed, removed * _ACTIVITY_ROW_BYTES
+
+    def _evict_activity_oldest(self, over):
+        freed = items = 0
+        while freed < over:
+            rows = self.activity_queue.peek(500)
+            if not rows:
+                break
+            items += self.activity_queue.remove([r[0] for r in rows])
+            freed = items * _ACTIVITY_ROW_BYTES
+        return 'activity', items, freed
+
+    def _evict_events_oldest(self, over):
+        freed = items = 0
+        while freed < over:
+            progress = 0
+            for kind in outbox.OUTBOX_TABLES:
+                count, size = outbox.drop_oldest(kind, 25)
+                items += count
+                freed += size
+                progress += count
+            if not progress:
+                break
+        return 'events', items, freed
+
+    # ---- reporting ---------------------------------------------------
+
+    def _record(self, counter, items, freed):
+        self.store.execute(
+            'INSERT INTO storage_evictions (stream, items, bytes) VALUES (?, ?, ?) '
+            'ON CONFLICT(stream) DO UPDATE SET items = items + excluded.items, bytes = bytes + excluded.bytes',
+            (counter, int(items), int(freed))
+        )
+
+    def pending_report(self):
+        """Eviction counts not yet reported to the server: {counter: {'items': n, 'bytes': b}}"""
+        rows = self.store.query('SELECT stream, items, bytes FROM storage_evictions WHERE items > 0')
+        return {stream: {'items': items, 'bytes': size} for stream, items, size in rows}
+
+    def report_sequence(self):
+        """Number of eviction reports the server has acknowledged, so each report gets its own batch id"""
+        row = self.store.query_one("SELECT value FROM agent_meta WHERE key = 'eviction_reports'")
+        return int(row[0]) if row else 0
+
+    def clear_reported(self, report):
+        """Subtract counts the server has acknowledged (new evictions since the report are kept)"""
+        if not report:
+            return
+        with self.store.transaction() as cur:
+            cur.executemany(
+                'UPDATE storage_evictions SET items = MAX(items - ?, 0), bytes = MAX(bytes - ?, 0) WHERE stream = ?',
+                [(v['items'], v['bytes'], k) for k, v in report.items()]
+            )
+            cur.execute(
+                "INSERT INTO agent_meta (key, value) VALUES ('eviction_reports', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
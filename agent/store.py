@@ -0,0 +1,167 @@
+"""
+Local Store Module for TrackerV3 Agent
+Long-lived, thread-safe access to the agent's SQLite queue (agent.db)
+"""
+import os
+import sys
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import DB_PATH, DB_SYNCHRONOUS
+except ImportError:
+    from config import DB_PATH, DB_SYNCHRONOUS
+
+log = logging.getLogger('tracker_agent.store')
+
+_SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class LocalStore:
+    """Single writer connection plus per-thread reader connections on a WAL database.
+
+    Writes are serialized through one connection guarded by a lock, so collectors
+    never pay a connect/close per record. Reads go through a connection owned by
+    the calling thread; with WAL they see a consistent snapshot and never block
+    (or get blocked by) the writer, so a background sync can drain the queue
+    while collectors keep writing.
+    """
+
+    def __init__(self, path=None, synchronous=None, cached_statements=256, busy_timeout_ms=5000):
+        self.path = path or DB_PATH
+        level = (synchronous or DB_SYNCHRONOUS or 'NORMAL').upper()
+        if level not in _SYNCHRONOUS_LEVELS:
+            log.warning('Unknown synchronous level %r, using NORMAL', level)
+            level = 'NORMAL'
+        self.synchronous = level
+        self.cached_statements = cached_statements
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+
+        self._writer = self._connect()
+        log.debug('LocalStore opened %s (journal=WAL, synchronous=%s)', self.path, self.synchronous)
+
+    def _connect(self):
+        con = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,  # explicit BEGIN/COMMIT only
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        con.execute('PRAGMA journal_mode=WAL')
+        con.execute(f'PRAGMA synchronous={self.synchronous}')
+        con.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return con
+
+    def _reader(self):
+        con = getattr(self._local, 'reader', None)
+        if con is None:
+            con = self._connect()
+            con.execute('PRAGMA query_only=1')
+            self._local.reader = con
+            with self._readers_lock:
+                self._readers.append(con)
+        return con
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of writes in one IMMEDIATE transaction on the writer connection.
+
+        Nested use from the same thread joins the outer transaction.
+        """
+        with self._write_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError('LocalStore is closed')
+            cur = self._writer.cursor()
+            outer = self._write_depth == 0
+            if outer:
+                cur.execute('BEGIN IMMEDIATE')
+            self._write_depth += 1
+            try:
+                yield cur
+            except BaseException:
+                self._write_depth -= 1
+                if outer:
+                    self._writer.rollback()
+                raise
+            else:
+                self._write_depth -= 1
+                if outer:
+                    self._writer.commit()
+            finally:
+                cur.close()
+
+    def execute(self, sql, params=()):
+        """Execute a single write statement in its own transaction. Returns lastrowid."""
+        with self.transaction() as cur:
+            cur.execute(sql, params)
+            return cur.lastrowid
+
+    def executemany(self, sql, seq_of_params):
+        """Execute a write statement for many parameter sets in one transaction. Returns rowcount."""
+        with self.transaction() as cur:
+            cur.executemany(sql, seq_of_params)
+            return cur.rowcount
+
+    def query(self, sql, params=()):
+        """Run a read-only query on this thread's reader connection and return all rows."""
+        return self._reader().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        """Run a read-only query and return the first row (or None)."""
+        return self._reader().execute(sql, params).fetchone()
+
+    def close(self):
+        """Checkpoint the WAL and close every connection."""
+        with self._write_lock:
+            if self._closed:
+                return
+            self._closed = True
+            with self._readers_lock:
+                readers, self._readers = self._readers, []
+            for con in readers:
+                try:
+                    con.close()
+                except Exception:
+                    pass
+            try:
+                self._writer.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except Exception as e:
+                log.debug('WAL checkpoint on close failed: %s', e)
+            self._writer.close()
+        log.debug('LocalStore closed %s', self.path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide LocalStore for agent.db, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LocalStore()
+    return _store
+
+
+def close_store():
+    """Close the process-wide LocalStore (called on agent shutdown)"""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,129 @@
+"""
+Streaming Module for TrackerV3 Agent
+Bounded-memory upload pipeline: an in-flight byte budget and multipart bodies streamed one file at a time
+"""
+import os
+import sys
+import uuid
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import SYNC_INFLIGHT_MB
+except ImportError:
+    from config import SYNC_INFLIGHT_MB
+
+log = logging.getLogger('tracker_agent.streaming')
+
+
+class BodySourceError(Exception):
+    """A file behind a streamed body changed or vanished while it was sent (a local problem,
+    not a server failure)"""
+
+
+class ByteBudget:
+    """Caps the bytes of request bodies that exist at once (being built, on the wire or awaiting
+    their response).
+
+    A producer acquires a body's size before building it and releases it when
+    the request is done, so a large backlog is read and sent a few requests
+    at a time instead of all at once. A body larger than the whole budget is
+    let through once nothing else is in flight, so it can never wait forever.
+    """
+
+    def __init__(self, limit_bytes=None):
+        self.limit = max(1, int(limit_bytes or SYNC_INFLIGHT_MB * 1024 * 1024))
+        self._used = 0
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self):
+        return self._used
+
+    def acquire(self, size, timeout=None):
+        """Wait until `size` bytes fit. Returns False if `timeout` expired first."""
+        size = max(0, int(size))
+        with self._cond:
+            fits = lambda: self._used == 0 or self._used + size <= self.limit
+            if not self._cond.wait_for(fits, timeout):
+                return False
+            self._used += size
+            return True
+
+    def release(self, size):
+        with self._cond:
+            self._used = max(0, self._used - max(0, int(size)))
+            self._cond.notify_all()
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_budget():
+    """Process-wide budget shared by ingest chunks and screenshot uploads"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = ByteBudget()
+        return _budget
+
+
+class MultipartBody:
+    """multipart/form-data request body produced while it is sent.
+
+    `fields` is [(name, text)]; `files` is [(name, filename, content_type,
+    size, read)] where read() returns the file's bytes. Each file is read only
+    when the body reaches it and dropped once yielded, so a request holds one
+    file in memory at a time however large the batch. Sizes must be known up
+    front: the body has a Content-Length (no chunked transfer encoding, which
+    PHP behind FastCGI does not reliably accept), and a file whose data does
+    not match its size aborts the request with BodySourceError.
+
+    Iterating again starts over, so a retried request re-reads the files.
+    """
+
+    def __init__(self, fields, files, boundary=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self._fields = [(name, str(value).encode('utf-8')) for name, value in fields]
+        self._files = list(files)
+        self._length = sum(len(self._field_head(name)) + len(value) + 2 for name, value in self._fields)
+        self._length += sum(len(self._file_head(name, filename, content_type)) + size + 2
+                            for name, filename, content_type, size, _ in self._files)
+        self._length += len(self._tail())
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def _field_head(self, name):
+        return (f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n').encode('utf-8')
+
+    def _file_head(self, name, filename, content_type):
+        filename = filename.replace('"', '%22').replace('\r', '').replace('\n', '')
+        return (f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+
+    def _tail(self):
+        return f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for name, value in self._fields:
+            yield self._field_head(name) + value + b'\r\n'
+        for name, filename, content_type, size, read in self._files:
+            yield self._file_head(name, filename, content_type)
+            data = read()
+            if data is None or len(data) != size:
+                raise BodySourceError(f'{filename} changed while it was being uploaded')
+            yield data
+            del data
+            yield b'\r\n'
+        yield self._tail()
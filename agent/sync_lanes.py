@@ -0,0 +1,168 @@
+"""
+Sync Lanes Module for TrackerV3 Agent
+Priority lanes for one sync round: control events, then activity and visits, then screenshots, dispatched by weighted fair scheduling
+"""
+import os
+import sys
+import math
+import logging
+from concurrent.futures import wait, FIRST_COMPLETED
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import (
+        SYNC_WEIGHT_CONTROL, SYNC_WEIGHT_ACTIVITY, SYNC_WEIGHT_SCREENSHOTS,
+        SYNC_CONTROL_BATCH, SYNC_SCREENSHOT_ROUND_MB
+    )
+except ImportError:
+    from config import (
+        SYNC_WEIGHT_CONTROL, SYNC_WEIGHT_ACTIVITY, SYNC_WEIGHT_SCREENSHOTS,
+        SYNC_CONTROL_BATCH, SYNC_SCREENSHOT_ROUND_MB
+    )
+
+log = logging.getLogger('tracker_agent.sync_lanes')
+
+# Bytes of credit a lane earns per unit of weight on each scheduling pass
+QUANTUM = 64 * 1024
+
+
+class Lane:
+    """One class of sync traffic.
+
+    `weight` is the lane's share of dispatch while lanes compete; `max_items`
+    caps the events it ships per round (None = the stream's own batch size)
+    and `max_bytes` the request bytes it sends per round (0 = no cap), so a
+    low-priority backlog can never stretch a round past the next interval.
+    """
+
+    def __init__(self, name, weight, max_items=None, max_bytes=0):
+        self.name = name
+        self.weight = max(1, int(weight))
+        self.max_items = max_items
+        self.max_bytes = max(0, int(max_bytes))
+
+
+# Highest priority first; ties in a scheduling pass go to the earlier lane
+LANES = {
+    'control': Lane('control', SYNC_WEIGHT_CONTROL, max_items=SYNC_CONTROL_BATCH),
+    'activity': Lane('activity', SYNC_WEIGHT_ACTIVITY),
+    'screenshots': Lane('screenshots', SYNC_WEIGHT_SCREENSHOTS, max_bytes=SYNC_SCREENSHOT_ROUND_MB * 1024 * 1024),
+}
+
+# Lane of each outbox event kind
+OUTBOX_LANES = {
+    'device': 'control',
+    'website': 'activity',
+    'application': 'activity',
+}
+
+
+class _Queue:
+    """Jobs waiting on one lane during a round, with its deficit counter"""
+
+    def __init__(self, lane, serial):
+        self.lane = lane
+        self.serial = serial
+        self.sources = []
+        self.head = None
+        self.deficit = 0
+        self.sent_bytes = 0
+        self.futures = []
+        self.stopped = False
+
+    def peek(self):
+        while self.head is None and self.sources and not self.stopped:
+            try:
+                self.head = next(self.sources[0])
+            except StopIteration:
+                self.sources.pop(0)
+        return None if self.stopped else self.head
+
+    def busy(self):
+        """A serial lane waits for its previous request; a failed one ends the lane for this round"""
+        if not self.serial or not self.futures:
+            return False
+        last = self.futures[-1]
+        if not last.done():
+            return True
+        try:
+            ok = last.result()[0]
+        except Exception:
+            ok = False
+        if not ok:
+            self.stopped = True
+        return False
+
+
+class LaneScheduler:
+    """Dispatches the jobs of one sync round in weighted fair order (deficit round robin).
+
+    Each job is (size, dispatch): dispatch() builds the request and starts it,
+    returning a Future. On every pass each lane with work earns weight x
+    QUANTUM bytes of credit and dispatches jobs while its next job fits, so
+    the control lane goes first and activity gets several times the
+    screenshots' share whenever both have work, instead of a screenshot
+    backlog going out ahead of everything behind it. Dispatch also waits for
+    room in the shared in-flight byte budget, which is released as each
+    request completes.
+    """
+
+    def __init__(self, budget, lanes=None):
+        self.budget = budget
+        self.lanes = LANES if lanes is None else lanes
+        self._queues = {}
+
+    def add(self, lane, jobs, serial=False):
+        """Queue `jobs` on `lane` (appended after any already added). On a serial lane one request is in
+        flight at a time and the rest of the lane waits for the next round once a result[0] is false."""
+        queue = self._queues.get(lane)
+        if queue is None:
+            queue = self._queues[lane] = _Queue(self.lanes[lane], serial)
+        queue.serial = queue.serial or serial
+        queue.sources.append(iter(jobs))
+
+    def _dispatch(self, queue, size, dispatch):
+        self.budget.acquire(size)
+        try:
+            future = dispatch()
+        except BaseException:
+            self.budget.release(size)
+            raise
+        future.add_done_callback(lambda _, size=size: self.budget.release(size))
+        queue.futures.append(future)
+        queue.sent_bytes += size
+
+    def run(self):
+        """Dispatch every queued job and wait for all of them. Returns {lane: [Future, ...]} in dispatch order."""
+        queues = [self._queues[name] for name in self.lanes if name in self._queues]
+        active = [q for q in queues if q.peek() is not None]
+        while active:
+            ready = [q for q in active if not q.busy() and q.peek() is not None]
+            if not ready:
+                waiting = [q.futures[-1] for q in active if q.serial and q.futures and not q.futures[-1].done()]
+                if waiting:
+                    wait(waiting, return_when=FIRST_COMPLETED)
+                active = [q for q in active if q.peek() is not None]
+                continue
+            # Skip passes in which no lane could afford its next job
+            passes = max(1, min(math.ceil((q.head[0] - q.deficit) / (q.lane.weight * QUANTUM)) for q in ready))
+            for queue in ready:
+                queue.deficit += passes * queue.lane.weight * QUANTUM
+                while queue.peek() is not None and not queue.busy() and queue.head[0] <= queue.deficit:
+                    size, dispatch = queue.head
+                    if queue.lane.max_bytes and queue.sent_bytes and queue.sent_bytes + size > queue.lane.max_bytes:
+                        log.debug('Sync lane %s reached %d bytes this round', queue.lane.name, queue.sent_bytes)
+                        queue.stopped = True
+                        break
+                    queue.head = None
+                    queue.deficit -= size
+                    self._dispatch(queue, size, dispatch)
+            active = [q for q in active if q.peek() is not None]
+            for queue in queues:
+                if queue not in active:
+                    queue.deficit = 0
+        futures = {name: queue.futures for name, queue in self._queues.items()}
+        wait([f for fs in futures.values() for f in fs])
+        return futures
@@ -0,0 +1,125 @@
+"""
+Sync Queue Module for TrackerV3 Agent
+Watermark-based draining of the local upload queues in agent.db
+"""
+import os
+import sys
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .store import get_store
+except ImportError:
+    from store import get_store
+
+log = logging.getLogger('tracker_agent.sync_queue')
+
+
+def id_ranges(ids):
+    """Collapse ids into sorted, inclusive (first, last) runs of consecutive integers"""
+    ranges = []
+    for i in sorted(set(int(x) for x in ids)):
+        if ranges and i == ranges[-1][1] + 1:
+            ranges[-1][1] = i
+        else:
+            ranges.append([i, i])
+    return [tuple(r) for r in ranges]
+
+
+class StreamQueue:
+    """FIFO view over one table keyed by an INTEGER PRIMARY KEY `id`.
+
+    Every id at or below the stream's acknowledged watermark has been delivered,
+    so reads start with a primary-key seek past the watermark and cost O(batch)
+    however large the table or however much has already been drained.
+    Acknowledged rows are removed with one DELETE per contiguous id range, and
+    the watermark advances to just before the oldest row still pending (a failed
+    chunk in the middle of a batch holds it back until that chunk is delivered).
+    """
+
+    def __init__(self, table, columns, stream=None, store=None):
+        self.table = table
+        self.columns = tuple(columns)
+        self.stream = stream or table
+        self.store = store or get_store()
+        self._lock = threading.Lock()
+        self._select_sql = 'SELECT id, {} FROM {} WHERE id > ? ORDER BY id ASC LIMIT ?'.format(', '.join(self.columns), table)
+        row = self.store.query_one('SELECT acked_id FROM queue_watermarks WHERE stream = ?', (self.stream,))
+        self._watermark = int(row[0]) if row else 0
+        # Highest id ever handed to the network, kept under its own key in the same table
+        self._sent_stream = f'{self.stream}:sent'
+        row = self.store.query_one('SELECT acked_id FROM queue_watermarks WHERE stream = ?', (self._sent_stream,))
+        self._sent = int(row[0]) if row else 0
+
+    @property
+    def watermark(self):
+        return self._watermark
+
+    @property
+    def sent_watermark(self):
+        """Rows at or below this id may already be on the server (sent, response possibly lost)"""
+        return self._sent
+
+    def mark_sent(self, ids):
+        """Record that rows are about to be sent. Rows above sent_watermark are known never to have left."""
+        top = max((int(i) for i in ids), default=0)
+        if top <= self._sent:
+            return
+        self.store.execute(
+            'INSERT INTO queue_watermarks (stream, acked_id) VALUES (?, ?) '
+            'ON CONFLICT(stream) DO UPDATE SET acked_id = MAX(acked_id, excluded.acked_id)',
+            (self._sent_stream, top)
+        )
+        with self._lock:
+            self._sent = max(self._sent, top)
+
+    def peek(self, limit, after=None):
+        """Return up to `limit` pending rows (id first), oldest first, optionally only ids above `after`"""
+        start = self._watermark if after is None else max(self._watermark, int(after))
+        return self.store.query(self._select_sql, (start, int(limit)))
+
+    def ack(self, ids):
+        """Delete delivered rows by contiguous id ranges and advance the watermark. Returns rows deleted."""
+        return self._delete(ids)
+
+    def remove(self, ids):
+        """Delete rows that will never be delivered (evicted or merged). Returns rows deleted."""
+        return self._delete(ids)
+
+    def _delete(self, ids):
+        ranges = id_ranges(ids)
+        if not ranges:
+            return 0
+        # Store lock first, then queue lock: callers may already hold an outer transaction
+        with self.store.transaction() as cur, self._lock:
+            deleted = 0
+            for first, last in ranges:
+                if first == last:
+                    cur.execute(f'DELETE FROM {self.table} WHERE id = ?', (first,))
+                else:
+                    cur.execute(f'DELETE FROM {self.table} WHERE id BETWEEN ? AND ?', (first, last))
+                deleted += cur.rowcount
+            cur.execute(f'SELECT id FROM {self.table} WHERE id > ? ORDER BY id ASC LIMIT 1', (self._watermark,))
+            row = cur.fetchone()
+            watermark = (row[0] - 1) if row else max(self._watermark, ranges[-1][1])
+            if watermark != self._watermark:
+                cur.execute(
+                    'INSERT INTO queue_watermarks (stream, acked_id) VALUES (?, ?) '
+                    'ON CONFLICT(stream) DO UPDATE SET acked_id = excluded.acked_id',
+                    (self.stream, watermark)
+                )
+                self._watermark = watermark
+        log.debug('Queue %s: removed %d rows in %d range(s), watermark=%d', self.stream, deleted, len(ranges), self._watermark)
+        return deleted
+
+    def backlog(self):
+        """Number of rows still pending"""
+        return self.store.query_one(f'SELECT COUNT(*) FROM {self.table} WHERE id > ?', (self._watermark,))[0]
+
+    def oldest(self, column):
+        """`column` of the oldest pending row (a primary-key seek), or None when nothing is pending"""
+        row = self.store.query_one(f'SELECT {column} FROM {self.table} WHERE id > ? ORDER BY id ASC LIMIT 1', (self._watermark,))
+        return row[0] if row else None
@@ -0,0 +1,129 @@
+"""
+Sync Tuning Module for TrackerV3 Agent
+AIMD control of sync batch sizes and worker count from measured round-trip times
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import (
+        SYNC_TARGET_SECONDS, SYNC_ACTIVITY_MIN_ROWS, SYNC_ACTIVITY_MAX_ROWS, SYNC_MAX_REQUEST_MB,
+        SCREENSHOT_UPLOAD_BATCH, SCREENSHOT_UPLOAD_MAX_BATCH
+    )
+except ImportError:
+    from config import (
+        SYNC_TARGET_SECONDS, SYNC_ACTIVITY_MIN_ROWS, SYNC_ACTIVITY_MAX_ROWS, SYNC_MAX_REQUEST_MB,
+        SCREENSHOT_UPLOAD_BATCH, SCREENSHOT_UPLOAD_MAX_BATCH
+    )
+
+log = logging.getLogger('tracker_agent.sync_tuning')
+
+# Weight of the newest request in the running bytes-per-row average
+_BYTES_PER_ROW_WEIGHT = 0.2
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease of one integer knob.
+
+    A request that fails or takes longer than `target_seconds` halves the
+    value; one that was full (used the whole value) and finished in under half
+    the target adds `step`. Anything in between holds, so the value settles
+    where requests take roughly target/2..target seconds. Like TCP, several
+    bad results from the same round (within one target period) count as one
+    decrease.
+    """
+
+    def __init__(self, name, minimum, maximum, initial, step, target_seconds=None, decrease=0.5):
+        self.name = name
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.step = max(1, int(step))
+        self.target_seconds = target_seconds or SYNC_TARGET_SECONDS
+        self.decrease = decrease
+        self._value = min(max(int(initial), self.minimum), self.maximum)
+        self._last_decrease = None
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        return self._value
+
+    def set_maximum(self, maximum, follow=False):
+        """Change the upper bound (e.g. a new server setting), clamping the current value.
+        With `follow` a raised bound also raises the value to it."""
+        with self._lock:
+            old = self.maximum
+            self.maximum = max(self.minimum, int(maximum))
+            if follow and self.maximum > old:
+                self._value = self.maximum
+            self._value = min(self._value, self.maximum)
+
+    def record(self, ok, seconds, saturated=True):
+        """Feed one measurement. Returns the new value."""
+        with self._lock:
+            old = self._value
+            if not ok or seconds > self.target_seconds:
+                now = time.monotonic()
+                if self._last_decrease is None or now - self._last_decrease >= self.target_seconds:
+                    self._value = max(self.minimum, int(old * self.decrease))
+                    self._last_decrease = now
+            elif saturated and seconds < self.target_seconds / 2:
+                self._value = min(self.maximum, old + self.step)
+            if self._value != old:
+                log.debug('Sync tuning: %s %d -> %d (%s, %.2fs)', self.name, old, self._value,
+                          'ok' if ok else 'failed', seconds)
+            return self._value
+
+
+class SyncTuner:
+    """The knobs sync_now() works with: rows per ingest chunk, screenshots per upload, concurrent requests"""
+
+    def __init__(self, max_workers=1, max_request_bytes=None):
+        self.max_request_bytes = max_request_bytes or SYNC_MAX_REQUEST_MB * 1024 * 1024
+        self.bytes_per_row = None  # running average of encoded ingest bytes per activity row
+        self._lock = threading.Lock()
+        self.activity_rows = AimdController('activity rows/chunk', SYNC_ACTIVITY_MIN_ROWS, SYNC_ACTIVITY_MAX_ROWS,
+                                            500, step=100)
+        self.screenshots = AimdController('screenshots/upload', 1, SCREENSHOT_UPLOAD_MAX_BATCH,
+                                          SCREENSHOT_UPLOAD_BATCH, step=2)
+        # Starts at the configured parallelism and backs off from there
+        self.workers = AimdController('workers', 1, max_workers, max_workers, step=1)
+
+    def worker_count(self, configured):
+        """Workers to use this round, never above the server's parallel_sync_workers setting.
+        A raised setting is used straight away; the controller backs off from there."""
+        if configured != self.workers.maximum:
+            self.workers.set_maximum(configured, follow=True)
+        return self.workers.value
+
+    def record_round(self, results, saturated):
+        """Feed the worker controller one round's chunks: [(ok, seconds), ...]"""
+        if not results:
+            return
+        ok = all(r[0] for r in results)
+        self.workers.record(ok, max(r[1] for r in results), saturated)
+
+    def record_request_bytes(self, rows, sent_bytes):
+        """Feed the encoded size of one ingest request. Caps rows per chunk at what fits under
+        max_request_bytes at the observed bytes per row; the cap rises again if rows get smaller."""
+        if rows <= 0 or sent_bytes <= 0:
+            return
+        with self._lock:
+            per_row = sent_bytes / rows
+            if self.bytes_per_row is not None:
+                per_row = self.bytes_per_row + _BYTES_PER_ROW_WEIGHT * (per_row - self.bytes_per_row)
+            self.bytes_per_row = per_row
+            cap = max(self.activity_rows.minimum, min(SYNC_ACTIVITY_MAX_ROWS, int(self.max_request_bytes // per_row)))
+        if cap != self.activity_rows.maximum:
+            log.debug('Sync tuning: %.0f bytes/row, at most %d rows per chunk', per_row, cap)
+            self.activity_rows.set_maximum(cap)
+
+    def summary(self):
+        return 'activity=%d rows, screenshots=%d, workers=%d' % (
+            self.activity_rows.value, self.screenshots.value, self.workers.value)
@@ -0,0 +1,89 @@
+"""
+Sync Worker Module for TrackerV3 Agent
+Long-lived background thread that runs sync and storage upkeep off the collection loop
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+log = logging.getLogger('tracker_agent.sync_worker')
+
+
+class SyncWorker:
+    """Runs `sync` every `interval()` seconds, and `maintenance` every `maintenance_interval`
+    seconds, on one background thread.
+
+    The collection loop only writes to the local queues and never waits on the
+    network. wake() asks for a sync now instead of at the next interval (e.g.
+    for events the server should see promptly). Sync and maintenance share the
+    thread, so roll-up and eviction never run while a sync is reading the
+    same rows. `interval` is re-read after every run, so a new
+    sync_interval_seconds from the server applies from the next cycle.
+    """
+
+    def __init__(self, sync, interval, maintenance=None, maintenance_interval=60):
+        self._sync = sync
+        self._interval = interval
+        self._maintenance = maintenance
+        self._maintenance_interval = maintenance_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='tracker-sync-worker', daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        """Request a sync as soon as the current one (if any) has finished"""
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Finish the run in progress and stop. Returns False if it was still busy after `timeout`."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                log.warning('Sync worker still busy after %ss, leaving it behind', timeout)
+                return False
+            self._thread = None
+        return True
+
+    def _call(self, what, fn):
+        started = time.monotonic()
+        try:
+            fn()
+        except Exception as e:
+            log.exception('%s error: %s', what, e)
+        return time.monotonic() - started
+
+    def _run(self):
+        now = time.monotonic()
+        next_sync = now + self._interval()
+        next_maintenance = now if self._maintenance is not None else None
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            wait = next_sync - now
+            if next_maintenance is not None:
+                wait = min(wait, next_maintenance - now)
+            woken = self._wake.wait(max(0.0, wait))
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            now = time.monotonic()
+            if next_maintenance is not None and now >= next_maintenance:
+                self._call('Storage maintenance', self._maintenance)
+                next_maintenance = time.monotonic() + self._maintenance_interval
+            if woken or now >= next_sync:
+                elapsed = self._call('Sync', self._sync)
+                log.debug('Sync pass took %.2fs', elapsed)
+                next_sync = time.monotonic() + self._interval()
+        log.debug('Sync worker stopped')
@@ -0,0 +1,73 @@
+"""
+Quick test script to verify buffered activity writes (group commit)
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing activity writer...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    from store import LocalStore
+    from activity_writer import ActivityWriter
+    print("OK - Activity writer module imported")
+
+    store = LocalStore(os.path.join(tmp, 'agent.db'))
+    store.execute(
+        'CREATE TABLE activity (id INTEGER PRIMARY KEY AUTOINCREMENT, start_time INTEGER NOT NULL, end_time INTEGER NOT NULL, '
+        'productive_seconds INTEGER NOT NULL, unproductive_seconds INTEGER NOT NULL, idle_seconds INTEGER NOT NULL, '
+        'mouse_moves INTEGER NOT NULL, key_presses INTEGER NOT NULL)'
+    )
+
+    def record(minute, mouse=1, keys=1, idle=0):
+        start = 1735689600 + minute * 60
+        return {'start_time': start, 'end_time': start + 60, 'productive_seconds': 60 - idle, 'unproductive_seconds': 0,
+                'idle_seconds': idle, 'mouse_moves': mouse, 'key_presses': keys}
+
+    def rows():
+        return store.query('SELECT start_time, idle_seconds, mouse_moves, key_presses FROM activity ORDER BY id')
+
+    writer = ActivityWriter(store, max_rows=3, max_delay=3600)
+    writer.add(record(0))
+    writer.add(record(1))
+    assert writer.maybe_flush() == 0 and rows() == [], rows()
+    print("OK - records stay buffered below the row threshold")
+
+    writer.add(record(1, mouse=5, keys=2, idle=10))
+    assert writer.maybe_flush() == 0
+    writer.add(record(2))
+    assert writer.maybe_flush() == 3, 'expected one commit of three rows'
+    assert rows() == [(1735689600, 0, 1, 1), (1735689660, 0, 6, 3), (1735689720, 0, 1, 1)], rows()
+    print("OK - a second record for a minute is merged; three rows written in one flush")
+
+    writer.add(record(2, mouse=9))
+    assert writer.flush() == 0 and len(rows()) == 3
+    print("OK - a minute already written is dropped")
+
+    writer = ActivityWriter(store, max_rows=100, max_delay=0)
+    writer.add(record(3))
+    assert writer.maybe_flush() == 1 and len(rows()) == 4
+    print("OK - the oldest record's delay also triggers a flush")
+
+    writer = ActivityWriter(store, max_rows=100, max_delay=3600)
+    assert writer.minute_due(now=1735689630) is False
+    assert writer.minute_due(now=1735689650) is False
+    assert writer.minute_due(now=1735689661) is True
+    assert writer.minute_due(now=1735689700) is False
+    print("OK - minute_due fires once per minute boundary, never for the first partial minute")
+
+    store.close()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
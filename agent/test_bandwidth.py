@@ -0,0 +1,134 @@
+"""
+Quick test script to verify upload rate limiting and the bulk upload window
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing bandwidth...")
+print("=" * 50)
+
+saved_env = dict(os.environ)
+try:
+    import config
+    import bandwidth
+    from bandwidth import TokenBucket, Throttled, parse_windows, in_window
+    print("OK - Bandwidth module imported")
+
+    assert parse_windows('') == [] and parse_windows(None) == []
+    assert parse_windows('09:00-17:30') == [(540, 1050)]
+    assert parse_windows(' 18:00 - 08:00 , 12:00-13:00 ') == [(1080, 480), (720, 780)]
+    assert parse_windows('00:00-24:00') == [(0, 1440)]
+    for text in ('9-17', '09:00', '25:00-08:00', '08:60-09:00', '24:01-08:00', 'a:b-c:d', '08:00-09:00-10:00'):
+        try:
+            parse_windows(text)
+            raise AssertionError(f'{text!r} should not parse')
+        except ValueError:
+            pass
+    print("OK - windows parse as minutes of the day; malformed ones raise ValueError")
+
+    assert in_window([], 0)
+    day = [(540, 1050)]
+    assert in_window(day, 540) and not in_window(day, 1050) and not in_window(day, 100)
+    night = [(1080, 480)]
+    assert in_window(night, 1380) and in_window(night, 60)
+    assert not in_window(night, 480) and not in_window(night, 720)
+    print("OK - windows include their start, exclude their end and may span midnight")
+
+    noon = time.mktime(time.localtime()[:3] + (12, 0, 0, 0, 0, -1))
+    bandwidth._window_state.update({'text': None, 'windows': [], 'deferred': False})
+    os.environ['TRACKER_BULK_UPLOAD_WINDOW'] = '18:00-08:00'
+    assert bandwidth.bulk_deferred(noon)
+    assert not bandwidth.bulk_deferred(noon + 7 * 3600)
+    os.environ['TRACKER_BULK_UPLOAD_WINDOW'] = 'whenever'
+    assert not bandwidth.bulk_deferred(noon)
+    print("OK - bulk uploads wait for the window; a malformed window defers nothing")
+
+    class FakeClock:
+        """Stands in for the time module: sleep() advances monotonic() instead of waiting"""
+
+        def __init__(self):
+            self.now = 1000.0
+            self.slept = 0.0
+            self.localtime = time.localtime
+
+        def monotonic(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+            self.slept += seconds
+
+    clock = bandwidth.time = FakeClock()
+    bucket = TokenBucket(0)
+    assert not bucket.limited
+    bucket.take(10 ** 9)
+    assert clock.slept == 0
+    print("OK - an unlimited bucket never waits")
+
+    bucket = TokenBucket(rate=200 * 1024, burst=100 * 1024)
+    bucket.take(100 * 1024)
+    assert clock.slept == 0
+    bucket.take(600 * 1024)
+    assert abs(clock.slept - 3.0) < 1e-6
+    print("OK - the burst goes out at once, then the rate applies")
+
+    clock = bandwidth.time = FakeClock()
+    bucket = TokenBucket(rate=1000, burst=5000)
+    bucket.take(5000)
+    clock.now += 60
+    bucket.take(5000)
+    assert clock.slept == 0
+    bucket.take(1000)
+    assert abs(clock.slept - 1.0) < 1e-6
+    print("OK - idle time refills the bucket up to the burst")
+
+    assert TokenBucket(rate=1024 * 1024).burst == 1024 * 1024
+    assert TokenBucket(rate=1024).burst == bandwidth.CHUNK_BYTES
+    bucket = TokenBucket(rate=1000, burst=1000)
+    bucket.configure(0)
+    slept = clock.slept
+    bucket.take(10 ** 6)
+    assert clock.slept == slept
+    bandwidth.time = time
+    print("OK - default burst is one second or a chunk; reconfiguring to 0 lifts the limit")
+
+    for key in [k for k in os.environ if k.startswith(('TRACKER_UPLOAD_', 'TRACKER_BULK_'))]:
+        del os.environ[key]
+    config.UPLOAD_RATE_KB_S, config.UPLOAD_BURST_KB, config.BULK_UPLOAD_WINDOW = 64, 256, '20:00-06:00'
+    assert config.get_upload_rate_kb_s() == 64 and config.get_upload_burst_kb() == 256
+    assert config.get_bulk_upload_window() == '20:00-06:00'
+    config.update_from_server_response({'upload_rate_kb_s': 128, 'bulk_upload_window': ''})
+    assert config.get_upload_rate_kb_s() == 128 and config.get_upload_burst_kb() == 256
+    assert config.get_bulk_upload_window() == ''
+    print("OK - upload settings default to config and follow the server")
+
+    body = os.urandom(bandwidth.CHUNK_BYTES * 2 + 10)
+    throttled = Throttled(body, TokenBucket(0))
+    chunks = list(throttled)
+    assert len(throttled) == len(body) and b''.join(chunks) == body
+    assert [len(c) for c in chunks] == [bandwidth.CHUNK_BYTES, bandwidth.CHUNK_BYTES, 10]
+    assert b''.join(throttled) == body
+    print("OK - a throttled body sends the same bytes in chunks, and can be sent again")
+
+    os.environ['TRACKER_UPLOAD_RATE_KB_S'] = '0'
+    body = b'x' * 100
+    assert bandwidth.throttled(body) is body
+    os.environ['TRACKER_UPLOAD_RATE_KB_S'] = '50'
+    assert isinstance(bandwidth.throttled(body), Throttled)
+    assert bandwidth.throttled({'a': 1}) == {'a': 1}
+    bandwidth._bucket.configure(0)
+    print("OK - bodies are only wrapped while a rate limit is set")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    os.environ.clear()
+    os.environ.update(saved_env)
@@ -0,0 +1,67 @@
+"""
+Quick test script to verify the client row and batch ids used for idempotent ingest
+"""
+import sys
+import os
+import uuid
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing client ids...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import client_ids
+    from client_ids import row_uid, batch_uid
+    from store import LocalStore
+    print("OK - Client ids module imported")
+
+    store = LocalStore(os.path.join(tmp, 'agent.db'))
+    store.execute('CREATE TABLE agent_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID')
+    store.execute("INSERT INTO agent_meta (key, value) VALUES ('client_id', ?)", (str(uuid.uuid4()),))
+    client_ids._namespace = None
+    client_ids.client_id(store)
+
+    uid = row_uid('activity', 7)
+    assert uid == row_uid('activity', '7')
+    uuid.UUID(uid)
+    print("OK - row ids are stable UUIDs")
+
+    assert uid != row_uid('activity', 8)
+    assert uid != row_uid('application', 7)
+    namespace = client_ids._namespace
+    client_ids._namespace = uuid.uuid4()
+    assert uid != row_uid('activity', 7)
+    client_ids._namespace = namespace
+    print("OK - row ids differ by stream, row and install")
+
+    first = batch_uid(['3', '1', '2'], [10, 11], {'activity': {'items': 4, 'bytes': 288}}, 5)
+    again = batch_uid([1, 2, 3], [10, 11], {'activity': {'bytes': 288, 'items': 4}}, 5)
+    assert first == again
+    print("OK - a retried batch keeps its id")
+
+    base = batch_uid([1, 2, 3])
+    assert base != batch_uid([1, 2, 4])
+    assert base != batch_uid([1, 2, 3], [10])
+    assert base != batch_uid([1, 2, 3], evicted={'events': {'items': 1, 'bytes': 50}})
+    print("OK - batch ids differ by content")
+
+    evicted = {'screenshots': {'items': 2, 'bytes': 4096}}
+    assert batch_uid(evicted=evicted, report_seq=0) != batch_uid(evicted=evicted, report_seq=1)
+    assert batch_uid([1], report_seq=0) == batch_uid([1], report_seq=3)
+    print("OK - equal eviction reports get their own id; the sequence only matters with evictions")
+
+    client_ids._namespace = None
+    store.close()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
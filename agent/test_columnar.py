@@ -0,0 +1,96 @@
+"""
+Quick test script to verify the columnar ingest wire format
+"""
+import sys
+import os
+import uuid
+import json
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing columnar wire format...")
+print("=" * 50)
+
+try:
+    import columnar
+    print("OK - Columnar module imported")
+
+    def activity_row(i, uid=True):
+        return {
+            'client_uid': str(uuid.uuid4()) if uid else None,
+            'start_time': '2025-01-01 %02d:%02d:00' % (i // 60, i % 60),
+            'end_time': '2025-01-01 %02d:%02d:00' % ((i + 1) // 60, (i + 1) % 60),
+            'duration_seconds': 60,
+            'productive_seconds': i % 61,
+            'unproductive_seconds': 0,
+            'idle_seconds': 60 - i % 61,
+            'mouse_moves': i * 37,
+            'key_presses': 4000000000 if i == 3 else i,
+        }
+
+    def payload(rows):
+        return {
+            'username': 'jane',
+            'machine_id': 'WIN-ABC123',
+            'hostname': 'DESK-01',
+            'batch_id': str(uuid.uuid4()),
+            'activity': rows,
+            'application_usage': [{'process_name': 'code.exe', 'duration_seconds': 30}],
+            'evicted': {'screenshots': {'items': 2, 'bytes': 4096}},
+            '_activity_ids': ['1', '2'],
+        }
+
+    sent = payload([activity_row(i) for i in range(90)])
+    assert columnar.decode(columnar.encode(sent)) == {k: v for k, v in sent.items() if not k.startswith('_')}
+    print("OK - a payload round-trips; agent-only keys are left out")
+
+    rows = [activity_row(0, uid=False), activity_row(1)]
+    assert columnar.decode(columnar.encode(payload(rows)))['activity'] == rows
+    print("OK - rows without a client_uid round-trip")
+
+    row = activity_row(5)
+    row['duration_seconds'] = 999
+    assert columnar.decode(columnar.encode(payload([row])))['activity'][0]['duration_seconds'] == 60
+    print("OK - duration is derived from the timestamps")
+
+    body = columnar.encode(payload([]))
+    assert body.startswith(columnar.MAGIC)
+    # ingest.php reads a missing table as no rows
+    assert columnar.decode(body).get('activity', []) == []
+    print("OK - an empty activity list encodes")
+
+    big = payload([activity_row(i) for i in range(500)])
+    assert len(columnar.encode(big)) < len(json.dumps(big, separators=(',', ':'))) / 2
+    print("OK - under half the size of the same JSON")
+
+    for value in (-1, 2 ** 32):
+        row = activity_row(1)
+        row['mouse_moves'] = value
+        try:
+            columnar.encode(payload([row]))
+            raise AssertionError(f'{value} should not fit a u32 column')
+        except ValueError:
+            pass
+    print("OK - values that do not fit their column raise ValueError")
+
+    try:
+        columnar.decode(b'{"activity": []}')
+        raise AssertionError('JSON body decoded')
+    except ValueError:
+        pass
+    body = bytearray(columnar.encode(payload([activity_row(1)])))
+    body[4] = columnar.VERSION + 1
+    try:
+        columnar.decode(bytes(body))
+        raise AssertionError('newer version decoded')
+    except ValueError:
+        pass
+    print("OK - JSON and newer format versions are rejected")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,79 @@
+"""
+Quick test script to verify activity backlog roll-up
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing activity compaction...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import schema
+    import compaction
+    from store import LocalStore
+    from sync_queue import StreamQueue
+    print("OK - Compaction module imported")
+
+    COLUMNS = ('start_time', 'end_time', 'productive_seconds', 'unproductive_seconds', 'idle_seconds', 'mouse_moves', 'key_presses')
+    BASE = 1735689600  # 2025-01-01 00:00:00 UTC
+    NOW = BASE + 2 * 86400
+
+    def backlog(name):
+        store = LocalStore(os.path.join(tmp, name))
+        schema.migrate(store)
+        minutes = [0, 1, 2, 3, 4, 5, 10, 11, 59, 60]
+        starts = [BASE + m * 60 for m in minutes] + [NOW - 60]
+        store.executemany(
+            'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, '
+            'mouse_moves, key_presses) VALUES (?, ?, 60, 0, 0, 1, 2)',
+            [(start, start + 60) for start in starts]
+        )
+        return store, StreamQueue('activity', COLUMNS, store=store)
+
+    def minutes(store):
+        return [(rid, (start - BASE) // 60, (end - start) // 60, mouse)
+                for rid, start, end, mouse in store.query('SELECT id, start_time, end_time, mouse_moves FROM activity ORDER BY id')]
+
+    expected = [(1, 0, 1, 1), (2, 1, 1, 1), (3, 2, 4, 4), (7, 10, 2, 2), (9, 59, 1, 1), (10, 60, 1, 1), (11, 2879, 1, 1)]
+
+    store, queue = backlog('rollup.db')
+    queue.mark_sent([2])
+    assert compaction.rollup(queue, span_seconds=3600, min_age_seconds=3600, store=store, now=NOW) == 4
+    assert minutes(store) == expected, minutes(store)
+    print("OK - rows at or below the sent watermark are left alone")
+    print("OK - contiguous minutes merge; gaps, hour boundaries and recent rows do not")
+
+    assert compaction.rollup(queue, span_seconds=3600, min_age_seconds=3600, store=store, now=NOW) == 0
+    store.close()
+    print("OK - a second pass finds nothing left to merge")
+
+    page_rows = compaction._PAGE_ROWS
+    compaction._PAGE_ROWS = 3
+    try:
+        store, queue = backlog('paged.db')
+        queue.mark_sent([2])
+        assert compaction.rollup(queue, span_seconds=3600, min_age_seconds=3600, store=store, now=NOW) == 4
+        assert minutes(store) == expected, minutes(store)
+    finally:
+        compaction._PAGE_ROWS = page_rows
+    print("OK - a span split across pages still merges into one row")
+
+    assert compaction.rollup(queue, span_seconds=3600, min_age_seconds=0, max_rows=1, store=store, now=NOW) == 0
+    assert compaction.maybe_compact(queue, threshold=100, store=store) == 0
+    store.close()
+    print("OK - nothing happens below the backlog threshold")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
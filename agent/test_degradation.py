@@ -0,0 +1,101 @@
+"""
+Quick test script to verify graceful degradation under a sync backlog
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing degradation...")
+print("=" * 50)
+
+try:
+    import degradation
+    from degradation import DegradationController, LADDER
+    print("OK - Degradation module imported")
+
+    NOW = 1735689600
+
+    class FakeQueue:
+        def __init__(self, backlog=0, oldest=None):
+            self.pending = backlog
+            self.oldest_time = oldest
+
+        def backlog(self):
+            return self.pending
+
+        def oldest(self, column):
+            return self.oldest_time
+
+    activity = FakeQueue()
+    screenshots = FakeQueue()
+    deferred = [False]
+    degradation.bandwidth.bulk_deferred = lambda now=None: deferred[0]
+
+    def controller():
+        return DegradationController(activity, screenshots, start_screenshots=10, start_hours=1, enabled=True)
+
+    def backlog(shots=0, hours=None):
+        screenshots.pending = shots
+        screenshots.oldest_time = None
+        activity.oldest_time = None if hours is None else NOW - hours * 3600
+
+    c = controller()
+    backlog(shots=30)
+    assert c.pressure(NOW) == 3
+    backlog(shots=5, hours=2)
+    assert c.pressure(NOW) == 2
+    backlog()
+    assert c.pressure(NOW) == 0
+    print("OK - pressure is the larger of backlog depth and age")
+
+    backlog(shots=500)
+    screenshots.oldest_time = NOW - 10 * 3600
+    deferred[0] = True
+    assert c.pressure(NOW) == 0
+    deferred[0] = False
+    print("OK - screenshots waiting for their upload window are not backlog")
+
+    c = controller()
+    backlog(shots=1000)
+    assert [c.update(NOW) for _ in range(len(LADDER) + 1)] == [1, 2, 3, 4, 5, 5, 5]
+    print("OK - climbs one level per update")
+
+    c = controller()
+    backlog(shots=25)
+    c.update(NOW)
+    assert c.update(NOW) == 2
+    # Below the level 2 threshold, but not below half of it: hold
+    backlog(shots=15)
+    assert c.update(NOW) == 2
+    backlog(shots=9)
+    assert c.update(NOW) == 1 and c.update(NOW) == 1
+    backlog(shots=4)
+    assert c.update(NOW) == 0
+    print("OK - restores one level per update, with hysteresis")
+
+    c = controller()
+    c.enabled = False
+    backlog(shots=1000)
+    assert c.update(NOW) == 0
+    print("OK - disabled never degrades")
+
+    c = controller()
+    assert (c.screenshot_quality(40), c.screenshot_scale(), c.screenshot_interval(300), c.scan_interval(2)) == (40, 1.0, 300, 2)
+    c.level = 1
+    assert c.screenshot_quality(40) == 30
+    c.level = 2
+    assert (c.screenshot_quality(40), c.screenshot_scale()) == (20, 0.75)
+    # Quality never drops below the floor (or the configured value when that is lower)
+    assert c.screenshot_quality(12) == 10 and c.screenshot_quality(8) == 8
+    c.level = len(LADDER) - 1
+    assert (c.screenshot_scale(), c.screenshot_interval(300), c.scan_interval(2)) == (0.5, 1200, 8)
+    print("OK - capture settings follow the level")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,115 @@
+"""
+Quick test script to verify request body compression and its fallbacks
+"""
+import sys
+import os
+import gzip
+import json
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing HTTP compression...")
+print("=" * 50)
+
+try:
+    import columnar
+    import http_client
+    import http_compression
+    print("OK - HTTP compression module imported")
+
+    URL = 'http://server/api/ingest.php'
+
+    class Response:
+        def __init__(self, status_code, error=None, headers=None):
+            self.status_code = status_code
+            self.error = error
+            self.headers = headers or {}
+
+        def json(self):
+            return {'error': self.error} if self.error else {'status': 'ok'}
+
+    sent = []
+
+    def serve(*responses):
+        """Answer the next POSTs with `responses` and record (Content-Type, Content-Encoding, body) of each"""
+        queue = list(responses)
+        del sent[:]
+
+        def post(url, timeout=None, data=None, headers=None, **kwargs):
+            encoding = headers.get('Content-Encoding')
+            body = gzip.decompress(data) if encoding == 'gzip' else data
+            sent.append((headers['Content-Type'], encoding, body))
+            return queue.pop(0)
+        http_client.post = post
+
+    def reset():
+        http_compression._server_encodings = None
+        http_compression._disabled_until = 0.0
+        http_compression._server_formats.clear()
+        http_compression._columnar_disabled_until.clear()
+
+    payload = {'username': 'jane', 'machine_id': 'WIN-ABC123', 'activity': [], 'note': 'x' * 4000}
+    as_json = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    reset()
+    serve(Response(200, headers={'Accept-Encoding': 'gzip, zstd'}))
+    assert http_compression.post_json(URL, payload).status_code == 200
+    assert sent == [('application/json', 'gzip', as_json)]
+    assert http_compression._server_encodings == {'gzip', 'zstd'}
+    print("OK - large bodies are gzipped and the advertised encodings are learnt")
+
+    reset()
+    serve(Response(400, 'Missing username or machine_id'))
+    assert http_compression.post_json(URL, payload).status_code == 400
+    assert len(sent) == 1
+    print("OK - a 400 about the payload itself is not retried")
+
+    reset()
+    serve(Response(400, 'Invalid JSON'), Response(200))
+    assert http_compression.post_json(URL, payload).status_code == 200
+    assert [(t, e) for t, e, _ in sent] == [('application/json', 'gzip'), ('application/json', None)]
+    serve(Response(200))
+    http_compression.post_json(URL, payload)
+    assert sent[0][1] is None
+    print("OK - an older server that could not read gzip gets one uncompressed retry, then identity")
+
+    reset()
+    serve(Response(415, 'Unsupported Content-Encoding'), Response(200))
+    assert http_compression.post_json(URL, payload).status_code == 200
+    assert [e for _, e, _ in sent] == ['gzip', None]
+    assert http_compression._server_encodings == set()
+    print("OK - a 415 drops the encoding and retries once")
+
+    reset()
+    http_compression._server_formats[URL] = {columnar.CONTENT_TYPE}
+    serve(Response(200))
+    http_compression.post_payload(URL, payload)
+    assert sent == [(columnar.CONTENT_TYPE, 'gzip', columnar.encode(payload))]
+    print("OK - columnar once the endpoint advertises it")
+
+    serve(Response(400, 'Missing username or machine_id'))
+    assert http_compression.post_payload(URL, payload).status_code == 400
+    assert len(sent) == 1
+    print("OK - a columnar body refused for its payload is not resent as JSON")
+
+    serve(Response(400, 'Invalid columnar body'), Response(200))
+    assert http_compression.post_payload(URL, payload).status_code == 200
+    assert [(t, e) for t, e, _ in sent] == [(columnar.CONTENT_TYPE, 'gzip'), ('application/json', 'gzip')]
+    assert sent[1][2] == as_json
+    assert http_compression.choose_format(URL) == 'application/json'
+    print("OK - a refused columnar body costs one JSON retry under the same encoding")
+
+    reset()
+    http_compression._server_formats[URL] = {columnar.CONTENT_TYPE}
+    serve(Response(400, 'Invalid compressed body'), Response(400, 'Invalid columnar body'))
+    assert http_compression.post_payload(URL, payload).status_code == 400
+    assert [(t, e) for t, e, _ in sent] == [(columnar.CONTENT_TYPE, 'gzip'), (columnar.CONTENT_TYPE, None)]
+    print("OK - at most two requests per payload, whatever the server says")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,110 @@
+"""
+Quick test script to verify the durable event outbox
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing outbox...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import store
+    import schema
+    import outbox
+    print("OK - Outbox module imported")
+
+    store._store = store.LocalStore(os.path.join(tmp, 'agent.db'))
+    schema.migrate(store._store)
+
+    def pending_ids(kind='website'):
+        return [rid for rid, _, _ in outbox.pending(kind, 1000)]
+
+    for i in range(5):
+        outbox.enqueue('website', 'report', {'i': i})
+    rows = outbox.pending('website', 3)
+    assert [(action, payload['i']) for _, action, payload in rows] == [('report', 0), ('report', 1), ('report', 2)]
+    print("OK - events come back oldest first, limited to the batch")
+
+    ids = pending_ids()
+    outbox.ack('website', ids[:2])
+    assert pending_ids() == ids[2:]
+    assert outbox._queue('website').watermark == ids[1]
+    print("OK - acknowledged events are removed")
+
+    count, size = outbox.drop_oldest('website', 2)
+    assert count == 2 and size > 0 and pending_ids() == ids[4:]
+    print("OK - drop_oldest sheds the oldest events")
+    outbox.ack('website', pending_ids())
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+        def json(self):
+            return {'status': 'ok'}
+
+    def ship(statuses):
+        responses = iter(statuses)
+        posted = []
+
+        def post_json(url, payload):
+            posted.append(payload['i'])
+            status = next(responses)
+            if isinstance(status, Exception):
+                raise status
+            return Response(status)
+
+        original = outbox.http_compression.post_json
+        outbox.http_compression.post_json = post_json
+        try:
+            return outbox._ship_kind('website', None), posted
+        finally:
+            outbox.http_compression.post_json = original
+
+    outbox.register_handler('website', 'http://server/api/website.php')
+    for i in range(4):
+        outbox.enqueue('website', 'report', {'i': i})
+    assert ship([200, 503]) == (1, [0, 1])
+    assert ship([429]) == (0, [1])
+    assert ship([ConnectionError('down')]) == (0, [1])
+    print("OK - delivery is in order and stops at a transient failure")
+
+    assert ship([400, 200, 200]) == (3, [1, 2, 3])
+    assert pending_ids() == []
+    print("OK - an event rejected with a permanent 4xx is dropped")
+
+    def app_event(action, name, **extra):
+        outbox.enqueue('application', action, dict({'application_name': name, 'process_name': name + '.exe'}, **extra))
+
+    app_event('report', 'a', session_start='2025-01-01 09:00:00')
+    app_event('report', 'b', session_start='2025-01-01 09:01:00')
+    app_event('update_duration', 'a', duration_seconds=600, session_end='2025-01-01 09:10:00')
+    app_event('report', 'c', session_start='2025-01-01 09:02:00')
+    sessions, session_ids = outbox.load_application_sessions()
+    app_ids = pending_ids('application')
+    assert [(s['application_name'], s['duration_seconds'], s['session_end']) for s in sessions] == [('a', 600, '2025-01-01 09:10:00')]
+    assert session_ids == [app_ids[0], app_ids[2]]
+    print("OK - a report followed by its duration update becomes one session")
+
+    outbox.ack('application', app_ids)
+    app_event('update_duration', 'a', duration_seconds=30, session_end='2025-01-01 10:00:00')
+    app_event('report', 'a', session_start='2025-01-01 10:05:00')
+    app_event('update_duration', 'a', duration_seconds=60, session_end='2025-01-01 10:06:00')
+    assert outbox.load_application_sessions() == ([], [])
+    print("OK - an orphan duration update keeps its application on the per-event path")
+
+    store.close_store()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
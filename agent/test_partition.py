@@ -0,0 +1,72 @@
+"""
+Quick test script to verify splitting sync work into balanced requests
+"""
+import sys
+import os
+import random
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing partition...")
+print("=" * 50)
+
+try:
+    from partition import split_contiguous, pack_greedy
+    print("OK - Partition module imported")
+
+    def covers(bounds, count):
+        """Runs are contiguous, in order and cover every item exactly once"""
+        return (bounds[0][0] == 0 and bounds[-1][1] == count
+                and all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+                and all(start < end for start, end in bounds))
+
+    assert split_contiguous([], 4) == []
+    assert split_contiguous([10] * 50, 1) == [(0, 50)]
+    assert split_contiguous([10] * 100, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    assert split_contiguous([10, 10], 8) == [(0, 1), (1, 2)]
+    print("OK - equal items split evenly, never into more runs than items")
+
+    sizes = [1000] * 10 + [10] * 1000
+    bounds = split_contiguous(sizes, 2)
+    loads = [sum(sizes[a:b]) for a, b in bounds]
+    assert covers(bounds, len(sizes)) and max(loads) - min(loads) < 1000
+    print("OK - runs are balanced by bytes, not by count")
+
+    sizes = [100] * 40
+    bounds = split_contiguous(sizes, 1, max_bytes=1000)
+    assert covers(bounds, 40) and all(sum(sizes[a:b]) <= 1000 for a, b in bounds)
+    bounds = split_contiguous(sizes, 1, max_items=7)
+    assert covers(bounds, 40) and all(b - a <= 7 for a, b in bounds)
+    bounds = split_contiguous([10, 10, 5000, 10], 1, max_bytes=100)
+    assert covers(bounds, 4) and (2, 3) in bounds
+    print("OK - byte and item ceilings add runs; an oversized item gets its own")
+
+    sizes = [10] * 100
+    bounds = split_contiguous(sizes, 2, first_extra=400)
+    assert covers(bounds, 100) and bounds[0] == (0, 30)
+    assert split_contiguous(sizes, 1, max_bytes=500, first_extra=400)[0] == (0, 10)
+    print("OK - the first run carries the extra bytes")
+
+    rng = random.Random(7)
+    for _ in range(200):
+        sizes = [rng.randint(1, 300) for _ in range(rng.randint(1, 80))]
+        bounds = split_contiguous(sizes, rng.randint(1, 6), max_bytes=1000, max_items=25, first_extra=rng.randint(0, 200))
+        assert covers(bounds, len(sizes)) and all(b - a <= 25 for a, b in bounds)
+    print("OK - random inputs are covered within the ceilings")
+
+    sizes = [500, 20, 300, 300, 80, 900, 10]
+    bins = pack_greedy(sizes, 2, max_bytes=1000, max_items=3)
+    assert sorted(i for b in bins for i in b) == list(range(len(sizes)))
+    assert all(len(b) <= 3 and (len(b) == 1 or sum(sizes[i] for i in b) <= 1000) for b in bins)
+    assert all(b == sorted(b) for b in bins)
+    sizes = [5, 5, 4, 3, 3, 2]
+    assert sorted(sum(sizes[i] for i in b) for b in pack_greedy(sizes, 2)) == [11, 11]
+    print("OK - greedy packing places every item once, within ceilings, balanced")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Quick test script to verify circuit breakers, backoff and the offline state
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing resilience...")
+print("=" * 50)
+
+try:
+    import resilience
+    from resilience import CircuitBreaker, CircuitOpenError, ServerState, CLOSED, OPEN, HALF_OPEN
+    print("OK - Resilience module imported")
+
+    for attempt in range(1, 10):
+        delay = min(300, 5 * 2 ** (attempt - 1))
+        assert delay / 2 <= resilience.backoff_delay(attempt, 5, 300) <= delay
+    assert resilience.parse_retry_after('30') == 30.0
+    assert resilience.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') is None
+    assert resilience.parse_retry_after(None) is None
+    print("OK - jittered exponential backoff stays within its bounds; Retry-After parsed")
+
+    breaker = CircuitBreaker('test', failure_threshold=3, base=60, maximum=600)
+    assert not breaker.record_failure() and not breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow() and 29 < breaker.retry_in() <= 60
+    print("OK - the circuit opens after consecutive failures and then fails fast")
+
+    breaker.retry_at = 0
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    print("OK - once the delay has passed exactly one trial call goes through")
+
+    assert breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2 and breaker.retry_in() > 59
+    print("OK - a failed trial re-opens the circuit with a longer delay")
+
+    breaker.retry_at = 0
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == OPEN and breaker.allow()
+    assert breaker.record_success() and breaker.state == CLOSED and breaker.trips == 0
+    assert not breaker.record_success()
+    print("OK - an unused trial slot is given back; a successful trial closes the circuit")
+
+    breaker = CircuitBreaker('test', failure_threshold=1, base=1, maximum=1)
+    breaker.record_failure(min_delay=120)
+    assert breaker.retry_in() > 100
+    print("OK - a server-requested Retry-After lengthens the delay")
+
+    probes = []
+    state = ServerState(probe=lambda: probes.append(1) or probe_result)
+    probe_result = False
+    url = 'http://server/api/ingest.php'
+    assert state.online() and state.ready(url) and state.summary() == 'online'
+
+    for _ in range(resilience.BREAKER_FAILURES):
+        state.record_response(url, 503)
+    assert not state.ready(url) and state.online()
+    try:
+        state.check(url)
+        raise AssertionError('expected CircuitOpenError')
+    except CircuitOpenError as e:
+        assert e.name == 'ingest.php'
+    assert state.ready('http://server/api/screenshots.php')
+    assert state.summary() == 'open: ingest.php'
+    print("OK - overload statuses open only that endpoint's circuit")
+
+    state.record_error('http://server/api/screenshots.php', unreachable=True)
+    assert state.offline() and not state.online() and probes == []
+    assert state.summary().startswith('offline')
+    print("OK - a failed connection takes the agent offline without probing")
+
+    state.server.retry_at = 0
+    assert not state.online() and probes == [1]
+    assert state.offline() and state.server.trips == 2
+    print("OK - a failed health probe keeps the agent offline with a longer delay")
+
+    state.server.retry_at = 0
+    probe_result = True
+    state.breaker(url).retry_at = 0
+    assert state.ready(url) and probes == [1, 1]
+    assert not state.offline()
+    assert state.breaker(url).state == OPEN
+    state.check(url)
+    assert state.breaker(url).state == HALF_OPEN
+    state.record_response(url, 200)
+    assert state.breaker(url).state == CLOSED and state.summary() == 'online'
+    print("OK - a good probe brings the agent online; ready() leaves the trial to the next real request")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,129 @@
+"""
+Quick test script to verify resumable screenshot uploads
+"""
+import sys
+import os
+import uuid
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing resumable upload...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+store = None
+try:
+    import client_ids
+    import resumable_upload
+    import schema
+    from store import LocalStore
+    print("OK - Resumable upload module imported")
+
+    class Response:
+        def __init__(self, status_code, body):
+            self.status_code = status_code
+            self._body = body
+
+        def json(self):
+            return self._body
+
+    class PartsServer:
+        """api/screenshot_parts.php in memory: appends a part only at the offset it already has"""
+
+        def __init__(self):
+            self.received = bytearray()
+            self.offsets = []
+            self.drop_response_after = None
+
+        def post(self, url, params=None, data=None, headers=None):
+            self.offsets.append(params['offset'])
+            if params['offset'] != len(self.received):
+                return Response(409, {'error': 'Offset mismatch', 'offset': len(self.received)})
+            self.received += data
+            if self.drop_response_after is not None and len(self.offsets) == self.drop_response_after:
+                raise ConnectionError('connection reset')
+            stored = len(self.received) >= params['total']
+            return Response(200, {'status': 'ok', 'offset': len(self.received), 'stored': stored})
+
+    data = bytes(range(256)) * 10
+    row = (42, 1735689600, 'sc_42.jpg')
+    store = LocalStore(os.path.join(tmp, 'agent.db'))
+    schema.migrate(store)
+    client_ids._namespace = uuid.uuid4()
+    resumable_upload.PART_BYTES = 1000
+    resumable_upload.screenshot_store.read = lambda row: data
+
+    def serve():
+        server = PartsServer()
+        resumable_upload.http_client.post = server.post
+        return server
+
+    def upload():
+        return resumable_upload.upload(row, store)
+
+    server = serve()
+    assert upload() == (True, True, False)
+    assert server.offsets == [0, 1000, 2000]
+    assert bytes(server.received) == data
+    assert resumable_upload.acked_bytes(42, store) == 0
+    print("OK - a screenshot goes up in parts and its progress is forgotten once stored")
+
+    server = serve()
+    calls = []
+
+    def failing(url, **kwargs):
+        calls.append(kwargs['params']['offset'])
+        if len(calls) == 2:
+            raise ConnectionError('connection reset')
+        return server.post(url, **kwargs)
+
+    resumable_upload.http_client.post = failing
+    assert upload() == (False, False, False)
+    assert resumable_upload.acked_bytes(42, store) == 1000
+    resumable_upload.http_client.post = server.post
+    assert upload() == (True, True, False)
+    assert server.offsets == [0, 1000, 2000]
+    assert bytes(server.received) == data
+    print("OK - an interrupted upload resumes from the acknowledged offset")
+
+    # The second part lands but its response is lost, so the agent still has 1000 acknowledged
+    server = serve()
+    server.drop_response_after = 2
+    assert upload() == (False, False, False)
+    assert resumable_upload.acked_bytes(42, store) == 1000
+    server.drop_response_after = None
+    assert upload() == (True, True, False)
+    assert server.offsets == [0, 1000, 1000, 2000]
+    assert bytes(server.received) == data
+    print("OK - a lost response continues from the server's offset")
+
+    resumable_upload.screenshot_store.read = lambda row: None
+    serve()
+    assert upload() == (True, False, True)
+    resumable_upload.screenshot_store.read = lambda row: data
+    print("OK - an unreadable screenshot is reported")
+
+    resumable_upload._record(store, 42, 1000)
+    resumable_upload.prune(store)
+    assert resumable_upload.acked_bytes(42, store) == 0
+    print("OK - prune() forgets rows no longer queued")
+
+    resumable_upload.http_client.post = lambda url, **kwargs: Response(404, None)
+    assert upload() == (False, False, False)
+    assert not resumable_upload.available()
+    assert not resumable_upload.wanted(len(data) * 1000)
+    print("OK - a server without the parts endpoint falls back to whole uploads")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    if store is not None:
+        store.close()
+    shutil.rmtree(tmp, ignore_errors=True)
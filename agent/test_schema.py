@@ -0,0 +1,90 @@
+"""
+Quick test script to verify agent.db schema migrations
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing schema migrations...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import schema
+    from store import LocalStore
+    print("OK - Schema module imported")
+
+    def open_store(name):
+        return LocalStore(os.path.join(tmp, name))
+
+    def tables(store):
+        return {name: sql for name, sql in store.query("SELECT name, sql FROM sqlite_master WHERE type = 'table'")}
+
+    store = open_store('fresh.db')
+    assert schema.migrate(store) == schema.SCHEMA_VERSION
+    assert store.query_one('PRAGMA user_version')[0] == schema.SCHEMA_VERSION
+    for table in ('activity', 'screenshots', 'agent_meta', 'screenshot_uploads', 'outbox_application',
+                  'queue_watermarks', 'storage_evictions'):
+        assert table in tables(store), table
+    print("OK - a fresh database reaches the current version")
+
+    client_id = store.query_one("SELECT value FROM agent_meta WHERE key = 'client_id'")
+    assert schema.migrate(store) == schema.SCHEMA_VERSION
+    assert store.query_one("SELECT value FROM agent_meta WHERE key = 'client_id'") == client_id
+    store.close()
+    print("OK - migrating again changes nothing")
+
+    store = open_store('unversioned.db')
+    with store.transaction() as cur:
+        schema._v1_baseline(cur)
+        cur.executemany(
+            'INSERT INTO activity (id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, '
+            'mouse_moves, key_presses) VALUES (?, ?, ?, 60, 0, 0, 5, 7)',
+            [(3, '2025-01-01 00:00:00', '2025-01-01 00:01:00'), (9, '2025-01-01 00:01:00', '2025-01-01 00:02:00')]
+        )
+        cur.execute('DELETE FROM activity WHERE id = 9')
+    schema.migrate(store)
+    assert store.query('SELECT id, start_time, end_time FROM activity') == [(3, 1735689600, 1735689660)]
+    assert schema.utc_text(1735689600) == '2025-01-01 00:00:00'
+    print("OK - an unversioned database keeps its rows as epoch seconds")
+
+    # Ids already handed out are never reused, even after the rebuild
+    new_id = store.execute(
+        'INSERT INTO activity (start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, '
+        'mouse_moves, key_presses) VALUES (0, 60, 0, 0, 0, 0, 0)')
+    assert new_id == 10, new_id
+    store.close()
+    print("OK - the rebuild keeps the AUTOINCREMENT high-water mark")
+
+    store = open_store('newer.db')
+    store.execute(f'PRAGMA user_version = {schema.SCHEMA_VERSION + 1}')
+    assert schema.migrate(store) == schema.SCHEMA_VERSION + 1
+    assert 'activity' not in tables(store)
+    store.close()
+    print("OK - a database from a newer agent is left alone")
+
+    # SQLite before 3.37 rejects STRICT, so no migration may emit it there
+    strict = schema._STRICT
+    schema._STRICT = ''
+    try:
+        store = open_store('old_sqlite.db')
+        assert schema.migrate(store) == schema.SCHEMA_VERSION
+    finally:
+        schema._STRICT = strict
+    for name, sql in tables(store).items():
+        assert 'STRICT' not in (sql or '').upper(), name
+    store.close()
+    print("OK - no STRICT tables on SQLite without support for them")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
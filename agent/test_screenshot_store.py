@@ -0,0 +1,92 @@
+"""
+Quick test script to verify screenshot pack segments
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing screenshot packs...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import store
+    import schema
+    import screenshot_store
+    from sync_queue import StreamQueue
+    print("OK - Screenshot store module imported")
+
+    store._store = store.LocalStore(os.path.join(tmp, 'agent.db'))
+    schema.migrate(store._store)
+    screen_dir = os.path.join(tmp, 'screens')
+    pack_dir = os.path.join(tmp, 'packs')
+    os.makedirs(screen_dir)
+
+    packs = screenshot_store._packs = screenshot_store.ScreenshotPacks(pack_dir, segment_bytes=1000)
+    queue = StreamQueue('screenshots', screenshot_store.QUEUE_COLUMNS)
+
+    first = packs.add(b'a' * 600, 'sc_1.jpg', 1735689600)
+    second = packs.add(b'b' * 600, 'sc_2.jpg', 1735689660)
+    assert packs.segments() == {1: 600, 2: 600}
+    print("OK - a capture that does not fit starts a new segment")
+
+    with open(os.path.join(screen_dir, 'sc_0.jpg'), 'wb') as f:
+        f.write(b'legacy')
+    legacy = store._store.execute("INSERT INTO screenshots (taken_at, filename) VALUES (1735689540, 'sc_0.jpg')")
+    rows = queue.peek(10)
+    assert [r[0] for r in rows] == [first, second, legacy]
+    assert [screenshot_store.read(r, screen_dir) for r in rows] == [b'a' * 600, b'b' * 600, b'legacy']
+    assert [screenshot_store.size(r, screen_dir) for r in rows] == [600, 600, 6]
+    print("OK - packed and file-backed rows read back through one call")
+
+    # Delete-after-sync off: packed screenshots are written out as files before their segment goes
+    queue.ack([first])
+    assert screenshot_store.release(rows[:1], delete_screenshots=False, screen_dir=screen_dir) == 1
+    with open(os.path.join(screen_dir, 'sc_1.jpg'), 'rb') as f:
+        assert f.read() == b'a' * 600
+    assert packs.segments() == {2: 600}
+    print("OK - release keeps a copy when asked and deletes the unreferenced segment")
+
+    queue.ack([legacy])
+    assert screenshot_store.release(rows[2:], screen_dir=screen_dir) == 1
+    assert not os.path.exists(os.path.join(screen_dir, 'sc_0.jpg'))
+    print("OK - release deletes the file of a file-backed row")
+
+    # An unclean shutdown: a temp file, a row whose file is gone, a truncated segment and an orphan one
+    with open(os.path.join(screen_dir, 'sc_9.jpg' + screenshot_store.TMP_SUFFIX), 'wb') as f:
+        f.write(b'partial')
+    store._store.execute("INSERT INTO screenshots (taken_at, filename) VALUES (1735689720, 'sc_3.jpg')")
+    third = packs.add(b'c' * 500, 'sc_4.jpg', 1735689780)
+    with open(os.path.join(pack_dir, screenshot_store._segment_name(2)), 'r+b') as f:
+        f.truncate(500)
+    with open(os.path.join(pack_dir, screenshot_store._segment_name(7)), 'wb') as f:
+        f.write(b'orphan')
+    packs.close()
+    packs = screenshot_store._packs = screenshot_store.ScreenshotPacks(pack_dir, segment_bytes=1000)
+
+    result = screenshot_store.reconcile(queue, screen_dir=screen_dir)
+    assert result == {'temp_files': 1, 'dangling_rows': 2, 'segments': 2}, result
+    assert [r[0] for r in queue.peek(10)] == [third]
+    assert list(packs.segments()) == [3]
+    assert packs.read(*queue.peek(1)[0][3:]) == b'c' * 500
+    print("OK - reconcile drops rows without data and deletes orphan segments")
+
+    queue.ack([third])
+    assert packs.collect() == (1, 500)
+    assert screenshot_store.read((third, 1735689780, 'sc_4.jpg', 3, 0, 500), screen_dir) is None
+    print("OK - a row whose segment is gone reads as missing")
+
+    screenshot_store.close_packs()
+    store.close_store()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,64 @@
+"""
+Quick test script to verify the settings version handshake with api/ingest.php
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing settings version handshake...")
+print("=" * 50)
+
+saved_env = dict(os.environ)
+try:
+    import config
+    from config import update_from_server_response, get_settings_version
+    print("OK - Config module imported")
+
+    assert get_settings_version() is None
+    print("OK - a fresh agent has no settings version, so its first sync gets the full block")
+
+    update_from_server_response({
+        'status': 'ok', 'settings_version': '3.0', 'sync_interval_seconds': 60, 'parallel_sync_workers': 4,
+        'delete_screenshots_after_sync': True, 'upload_rate_kb_s': 256, 'bulk_upload_window': '22:00-06:00',
+    })
+    assert get_settings_version() == '3.0'
+    assert os.environ['TRACKER_SYNC_INTERVAL'] == '60' and os.environ['TRACKER_PARALLEL_WORKERS'] == '4'
+    assert config.get_upload_rate_kb_s() == 256 and config.get_bulk_upload_window() == '22:00-06:00'
+    print("OK - a full settings block is applied and its version remembered")
+
+    # Something local changed the environment: an unchanged reply must not rewrite it
+    os.environ['TRACKER_SYNC_INTERVAL'] = '90'
+    update_from_server_response({'status': 'ok', 'settings_version': '3.0', 'settings_unchanged': True})
+    assert get_settings_version() == '3.0' and os.environ['TRACKER_SYNC_INTERVAL'] == '90'
+    print("OK - settings_unchanged leaves every setting alone")
+
+    # Chunk responses of one round are merged: a full block wins over another chunk's unchanged reply
+    update_from_server_response({'status': 'ok', 'settings_unchanged': True, 'settings_version': '4.0',
+                                 'sync_interval_seconds': 120, 'parallel_sync_workers': 2})
+    assert get_settings_version() == '4.0'
+    assert os.environ['TRACKER_SYNC_INTERVAL'] == '120' and os.environ['TRACKER_PARALLEL_WORKERS'] == '2'
+    print("OK - a merged response that carries settings is still applied")
+
+    update_from_server_response({'status': 'ok', 'settings_version': '5.1', 'sync_interval_seconds': 5,
+                                 'parallel_sync_workers': 50, 'upload_rate_kb_s': -1})
+    assert get_settings_version() == '5.1'
+    assert os.environ['TRACKER_SYNC_INTERVAL'] == '120' and os.environ['TRACKER_PARALLEL_WORKERS'] == '2'
+    assert config.get_upload_rate_kb_s() == 256
+    print("OK - out-of-range values are ignored, the new version is still taken")
+
+    update_from_server_response(None)
+    update_from_server_response({'status': 'ok'})
+    assert get_settings_version() == '5.1'
+    print("OK - a reply from an older server without versions changes nothing")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    os.environ.clear()
+    os.environ.update(saved_env)
@@ -0,0 +1,78 @@
+"""
+Quick test script to verify screenshot packs and the storage budget eviction
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing storage governor...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import store
+    import schema
+    import screenshot_store
+    from sync_queue import StreamQueue
+    from storage_governor import StorageGovernor
+    print("OK - Storage modules imported")
+
+    store._store = store.LocalStore(os.path.join(tmp, 'agent.db'))
+    schema.migrate(store._store)
+    screen_dir = os.path.join(tmp, 'screens')
+    os.makedirs(screen_dir)
+
+    packs = screenshot_store._packs = screenshot_store.ScreenshotPacks(os.path.join(tmp, 'packs'), segment_bytes=1000)
+    images = [bytes([i]) * 400 for i in range(5)]
+    ids = [packs.add(data, f'sc_{i}.jpg', 1735689600 + i) for i, data in enumerate(images)]
+    assert packs.segments() == {1: 800, 2: 800, 3: 400}, packs.segments()
+    print("OK - captures fill a segment before the next one is started")
+
+    queue = StreamQueue('screenshots', screenshot_store.QUEUE_COLUMNS)
+    rows = queue.peek(10)
+    assert [r[0] for r in rows] == ids
+    assert [packs.read(*r[3:]) for r in rows] == images
+    print("OK - every queued row reads back its own bytes")
+
+    assert packs.collect() == (0, 0)
+    print("OK - a segment is kept while any row still refers to it")
+
+    governor = StorageGovernor(None, queue, screen_dir=screen_dir,
+                               budgets={'screenshots': 1000, 'activity': 1 << 30, 'events': 1 << 30})
+    before = governor.usage()['screenshots']
+    assert before == 2000
+    assert governor.enforce() == {'screenshots': 4}
+    after = governor.usage()['screenshots']
+    assert after <= 1000, after
+    assert packs.segments() == {3: 400}
+    assert [r[0] for r in queue.peek(10)] == ids[4:]
+    print("OK - eviction keeps going until whole segments are deleted and usage is under budget")
+
+    report = governor.pending_report()
+    assert report == {'screenshots': {'items': 4, 'bytes': before - after}}, report
+    print("OK - the report counts the bytes actually deleted")
+
+    governor._record('screenshots', 1, 10)
+    governor.clear_reported(report)
+    assert governor.pending_report() == {'screenshots': {'items': 1, 'bytes': 10}}
+    assert governor.report_sequence() == 1
+    print("OK - acknowledged counts are cleared, newer evictions are kept")
+
+    queue.ack(ids[4:])
+    assert packs.collect() == (1, 400) and packs.segments() == {}
+    print("OK - the last segment is deleted once its rows are uploaded")
+
+    packs.close()
+    store.close_store()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
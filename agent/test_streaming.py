@@ -0,0 +1,91 @@
+"""
+Quick test script to verify the in-flight byte budget and streamed multipart bodies
+"""
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing streaming...")
+print("=" * 50)
+
+try:
+    import streaming
+    from streaming import ByteBudget, MultipartBody, BodySourceError
+    print("OK - Streaming module imported")
+
+    budget = ByteBudget(100)
+    assert budget.acquire(60) and budget.acquire(40) and budget.in_flight == 100
+    assert budget.acquire(1, timeout=0.05) is False
+    print("OK - acquire() blocks once the budget is used up")
+
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: budget.acquire(50) and acquired.set())
+    waiter.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+    budget.release(60)
+    waiter.join(5)
+    assert acquired.is_set() and budget.in_flight == 90
+    print("OK - release() wakes a waiting producer")
+
+    budget.release(90)
+    assert budget.in_flight == 0
+    assert budget.acquire(500, timeout=0) and budget.in_flight == 500
+    assert budget.acquire(1, timeout=0.05) is False
+    budget.release(500)
+    budget.release(10)
+    assert budget.in_flight == 0
+    print("OK - an oversized body goes alone; over-release never goes negative")
+
+    assert streaming.get_budget() is streaming.get_budget()
+    assert streaming.get_budget().limit == streaming.SYNC_INFLIGHT_MB * 1024 * 1024
+    print("OK - one process-wide budget")
+
+    reads = []
+
+    def reader(data):
+        def read():
+            reads.append(data)
+            return data
+        return read
+
+    files = [('screenshots[]', 'a"b.jpg', 'image/jpeg', 3, reader(b'abc')),
+             ('screenshots[]', 'c.jpg', 'image/jpeg', 2, reader(b'de'))]
+    body = MultipartBody([('meta', '{"n": 2}')], files, boundary='XYZ')
+    assert body.content_type == 'multipart/form-data; boundary=XYZ'
+    assert reads == []
+    parts = iter(body)
+    next(parts)
+    next(parts)
+    assert reads == []
+    next(parts)
+    assert reads == [b'abc']
+    print("OK - a file is only read when the body reaches it")
+
+    data = b''.join(body)
+    assert len(data) == len(body)
+    assert data.startswith(b'--XYZ\r\nContent-Disposition: form-data; name="meta"\r\n\r\n{"n": 2}\r\n')
+    assert b'filename="a%22b.jpg"' in data and data.endswith(b'\r\nde\r\n--XYZ--\r\n')
+    assert b''.join(body) == data
+    print("OK - Content-Length matches the body, which can be sent again")
+
+    body = MultipartBody([], [('screenshots[]', 'x.jpg', 'image/jpeg', 5, lambda: b'short')])
+    assert b''.join(body)
+    body = MultipartBody([], [('screenshots[]', 'x.jpg', 'image/jpeg', 6, lambda: b'short')])
+    try:
+        b''.join(body)
+        raise AssertionError('expected BodySourceError')
+    except BodySourceError:
+        pass
+    print("OK - a file that changed size aborts the body")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,97 @@
+"""
+Quick test script to verify the weighted fair scheduling of sync lanes
+"""
+import sys
+import os
+from concurrent.futures import Future
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing sync lanes...")
+print("=" * 50)
+
+try:
+    from streaming import ByteBudget
+    from sync_lanes import Lane, LaneScheduler, QUANTUM
+    print("OK - Sync lanes module imported")
+
+    order = []
+
+    def jobs(name, count, size=QUANTUM, results=None):
+        """`count` jobs whose dispatch records `name` and returns a finished Future"""
+        def dispatch(n):
+            order.append(f'{name}{n}')
+            future = Future()
+            future.set_result(results[n] if results else (True, []))
+            return future
+        return [(size, lambda n=n: dispatch(n)) for n in range(count)]
+
+    def lanes(**kwargs):
+        lanes = {'control': Lane('control', 4), 'activity': Lane('activity', 2), 'screenshots': Lane('screenshots', 1)}
+        lanes.update(kwargs)
+        return lanes
+
+    budget = ByteBudget(1024 * 1024)
+    scheduler = LaneScheduler(budget, lanes())
+    # Added lowest priority first: the lanes' own order decides, not the order they were filled
+    scheduler.add('screenshots', jobs('s', 4))
+    scheduler.add('activity', jobs('a', 6))
+    scheduler.add('control', jobs('c', 2))
+    futures = scheduler.run()
+    assert order == ['c0', 'c1', 'a0', 'a1', 's0', 'a2', 'a3', 's1', 'a4', 'a5', 's2', 's3'], order
+    assert [len(futures[name]) for name in ('control', 'activity', 'screenshots')] == [2, 6, 4]
+    assert budget.in_flight == 0
+    print("OK - control first, then activity at twice the screenshots' share")
+
+    del order[:]
+    scheduler = LaneScheduler(ByteBudget(), lanes())
+    scheduler.add('activity', jobs('a', 2))
+    scheduler.add('activity', jobs('b', 1))
+    scheduler.add('screenshots', jobs('s', 2, size=QUANTUM * 5))
+    scheduler.run()
+    assert order == ['a0', 'a1', 'b0', 's0', 's1'], order
+    print("OK - jobs added to one lane go in order; jobs larger than a quantum still go")
+
+    del order[:]
+    scheduler = LaneScheduler(ByteBudget(), lanes(screenshots=Lane('screenshots', 1, max_bytes=QUANTUM * 3)))
+    scheduler.add('screenshots', jobs('s', 5))
+    assert len(scheduler.run()['screenshots']) == 3
+    del order[:]
+    scheduler = LaneScheduler(ByteBudget(), lanes(screenshots=Lane('screenshots', 1, max_bytes=QUANTUM)))
+    scheduler.add('screenshots', jobs('s', 2, size=QUANTUM * 4))
+    scheduler.run()
+    assert order == ['s0'], order
+    print("OK - a lane stops at its per-round byte cap; its first job always goes")
+
+    del order[:]
+    results = [(True, []), (False, []), (True, []), (True, [])]
+    scheduler = LaneScheduler(ByteBudget(), lanes())
+    scheduler.add('screenshots', jobs('s', 4, results=results), serial=True)
+    scheduler.add('activity', jobs('a', 2))
+    futures = scheduler.run()
+    assert order == ['a0', 'a1', 's0', 's1'], order
+    assert len(futures['screenshots']) == 2
+    print("OK - a serial lane ends the round at its first failed request")
+
+    budget = ByteBudget()
+
+    def broken():
+        raise RuntimeError('could not build the request')
+
+    scheduler = LaneScheduler(budget, lanes())
+    scheduler.add('activity', [(100, broken)])
+    try:
+        scheduler.run()
+        raise AssertionError('expected RuntimeError')
+    except RuntimeError:
+        pass
+    assert budget.in_flight == 0
+    print("OK - a job that fails to dispatch gives its bytes back to the budget")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,80 @@
+"""
+Quick test script to verify watermark draining of the local upload queues
+"""
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing sync queue watermarks...")
+print("=" * 50)
+
+tmp = tempfile.mkdtemp()
+try:
+    import schema
+    from sync_queue import StreamQueue, id_ranges
+    from store import LocalStore
+    print("OK - Sync queue module imported")
+
+    assert id_ranges([]) == []
+    assert id_ranges(['5', 1, 2, 3, 9, 8, 2]) == [(1, 3), (5, 5), (8, 9)]
+    print("OK - ids collapse into sorted contiguous ranges")
+
+    store = LocalStore(os.path.join(tmp, 'agent.db'))
+    with store.transaction() as cur:
+        schema._v1_baseline(cur)
+        cur.execute('CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, value TEXT NOT NULL)')
+    store.executemany('INSERT INTO items (value) VALUES (?)', [(f'v{i}',) for i in range(1, 11)])
+
+    def queue():
+        return StreamQueue('items', ('value',), store=store)
+
+    q = queue()
+    assert q.watermark == 0 and q.backlog() == 10
+    assert q.peek(3) == [(1, 'v1'), (2, 'v2'), (3, 'v3')]
+    assert [r[0] for r in q.peek(3, after=5)] == [6, 7, 8]
+    print("OK - peek reads oldest first past the watermark")
+
+    assert q.ack([1, 2, 3, 4]) == 4
+    assert q.watermark == 4 and q.backlog() == 6
+    print("OK - acknowledged rows deleted and watermark advanced")
+
+    # A later chunk delivered while an earlier one failed: the watermark waits for the gap
+    assert q.ack([7, 8]) == 2
+    assert q.watermark == 4
+    assert [r[0] for r in q.peek(10)] == [5, 6, 9, 10]
+    assert q.ack([5, 6]) == 2
+    assert q.watermark == 8, q.watermark
+    print("OK - a gap holds the watermark back until it is acknowledged")
+
+    assert queue().watermark == 8 and [r[0] for r in queue().peek(10)] == [9, 10]
+    print("OK - watermark persists across a restart")
+
+    assert q.remove([10]) == 1 and q.backlog() == 1
+    print("OK - remove() drops rows that will never be delivered")
+
+    assert q.sent_watermark == 0
+    q.mark_sent(['9', '12'])
+    q.mark_sent([11])
+    assert q.sent_watermark == 12 and queue().sent_watermark == 12
+    print("OK - mark_sent only moves forward and persists")
+
+    q.ack([9])
+    assert q.backlog() == 0 and q.peek(10) == []
+    new_id = store.execute("INSERT INTO items (value) VALUES ('v11')")
+    assert new_id == 11 and q.peek(10) == [(11, 'v11')]
+    assert q.oldest('value') == 'v11'
+    print("OK - drained queue picks up new rows; ids are never reused")
+
+    store.close()
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
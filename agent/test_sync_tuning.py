@@ -0,0 +1,90 @@
+"""
+Quick test script to verify adaptive sync batch sizes and worker count
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing sync tuning...")
+print("=" * 50)
+
+try:
+    import sync_tuning
+    from sync_tuning import AimdController, SyncTuner
+    print("OK - Sync tuning module imported")
+
+    def knob(initial=10):
+        return AimdController('test', 1, 20, initial, step=2, target_seconds=10)
+
+    assert knob().record(True, 1.0) == 12
+    assert knob().record(True, 1.0, saturated=False) == 10
+    assert knob().record(True, 7.0) == 10
+    print("OK - a fast full request adds a step; partial or middling ones hold")
+
+    assert knob().record(True, 11.0) == 5
+    assert knob().record(False, 1.0) == 5
+    k = knob(16)
+    k.record(False, 1.0)
+    assert k.record(False, 1.0) == 8
+    print("OK - a slow or failed request halves, once per target period")
+
+    k = knob(19)
+    assert k.record(True, 1.0) == 20 and k.record(True, 1.0) == 20
+    assert knob(1).record(False, 1.0) == 1
+    print("OK - the value stays within its bounds")
+
+    k = knob(10)
+    k.set_maximum(4)
+    assert k.value == 4
+    k = knob(10)
+    k.set_maximum(30)
+    assert k.value == 10
+    k.set_maximum(40, follow=True)
+    assert k.value == 40
+    print("OK - a lowered maximum clamps; a raised one only moves the value when followed")
+
+    tuner = SyncTuner(1)
+    assert tuner.worker_count(1) == 1 and tuner.worker_count(4) == 4
+    assert SyncTuner(6).worker_count(2) == 2
+    print("OK - the worker count follows the server setting both ways")
+
+    tuner = SyncTuner(1)
+    tuner.workers.set_maximum(4)
+    for _ in range(5):
+        tuner.record_round([(True, 0.1)], saturated=True)
+    assert tuner.worker_count(4) == 4
+    tuner = SyncTuner(8)
+    tuner.record_round([(True, 0.1), (True, sync_tuning.SYNC_TARGET_SECONDS + 1)], saturated=True)
+    assert tuner.workers.value == 4
+    tuner.record_round([], saturated=True)
+    assert tuner.workers.value == 4
+    print("OK - single-chunk rounds grow workers, a slow chunk halves them, empty rounds are ignored")
+
+    tuner = SyncTuner(1, max_request_bytes=100000)
+    assert tuner.activity_rows.value == 500
+    tuner.record_request_bytes(0, 5000)
+    tuner.record_request_bytes(100, 0)
+    assert tuner.bytes_per_row is None
+    tuner.record_request_bytes(500, 500000)
+    assert tuner.bytes_per_row == 1000
+    assert tuner.activity_rows.maximum == 100 and tuner.activity_rows.value == 100
+    print("OK - rows per chunk are capped at the request ceiling over the measured bytes per row")
+
+    for _ in range(30):
+        tuner.record_request_bytes(100, 10000)
+    assert tuner.bytes_per_row < 110
+    assert 900 < tuner.activity_rows.maximum <= 1000 and tuner.activity_rows.value == 100
+    print("OK - smaller rows raise the cap again and AIMD grows into it")
+
+    tuner.record_request_bytes(1, 10 ** 9)
+    assert tuner.activity_rows.maximum == tuner.activity_rows.minimum
+    print("OK - the cap never drops below the minimum chunk")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,76 @@
+"""
+Quick test script to verify the background sync worker
+"""
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing sync worker...")
+print("=" * 50)
+
+try:
+    from sync_worker import SyncWorker
+    print("OK - Sync worker module imported")
+
+    def wait_for(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    calls = []
+    interval = [3600]
+    worker = SyncWorker(lambda: calls.append('sync'), lambda: interval[0],
+                        maintenance=lambda: calls.append('maintenance'), maintenance_interval=3600).start()
+    assert wait_for(lambda: calls == ['maintenance'])
+    time.sleep(0.1)
+    assert calls == ['maintenance']
+    print("OK - maintenance runs at start; sync waits for its interval")
+
+    worker.wake()
+    assert wait_for(lambda: calls == ['maintenance', 'sync'])
+    print("OK - wake() runs a sync straight away")
+
+    interval[0] = 0.05
+    worker.wake()
+    assert wait_for(lambda: calls.count('sync') >= 4)
+    assert calls.count('maintenance') == 1
+    print("OK - a new interval applies from the next cycle")
+
+    assert worker.stop(timeout=5)
+    stopped = len(calls)
+    time.sleep(0.2)
+    assert len(calls) == stopped
+    print("OK - stop() ends the thread")
+
+    def failing():
+        calls.append('fail')
+        raise RuntimeError('server exploded')
+
+    del calls[:]
+    worker = SyncWorker(failing, lambda: 0.02).start()
+    assert wait_for(lambda: calls.count('fail') >= 3)
+    assert worker.stop(timeout=5)
+    print("OK - an exception in sync is logged and the worker keeps going")
+
+    release = threading.Event()
+    worker = SyncWorker(lambda: release.wait(5), lambda: 3600).start()
+    worker.wake()
+    time.sleep(0.1)
+    assert worker.stop(timeout=0.1) is False
+    release.set()
+    assert worker.stop(timeout=5)
+    print("OK - stop() reports a run still in progress after its timeout")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,110 @@
+"""
+Quick test script to verify the upload engine's in-flight limits
+"""
+import sys
+import os
+import time
+import asyncio
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+print("Testing upload engine...")
+print("=" * 50)
+
+try:
+    from upload_engine import UploadEngine
+    print("OK - Upload engine module imported")
+
+    A = 'http://server/api/a.php'
+    B = 'http://server/api/b.php'
+    engine = UploadEngine(max_in_flight=4, endpoint_limits={A: 2, B: 3}).start()
+
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def enter(url):
+        with lock:
+            active[url] = active.get(url, 0) + 1
+            active['all'] = active.get('all', 0) + 1
+            for key in (url, 'all'):
+                peak[key] = max(peak.get(key, 0), active[key])
+
+    def leave(url):
+        with lock:
+            active[url] -= 1
+            active['all'] -= 1
+
+    async def request(url, value):
+        enter(url)
+        await asyncio.sleep(0.02)
+        leave(url)
+        return value
+
+    futures = [engine.submit(A, request, A, i) for i in range(10)] + [engine.submit(B, request, B, i) for i in range(10)]
+    assert [f.result(5) for f in futures] == list(range(10)) * 2
+    assert peak[A] == 2 and peak[B] <= 3 and peak['all'] <= 4, peak
+    assert engine.in_flight == 0
+    print("OK - coroutines never exceed the endpoint or global limit")
+
+    def blocking(url, value):
+        enter(url)
+        time.sleep(0.02)
+        leave(url)
+        return value
+
+    peak.clear()
+    futures = [engine.submit(A + '?page=%d' % i, blocking, A, i) for i in range(8)]
+    assert [f.result(5) for f in futures] == list(range(8))
+    assert peak[A] == 2, peak
+    print("OK - blocking calls run on the thread pool under the same limits, query strings ignored")
+
+    peak.clear()
+    futures = [engine.submit('http://server/api/other.php', request, 'other', i) for i in range(6)]
+    [f.result(5) for f in futures]
+    assert peak['other'] == 2, peak
+    print("OK - endpoints without a configured limit get the default")
+
+    assert engine.call(A, lambda: 'done') == 'done'
+
+    async def nested():
+        return engine.call(A, lambda: None)
+
+    try:
+        engine.submit(B, nested).result(5)
+        raise AssertionError('expected RuntimeError')
+    except RuntimeError as e:
+        assert 'block the event loop' in str(e)
+    print("OK - call() blocks for a result, but never on the loop thread")
+
+    def boom():
+        raise ValueError('bad request')
+
+    future = engine.fire(A, boom)
+    try:
+        future.result(5)
+    except ValueError:
+        pass
+    time.sleep(0.05)
+    assert not engine._pending
+    print("OK - fire() forgets a call once it is done, failures included")
+
+    gate = threading.Event()
+    for _ in range(2):
+        engine.submit(A, lambda: gate.wait(5))
+    queued = engine.submit(A, lambda: 'never')
+    time.sleep(0.1)
+    engine.close(timeout=0)
+    gate.set()
+    time.sleep(0.2)
+    assert queued.cancelled()
+    print("OK - close() cancels calls still waiting for a slot")
+
+    print("\n" + "=" * 50)
+    print("Test complete!")
+
+except Exception as e:
+    import traceback
+    print(f"ERROR: {e}")
+    traceback.print_exc()
+    sys.exit(1)
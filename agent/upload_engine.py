@@ -0,0 +1,187 @@
+"""
+Upload Engine Module for TrackerV3 Agent
+asyncio event loop thread that runs every outbound API call under global and per-endpoint in-flight limits
+"""
+import os
+import sys
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from .config import (
+        INGEST_URL, SCREENSHOT_UPLOAD_URL, SCREENSHOT_PARTS_URL, DEVICE_API_URL, PERMISSION_API_URL,
+        WEBSITE_API_URL, APPLICATION_API_URL, UPLOAD_MAX_IN_FLIGHT
+    )
+except ImportError:
+    from config import (
+        INGEST_URL, SCREENSHOT_UPLOAD_URL, SCREENSHOT_PARTS_URL, DEVICE_API_URL, PERMISSION_API_URL,
+        WEBSITE_API_URL, APPLICATION_API_URL, UPLOAD_MAX_IN_FLIGHT
+    )
+
+log = logging.getLogger('tracker_agent.upload_engine')
+
+# Requests in flight per endpoint. Ingest takes up to parallel_sync_workers (max 10) chunks per round;
+# screenshot uploads are large, so fewer of them share the link at once.
+ENDPOINT_LIMITS = {
+    INGEST_URL: 10,
+    SCREENSHOT_UPLOAD_URL: 4,
+    SCREENSHOT_PARTS_URL: 2,
+    PERMISSION_API_URL: 2,
+    DEVICE_API_URL: 2,
+    WEBSITE_API_URL: 2,
+    APPLICATION_API_URL: 2,
+}
+DEFAULT_ENDPOINT_LIMIT = 2
+
+
+def _endpoint(url):
+    return url.split('?', 1)[0]
+
+
+class UploadEngine:
+    """One event loop thread through which every outbound call is scheduled.
+
+    A call is a function plus the URL it talks to. Coroutine functions are
+    awaited on the loop (so a test can drive the engine against a local
+    asyncio HTTP stand-in); plain functions, such as the requests-based
+    http_client / http_compression calls, run on the loop's thread pool,
+    which is sized to the global limit so blocking I/O never holds up the
+    loop. Each call first takes a slot from the global semaphore and one
+    from its endpoint's, so a screenshot backlog cannot crowd out permission
+    checks or event delivery.
+
+    Synchronous code uses submit() (a concurrent.futures.Future), call()
+    (blocks for the result) or fire() (fire-and-forget, errors are logged);
+    coroutines on the loop await run().
+    """
+
+    def __init__(self, max_in_flight=None, endpoint_limits=None):
+        self.max_in_flight = max(1, int(max_in_flight or UPLOAD_MAX_IN_FLIGHT))
+        self.endpoint_limits = dict(ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits)
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._global = None
+        self._endpoints = {}
+        self._in_flight = 0
+        self._pending = set()  # fire-and-forget futures, kept referenced until done
+        self._lock = threading.Lock()
+
+    # ---- loop thread ---------------------------------------------------
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name='tracker-upload-loop', daemon=True)
+                self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='tracker-upload'))
+        self._global = asyncio.Semaphore(self.max_in_flight)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+            log.debug('Upload engine stopped')
+
+    def _semaphore(self, endpoint):
+        semaphore = self._endpoints.get(endpoint)
+        if semaphore is None:
+            limit = min(self.endpoint_limits.get(endpoint, DEFAULT_ENDPOINT_LIMIT), self.max_in_flight)
+            semaphore = self._endpoints[endpoint] = asyncio.Semaphore(max(1, limit))
+        return semaphore
+
+    # ---- API -----------------------------------------------------------
+
+    @property
+    def in_flight(self):
+        """Calls currently holding a slot"""
+        return self._in_flight
+
+    async def run(self, url, func, *args, **kwargs):
+        """Await `func(*args, **kwargs)` once a global and an endpoint slot for `url` are free (on the loop only)"""
+        async with self._global, self._semaphore(_endpoint(url)):
+            self._in_flight += 1
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await self._loop.run_in_executor(None, lambda: func(*args, **kwargs))
+            finally:
+                self._in_flight -= 1
+
+    def submit(self, url, func, *args, **kwargs):
+        """Schedule a call from any thread. Returns a concurrent.futures.Future."""
+        if self._loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self.run(url, func, *args, **kwargs), self._loop)
+
+    def call(self, url, func, *args, **kwargs):
+        """Schedule a call and wait for its result (never from the loop thread itself)"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError('UploadEngine.call() would block the event loop; await run() instead')
+        return self.submit(url, func, *args, **kwargs).result()
+
+    def fire(self, url, func, *args, **kwargs):
+        """Schedule a call whose result nobody waits for; failures are logged"""
+        future = self.submit(url, func, *args, **kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._fired_done)
+        return future
+
+    def _fired_done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            log.debug('Background upload failed: %s', future.exception())
+
+    async def _cancel_all(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.get_running_loop().stop()
+
+    def close(self, timeout=None):
+        """Cancel queued calls and stop the loop, waiting up to `timeout` for calls already on the wire"""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = self._loop = None
+            self._ready.clear()
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), loop)
+        thread.join(timeout)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide UploadEngine, starting its loop on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = UploadEngine().start()
+        return _engine
+
+
+def close_engine(timeout=None):
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close(timeout)
+            _engine = None
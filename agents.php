@@ -67,17 +67,42 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST' && isset($_POST['action']) && $_POST['
 	exit;
 }
 
+// Handle POST: Per-machine upload limits (blank = use the defaults from Settings)
+if ($_SERVER['REQUEST_METHOD'] === 'POST' && isset($_POST['action']) && $_POST['action'] === 'upload_limits') {
+	$agentId = (int)($_POST['agent_id'] ?? 0);
+	$rate = trim($_POST['upload_rate_kb_s'] ?? '');
+	$burst = trim($_POST['upload_burst_kb'] ?? '');
+	$window = trim($_POST['bulk_upload_window'] ?? '');
+	$windowValue = $window === '' ? null : upload_window($window);
+	if ($agentId > 0 && $window !== '' && $windowValue === null) {
+		$_SESSION['error'] = 'Screenshot upload window must look like 18:00-08:00 (several separated by commas)';
+	} elseif ($agentId > 0) {
+		try {
+			$stmt = $pdo->prepare('UPDATE machines SET upload_rate_kb_s = ?, upload_burst_kb = ?, bulk_upload_window = ? WHERE id = ?');
+			$stmt->execute([$rate === '' ? null : max(0, (int)$rate), $burst === '' ? null : max(0, (int)$burst), $windowValue, $agentId]);
+			// Agents only receive settings when the revision moves
+			$pdo->exec("INSERT INTO settings (`key`,`value`) VALUES ('settings_revision','1') ON DUPLICATE KEY UPDATE `value` = CAST(`value` AS UNSIGNED) + 1");
+			$_SESSION['success'] = 'Upload limits updated';
+		} catch (Exception $e) {
+			$_SESSION['error'] = 'Failed to update upload limits: ' . $e->getMessage();
+		}
+	}
+	header('Location: ' . BASE_URL . 'agents.php');
+	exit;
+}
+
 // Get list of users for dropdown (with role for better mapping)
 $users = $pdo->query('SELECT id, username, role FROM users ORDER BY username')->fetchAll();
 
-$rows = $pdo->query('SELECT m.id, m.machine_id, m.hostname, m.display_name, m.email, m.upn, m.last_seen, u.username FROM machines m LEFT JOIN users u ON u.id = m.user_id ORDER BY (m.last_seen IS NULL), m.last_seen DESC')->fetchAll();
+$rows = $pdo->query('SELECT m.id, m.machine_id, m.hostname, m.display_name, m.email, m.upn, m.last_seen, m.settings_version, m.upload_rate_kb_s, m.upload_burst_kb, m.bulk_upload_window, u.username FROM machines m LEFT JOIN users u ON u.id = m.user_id ORDER BY (m.last_seen IS NULL), m.last_seen DESC')->fetchAll();
+$settingsRevision = (int)$pdo->query("SELECT `value` FROM settings WHERE `key` = 'settings_revision'")->fetchColumn();
 
 start_session();
 $success = $_SESSION['success'] ?? null;
 $error = $_SESSION['error'] ?? null;
 unset($_SESSION['success'], $_SESSION['error']);
 
-render_layout('Agents', function() use ($rows, $users, $success, $error) { ?>
+render_layout('Agents', function() use ($rows, $users, $success, $error, $settingsRevision) { ?>
     <div class="d-flex justify-content-between align-items-center mb-3">
         <h5>Agents</h5>
         <div class="btn-group">
@@ -119,6 +144,7 @@ render_layout('Agents', function() use ($rows, $users, $success, $error) { ?>
                 <th>Hostname</th>
                 <th>User</th>
                 <th>Last Seen</th>
+                <th>Settings</th>
                 <th>Actions</th>
             </tr>
         </thead>
@@ -139,11 +165,24 @@ render_layout('Agents', function() use ($rows, $users, $success, $error) { ?>
                     <?php endif; ?>
                 </td>
                 <td><?php echo htmlspecialchars($r['last_seen'] ?? 'Never'); ?></td>
+                <td>
+                    <?php $applied = $r['settings_version'] !== null ? (int)explode('.', $r['settings_version'])[0] : null; ?>
+                    <?php if ($applied === null): ?>
+                        <span class="badge bg-secondary" title="Agent has not reported a settings revision">-</span>
+                    <?php elseif ($applied === $settingsRevision): ?>
+                        <span class="badge bg-success" title="Current settings applied">rev <?php echo $applied; ?></span>
+                    <?php else: ?>
+                        <span class="badge bg-warning text-dark" title="Applies revision <?php echo $settingsRevision; ?> on its next sync">rev <?php echo $applied; ?></span>
+                    <?php endif; ?>
+                </td>
                 <td>
                     <div class="btn-group btn-group-sm">
                         <button type="button" class="btn btn-outline-primary" data-bs-toggle="modal" data-bs-target="#mapAgentModal<?php echo (int)$r['id']; ?>" title="Map to Employee">
                             <i class="bi bi-link-45deg"></i>
                         </button>
+                        <button type="button" class="btn btn-outline-secondary" data-bs-toggle="modal" data-bs-target="#uploadLimitsModal<?php echo (int)$r['id']; ?>" title="Upload Limits">
+                            <i class="bi bi-speedometer2"></i>
+                        </button>
                         <button type="button" class="btn btn-outline-danger" data-bs-toggle="modal" data-bs-target="#deleteAgentModal<?php echo (int)$r['id']; ?>" title="Delete Agent">
                             <i class="bi bi-trash"></i>
                         </button>
@@ -193,6 +232,49 @@ render_layout('Agents', function() use ($rows, $users, $success, $error) { ?>
         </div>
     </div>
 
+    <!-- Upload Limits Modal -->
+    <div class="modal fade" id="uploadLimitsModal<?php echo (int)$r['id']; ?>" tabindex="-1">
+        <div class="modal-dialog">
+            <div class="modal-content">
+                <div class="modal-header">
+                    <h5 class="modal-title">Upload Limits</h5>
+                    <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                </div>
+                <form method="post">
+                    <input type="hidden" name="action" value="upload_limits">
+                    <input type="hidden" name="agent_id" value="<?php echo (int)$r['id']; ?>">
+                    <div class="modal-body">
+                        <p class="text-muted small">Leave a field empty to use the default from Settings.</p>
+                        <div class="mb-3">
+                            <label class="form-label">Upload bandwidth limit</label>
+                            <div class="input-group">
+                                <input type="number" class="form-control" name="upload_rate_kb_s" min="0" step="1" value="<?php echo htmlspecialchars((string)($r['upload_rate_kb_s'] ?? '')); ?>" placeholder="Default">
+                                <span class="input-group-text">KB/s</span>
+                            </div>
+                            <div class="form-text">0 = unlimited.</div>
+                        </div>
+                        <div class="mb-3">
+                            <label class="form-label">Upload burst</label>
+                            <div class="input-group">
+                                <input type="number" class="form-control" name="upload_burst_kb" min="0" step="1" value="<?php echo htmlspecialchars((string)($r['upload_burst_kb'] ?? '')); ?>" placeholder="Default">
+                                <span class="input-group-text">KB</span>
+                            </div>
+                        </div>
+                        <div class="mb-3">
+                            <label class="form-label">Screenshot upload window</label>
+                            <input type="text" class="form-control" name="bulk_upload_window" value="<?php echo htmlspecialchars($r['bulk_upload_window'] ?? ''); ?>" placeholder="Default">
+                            <div class="form-text">Agent local times, e.g. 18:00-08:00. Use 00:00-24:00 for any time on this machine.</div>
+                        </div>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancel</button>
+                        <button type="submit" class="btn btn-primary">Save Limits</button>
+                    </div>
+                </form>
+            </div>
+        </div>
+    </div>
+
     <!-- Delete Agent Modal -->
     <div class="modal fade" id="deleteAgentModal<?php echo (int)$r['id']; ?>" tabindex="-1">
         <div class="modal-dialog">
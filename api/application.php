@@ -10,7 +10,7 @@ if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
     exit;
 }
 
-$raw = file_get_contents('php://input');
+$raw = read_request_body();
 $json = json_decode($raw, true);
 
 if (!$json) {
@@ -144,64 +144,8 @@ try {
         $applicationId = (int)$pdo->lastInsertId();
     }
     
-    // Check if application is blocked
-    $isBlocked = false;
-    
-    // Check global blocks
-    $globalBlockStmt = $pdo->prepare('
-        SELECT id FROM application_blocks
-        WHERE is_active = 1
-        AND (
-            (block_type = "global" AND application_id = ?)
-            OR (block_type = "global" AND category_id IN (SELECT category_id FROM applications WHERE id = ?))
-            OR (block_type = "global" AND process_name = ?)
-        )
-        LIMIT 1
-    ');
-    $globalBlockStmt->execute([$applicationId, $applicationId, $processName]);
-    if ($globalBlockStmt->fetch()) {
-        $isBlocked = true;
-    }
-    
-    // Check user-specific blocks
-    if (!$isBlocked) {
-        $userBlockStmt = $pdo->prepare('
-            SELECT id FROM application_blocks
-            WHERE is_active = 1
-            AND block_type = "user"
-            AND user_id = ?
-            AND (
-                application_id = ?
-                OR category_id IN (SELECT category_id FROM applications WHERE id = ?)
-                OR process_name = ?
-            )
-            LIMIT 1
-        ');
-        $userBlockStmt->execute([$userId, $applicationId, $applicationId, $processName]);
-        if ($userBlockStmt->fetch()) {
-            $isBlocked = true;
-        }
-    }
-    
-    // Check machine-specific blocks
-    if (!$isBlocked) {
-        $machineBlockStmt = $pdo->prepare('
-            SELECT id FROM application_blocks
-            WHERE is_active = 1
-            AND block_type = "machine"
-            AND machine_id = ?
-            AND (
-                application_id = ?
-                OR category_id IN (SELECT category_id FROM applications WHERE id = ?)
-                OR process_name = ?
-            )
-            LIMIT 1
-        ');
-        $machineBlockStmt->execute([$machineId, $applicationId, $applicationId, $processName]);
-        if ($machineBlockStmt->fetch()) {
-            $isBlocked = true;
-        }
-    }
+    // Check if application is blocked (global, user-specific or machine-specific)
+    $isBlocked = application_blocked($pdo, $applicationId, $processName, $userId, $machineId);
     
     // Insert usage record
     $usageStmt = $pdo->prepare('
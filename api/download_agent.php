@@ -4,7 +4,7 @@ require_once __DIR__ . '/../config.php';
 
 // Get the file to download (default: agent.py for backward compatibility)
 $file = $_GET['file'] ?? 'agent.py';
-$allowedFiles = ['agent.py', 'config.py', 'monitoring.py', 'permission.py', 'browser_monitoring.py'];
+$allowedFiles = ['agent.py', 'config.py', 'monitoring.py', 'permission.py', 'browser_monitoring.py', 'application_monitoring.py', 'store.py', 'activity_writer.py', 'outbox.py', 'sync_queue.py', 'storage_governor.py', 'schema.py', 'compaction.py', 'screenshot_store.py', 'http_compression.py', 'http_client.py', 'sync_tuning.py', 'resilience.py', 'client_ids.py', 'sync_worker.py', 'upload_engine.py', 'partition.py', 'columnar.py', 'streaming.py', 'resumable_upload.py', 'sync_lanes.py', 'bandwidth.py', 'degradation.py'];
 
 // Security: only allow specific files
 if (!in_array($file, $allowedFiles)) {
@@ -1,6 +1,17 @@
 <?php
+// Liveness probe for agents: they poll this (GET) before resuming sync after an outage.
+// 200 only when the database is reachable too, since every agent endpoint needs it.
 require_once __DIR__ . '/../config.php';
 header('Content-Type: application/json');
-echo json_encode(['status' => 'ok', 'time' => date('c')]);
+header('Cache-Control: no-store');
 
+try {
+	db()->query('SELECT 1');
+} catch (Throwable $e) {
+	http_response_code(503);
+	header('Retry-After: 30');
+	echo json_encode(['status' => 'error', 'error' => 'Database unavailable', 'time' => date('c')]);
+	exit;
+}
 
+echo json_encode(['status' => 'ok', 'time' => date('c')]);
@@ -5,18 +5,33 @@
 //   "username": "john",
 //   "machine_id": "WIN-ABC123",
 //   "hostname": "MYPC",
-//   "activity": [ { start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses }... ],
-//   "screenshots": [ { taken_at, filename, data_base64 } ... ],
-//   "application_usage": [ { application_name, process_name, window_title, executable_path, session_start, session_end, duration_seconds, is_productive } ... ]
+//   "batch_id": "<uuid>",   (optional: a batch already received is acknowledged again without re-inserting)
+//   "activity": [ { client_uid, start_time, end_time, duration_seconds, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses }... ],
+//               (one row per minute, or a rolled-up span; duration_seconds defaults to end_time - start_time)
+//   "screenshots": [ { taken_at, filename, data_base64 } ... ],   (older agents; current ones upload via api/screenshots.php)
+//   "application_usage": [ { client_uid, application_name, process_name, window_title, executable_path, session_start, session_end, duration_seconds, is_productive } ... ],
+//   "evicted": { "<stream>": { items, bytes } ... }   (optional: data the agent shed to stay within its disk budget)
 // }
+// client_uid (optional, per row) makes resends idempotent: a row whose id is already stored is skipped
+// and counted in the response's "duplicates".
+// Sessions of a blocked application are listed by name in the response's "blocked_applications",
+// as api/application.php reports is_blocked, so the agent alerts on them either way.
+// The same payload may instead be sent as Content-Type application/x-tracker-columnar (see agent/columnar.py);
+// the Accept-Post response header tells agents this endpoint takes it.
 require_once __DIR__ . '/../config.php';
 
 header('Content-Type: application/json');
 
 if ($_SERVER['REQUEST_METHOD'] !== 'POST') { http_response_code(405); echo json_encode(['error' => 'Method not allowed']); exit; }
 
-$raw = file_get_contents('php://input');
-$json = json_decode($raw, true);
+header('Accept-Post: application/json, ' . COLUMNAR_CONTENT_TYPE);
+$raw = read_request_body();
+if (stripos($_SERVER['CONTENT_TYPE'] ?? '', COLUMNAR_CONTENT_TYPE) === 0) {
+    $json = decode_columnar_body($raw);
+    if (!$json) { http_response_code(400); echo json_encode(['error' => 'Invalid columnar body']); exit; }
+} else {
+    $json = json_decode($raw, true);
+}
 if (!$json) { http_response_code(400); echo json_encode(['error' => 'Invalid JSON']); exit; }
 
 $pdo = db();
@@ -43,35 +58,72 @@ if (!$user) {
 $machineStmt = $pdo->prepare('SELECT id FROM machines WHERE machine_id = ?');
 $machineStmt->execute([$machineExtId]);
 $machine = $machineStmt->fetch();
+// Settings revision the agent has applied (NULL until its first settings block)
+$agentSettingsVersion = $json['settings_version'] ?? null;
+$agentSettingsVersion = is_string($agentSettingsVersion) && $agentSettingsVersion !== '' ? substr($agentSettingsVersion, 0, 32) : null;
+// A server without MIGRATION_SETTINGS_VERSION.sql still records the machine, just not the version
 if ($machine) {
 	$machineId = (int)$machine['id'];
-	$upd = $pdo->prepare('UPDATE machines SET user_id = ?, hostname = ?, last_seen = NOW() WHERE id = ?');
-	$upd->execute([(int)$user['id'], $hostname, $machineId]);
+	try {
+		$upd = $pdo->prepare('UPDATE machines SET user_id = ?, hostname = ?, last_seen = NOW(), settings_version = ? WHERE id = ?');
+		$upd->execute([(int)$user['id'], $hostname, $agentSettingsVersion, $machineId]);
+	} catch (Throwable $e) {
+		error_log('ingest: could not record settings_version: ' . $e->getMessage());
+		$upd = $pdo->prepare('UPDATE machines SET user_id = ?, hostname = ?, last_seen = NOW() WHERE id = ?');
+		$upd->execute([(int)$user['id'], $hostname, $machineId]);
+	}
 } else {
-	$ins = $pdo->prepare('INSERT INTO machines (machine_id, user_id, hostname, last_seen) VALUES (?, ?, ?, NOW())');
-	$ins->execute([$machineExtId, (int)$user['id'], $hostname]);
+	try {
+		$ins = $pdo->prepare('INSERT INTO machines (machine_id, user_id, hostname, last_seen, settings_version) VALUES (?, ?, ?, NOW(), ?)');
+		$ins->execute([$machineExtId, (int)$user['id'], $hostname, $agentSettingsVersion]);
+	} catch (Throwable $e) {
+		error_log('ingest: could not record settings_version: ' . $e->getMessage());
+		$ins = $pdo->prepare('INSERT INTO machines (machine_id, user_id, hostname, last_seen) VALUES (?, ?, NOW())');
+		$ins->execute([$machineExtId, (int)$user['id'], $hostname]);
+	}
 	$machineId = (int)$pdo->lastInsertId();
 }
 
+$batchId = client_uid($json['batch_id'] ?? null);
+$newBatch = true;
+$duplicates = 0;
+
 $pdo->beginTransaction();
 try {
-	$actIns = $pdo->prepare('INSERT INTO activity (user_id, machine_id, start_time, end_time, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)');
-	foreach (($json['activity'] ?? []) as $a) {
+	if ($batchId !== null) {
+		// Committed with the rows below, so a batch is either fully recorded or not at all
+		$batchIns = $pdo->prepare('INSERT INTO agent_batches (batch_id, machine_id) VALUES (?, ?) ON DUPLICATE KEY UPDATE batch_id = batch_id');
+		$batchIns->execute([$batchId, $machineId]);
+		$newBatch = $batchIns->rowCount() === 1;
+	}
+
+	$actIns = $pdo->prepare('INSERT INTO activity (user_id, machine_id, client_uid, start_time, end_time, duration_seconds, productive_seconds, unproductive_seconds, idle_seconds, mouse_moves, key_presses) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON DUPLICATE KEY UPDATE id = id');
+	foreach (($newBatch ? ($json['activity'] ?? []) : []) as $a) {
+		$start = $a['start_time'] ?? date('Y-m-d H:i:s');
+		$end = $a['end_time'] ?? date('Y-m-d H:i:s');
+		if (isset($a['duration_seconds'])) {
+			$duration = max(0, (int)$a['duration_seconds']);
+		} else {
+			$duration = max(0, (int)strtotime($end) - (int)strtotime($start));
+		}
 		$actIns->execute([
 			(int)$user['id'],
 			$machineId,
-			$a['start_time'] ?? date('Y-m-d H:i:s'),
-			$a['end_time'] ?? date('Y-m-d H:i:s'),
+			client_uid($a['client_uid'] ?? null),
+			$start,
+			$end,
+			$duration,
 			(int)($a['productive_seconds'] ?? 0),
 			(int)($a['unproductive_seconds'] ?? 0),
 			(int)($a['idle_seconds'] ?? 0),
 			(int)($a['mouse_moves'] ?? 0),
 			(int)($a['key_presses'] ?? 0),
 		]);
+		if ($actIns->rowCount() === 0) { $duplicates++; }
 	}
 
 	$shotIns = $pdo->prepare('INSERT INTO screenshots (user_id, machine_id, taken_at, filename, filesize_kb) VALUES (?, ?, ?, ?, ?)');
-	foreach (($json['screenshots'] ?? []) as $s) {
+	foreach (($newBatch ? ($json['screenshots'] ?? []) : []) as $s) {
 		$fname = basename($s['filename'] ?? (uniqid('sc_', true) . '.jpg'));
 		$dt = $s['taken_at'] ?? date('Y-m-d H:i:s');
 		$data = $s['data_base64'] ?? '';
@@ -89,12 +141,20 @@ try {
     $appFind = $pdo->prepare('SELECT id FROM applications WHERE process_name = ? LIMIT 1');
     $appIns = $pdo->prepare('INSERT INTO applications (name, process_name, executable_path, first_seen, last_seen, total_sessions, total_usage_seconds) VALUES (?, ?, ?, ?, ?, 0, 0)');
     $appUpd = $pdo->prepare('UPDATE applications SET name = COALESCE(?, name), executable_path = COALESCE(?, executable_path), last_seen = ?, total_sessions = total_sessions + 1, total_usage_seconds = total_usage_seconds + ? WHERE id = ?');
-    $usageIns = $pdo->prepare('INSERT INTO application_usage (user_id, machine_id, application_id, application_name, process_name, window_title, session_start, session_end, duration_seconds, is_productive) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)');
+    $usageSeen = $pdo->prepare('SELECT 1 FROM application_usage WHERE client_uid = ?');
+    $usageIns = $pdo->prepare('INSERT INTO application_usage (user_id, machine_id, application_id, client_uid, application_name, process_name, window_title, session_start, session_end, duration_seconds, is_productive) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)');
     $timelineIns = $pdo->prepare('INSERT INTO activity_timeline (user_id, machine_id, activity_type, application_id, item_name, item_detail, start_time, end_time, duration_seconds, is_productive) VALUES (?, ?, "application", ?, ?, ?, ?, ?, ?, ?)');
-    foreach (($json['application_usage'] ?? []) as $u) {
+    $blockedApps = [];
+    foreach (($newBatch ? ($json['application_usage'] ?? []) : []) as $u) {
         $appName = trim($u['application_name'] ?? '');
         $processName = trim($u['process_name'] ?? '');
         if ($processName === '') { continue; }
+        $usageUid = client_uid($u['client_uid'] ?? null);
+        if ($usageUid !== null) {
+            // Checked before the catalog update so a resent session does not add to the totals again
+            $usageSeen->execute([$usageUid]);
+            if ($usageSeen->fetchColumn()) { $duplicates++; continue; }
+        }
         $windowTitle = $u['window_title'] ?? null;
         $exePath = $u['executable_path'] ?? null;
         $start = $u['session_start'] ?? date('Y-m-d H:i:s');
@@ -121,6 +181,7 @@ try {
             (int)$user['id'],
             $machineId,
             $appId,
+            $usageUid,
             $appName !== '' ? $appName : $processName,
             $processName,
             $windowTitle,
@@ -140,6 +201,9 @@ try {
             max($dur,0),
             $isProd
         ]);
+        if (application_blocked($pdo, $appId, $processName, (int)$user['id'], $machineId)) {
+            $blockedApps[$processName] = $appName !== '' ? $appName : $processName;
+        }
     }
 
     $pdo->commit();
@@ -150,9 +214,58 @@ try {
 	exit;
 }
 
+// Batch ids only need to outlive an agent's retries; prune old ones now and then
+if ($batchId !== null && random_int(1, 100) === 1) {
+    try {
+        $pdo->exec('DELETE FROM agent_batches WHERE received_at < NOW() - INTERVAL 30 DAY');
+    } catch (Throwable $e) {
+        error_log('ingest: could not prune agent_batches: ' . $e->getMessage());
+    }
+}
+
+// Record data the agent had to shed while offline (best effort: never fails the sync)
+$evicted = $newBatch ? ($json['evicted'] ?? []) : [];
+if (is_array($evicted) && $evicted) {
+    try {
+        $evIns = $pdo->prepare('INSERT INTO agent_evictions (user_id, machine_id, stream, items, bytes) VALUES (?, ?, ?, ?, ?)');
+        foreach ($evicted as $stream => $ev) {
+            $items = (int)($ev['items'] ?? 0);
+            if ($items <= 0) { continue; }
+            $evIns->execute([(int)$user['id'], $machineId, substr((string)$stream, 0, 50), $items, (int)($ev['bytes'] ?? 0)]);
+        }
+    } catch (Throwable $e) {
+        error_log('ingest: could not record agent evictions: ' . $e->getMessage());
+    }
+}
+
+$syncStatus = [
+    'status' => 'ok',
+    'duplicate_batch' => !$newBatch,
+    'duplicates' => $duplicates,
+    'blocked_applications' => array_values($blockedApps),
+];
+
+// Settings version: the global revision (bumped on every save in settings.php, and when agents.php
+// changes a machine's upload limits) plus this machine's device monitoring flag.
+// An agent that already has it gets no settings block at all.
+try {
+    $v = $pdo->prepare("SELECT (SELECT `value` FROM settings WHERE `key` = 'settings_revision') AS revision, (SELECT enabled FROM device_monitoring WHERE machine_id = ?) AS device_enabled");
+    $v->execute([$machineId]);
+    $versionRow = $v->fetch() ?: [];
+} catch (Throwable $e) {
+    // The rows are already committed: send the full settings block rather than failing the sync
+    error_log('ingest: could not read settings version: ' . $e->getMessage());
+    $versionRow = [];
+}
+$settingsVersion = (int)($versionRow['revision'] ?? 0) . '.' . (int)($versionRow['device_enabled'] ?? 0);
+if ($agentSettingsVersion === $settingsVersion) {
+    echo json_encode($syncStatus + ['settings_version' => $settingsVersion, 'settings_unchanged' => true]);
+    exit;
+}
+
 // Return status + current server settings so agent can adapt
-$s = $pdo->prepare('SELECT `key`, `value` FROM settings WHERE `key` IN (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)');
-$s->execute(['agent_sync_interval_seconds', 'parallel_sync_workers', 'delete_screenshots_after_sync', 'device_monitoring_enabled', 'screenshots_enabled', 'screenshot_interval_seconds', 'website_monitoring_enabled', 'website_monitoring_interval_seconds', 'application_monitoring_enabled', 'application_monitoring_interval_seconds']);
+$s = $pdo->prepare('SELECT `key`, `value` FROM settings WHERE `key` IN (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)');
+$s->execute(['agent_sync_interval_seconds', 'parallel_sync_workers', 'delete_screenshots_after_sync', 'device_monitoring_enabled', 'screenshots_enabled', 'screenshot_interval_seconds', 'website_monitoring_enabled', 'website_monitoring_interval_seconds', 'application_monitoring_enabled', 'application_monitoring_interval_seconds', 'upload_rate_kb_s', 'upload_burst_kb', 'bulk_upload_window']);
 $settings = [];
 foreach ($s->fetchAll() as $row) {
     $settings[$row['key']] = $row['value'];
@@ -168,6 +281,20 @@ $websiteMonitoringInterval = (int)($settings['website_monitoring_interval_second
 $applicationMonitoringEnabled = (int)($settings['application_monitoring_enabled'] ?? 1);
 $applicationMonitoringInterval = (int)($settings['application_monitoring_interval_seconds'] ?? 2);
 
+// Upload bandwidth: this machine's overrides (agents.php), else the defaults from settings.php
+try {
+    $limStmt = $pdo->prepare('SELECT upload_rate_kb_s, upload_burst_kb, bulk_upload_window FROM machines WHERE id = ?');
+    $limStmt->execute([$machineId]);
+    $limits = $limStmt->fetch() ?: [];
+} catch (Throwable $e) {
+    // A database without the per-machine limit columns yet: the defaults apply
+    error_log('ingest: could not read upload limits: ' . $e->getMessage());
+    $limits = [];
+}
+$uploadRate = (int)($limits['upload_rate_kb_s'] ?? ($settings['upload_rate_kb_s'] ?? 0));
+$uploadBurst = (int)($limits['upload_burst_kb'] ?? ($settings['upload_burst_kb'] ?? 0));
+$bulkWindow = (string)($limits['bulk_upload_window'] ?? ($settings['bulk_upload_window'] ?? ''));
+
 // Check if device monitoring is enabled for this specific machine
 $deviceMonitoringEnabled = 0;
 if ($deviceMonitoring) {
@@ -183,8 +310,8 @@ if ($deviceMonitoring) {
     }
 }
 
-echo json_encode([
-    'status' => 'ok',
+echo json_encode($syncStatus + [
+    'settings_version' => $settingsVersion,
     'sync_interval_seconds' => $syncInterval,
     'parallel_sync_workers' => $parallelWorkers,
     'delete_screenshots_after_sync' => (bool)$deleteScreenshots,
@@ -194,7 +321,10 @@ echo json_encode([
     'website_monitoring_enabled' => (bool)$websiteMonitoringEnabled,
     'website_monitoring_interval_seconds' => $websiteMonitoringInterval,
     'application_monitoring_enabled' => (bool)$applicationMonitoringEnabled,
-    'application_monitoring_interval_seconds' => $applicationMonitoringInterval
+    'application_monitoring_interval_seconds' => $applicationMonitoringInterval,
+    'upload_rate_kb_s' => $uploadRate,
+    'upload_burst_kb' => $uploadBurst,
+    'bulk_upload_window' => $bulkWindow
 ]);
 
 
@@ -6,7 +6,7 @@ header('Content-Type: application/json');
 
 // Handle permission check request
 if ($_SERVER['REQUEST_METHOD'] === 'POST' && isset($_GET['action']) && $_GET['action'] === 'check') {
-    $raw = file_get_contents('php://input');
+    $raw = read_request_body();
     $json = json_decode($raw, true);
     
     if (!$json) {
@@ -78,7 +78,7 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST' && isset($_GET['action']) && $_GET['ac
         exit;
     }
     
-    $raw = file_get_contents('php://input');
+    $raw = read_request_body();
     $json = json_decode($raw, true);
     
     $deviceId = (int)($json['device_id'] ?? 0);
@@ -11,7 +11,7 @@ if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
     exit;
 }
 
-$raw = file_get_contents('php://input');
+$raw = read_request_body();
 $json = json_decode($raw, true);
 
 if (!$json) {
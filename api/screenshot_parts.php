@@ -0,0 +1,132 @@
+<?php
+// Resumable upload channel for large screenshots: the image arrives in parts, each appended at a byte offset
+// Query string on every request: machine_id, client_uid, filename, taken_at, total (image size in bytes)
+// GET                       -> { "status": "ok", "offset": bytes received so far, "stored": bool }
+// POST ?offset=N, raw body  -> the part is appended when N equals the bytes received so far;
+//                              { "status": "ok", "offset": new byte count, "stored": true once the image is complete }
+// A part at any other offset is refused with 409 and the server's offset, so the agent continues from there
+// (e.g. after a part landed but its response was lost). A client_uid already in screenshots answers stored=true.
+// The machine must already be registered through api/ingest.php (409 otherwise).
+require_once __DIR__ . '/../config.php';
+
+header('Content-Type: application/json');
+
+$method = $_SERVER['REQUEST_METHOD'];
+if ($method !== 'POST' && $method !== 'GET') { http_response_code(405); echo json_encode(['error' => 'Method not allowed']); exit; }
+
+$machineExtId = trim($_GET['machine_id'] ?? '');
+$uid = client_uid($_GET['client_uid'] ?? null);
+$total = (int)($_GET['total'] ?? 0);
+$fname = basename((string)($_GET['filename'] ?? ''));
+$dt = $_GET['taken_at'] ?? date('Y-m-d H:i:s');
+
+if ($machineExtId === '' || $uid === null || $fname === '' || $total <= 0) {
+    http_response_code(400);
+    echo json_encode(['error' => 'Missing machine_id, client_uid, filename or total']);
+    exit;
+}
+
+$pdo = db();
+
+$machineStmt = $pdo->prepare('SELECT id, user_id FROM machines WHERE machine_id = ?');
+$machineStmt->execute([$machineExtId]);
+$machine = $machineStmt->fetch();
+if (!$machine || !$machine['user_id']) { http_response_code(409); echo json_encode(['error' => 'Machine not registered']); exit; }
+$machineId = (int)$machine['id'];
+$userId = (int)$machine['user_id'];
+
+$shotSeen = $pdo->prepare('SELECT 1 FROM screenshots WHERE client_uid = ?');
+$shotSeen->execute([$uid]);
+if ($shotSeen->fetchColumn()) {
+    echo json_encode(['status' => 'ok', 'offset' => $total, 'stored' => true]);
+    exit;
+}
+
+$uploadDir = dirname(STORAGE_PATH) . DIRECTORY_SEPARATOR . 'uploads';
+if (!is_dir($uploadDir)) { @mkdir($uploadDir, 0775, true); }
+$partPath = $uploadDir . DIRECTORY_SEPARATOR . $uid . '.part';
+
+if ($method === 'GET') {
+    $stmt = $pdo->prepare('SELECT received_bytes FROM screenshot_uploads WHERE client_uid = ? AND machine_id = ?');
+    $stmt->execute([$uid, $machineId]);
+    echo json_encode(['status' => 'ok', 'offset' => (int)$stmt->fetchColumn(), 'stored' => false]);
+    exit;
+}
+
+$offset = (int)($_GET['offset'] ?? -1);
+
+// The row lock serialises parts of one image, so two resends of the same part cannot both be appended
+$pdo->beginTransaction();
+try {
+    $pdo->prepare('INSERT INTO screenshot_uploads (client_uid, machine_id, filename, taken_at, total_bytes) VALUES (?, ?, ?, ?, ?) ON DUPLICATE KEY UPDATE client_uid = client_uid')
+        ->execute([$uid, $machineId, $fname, $dt, $total]);
+    $stmt = $pdo->prepare('SELECT received_bytes, total_bytes FROM screenshot_uploads WHERE client_uid = ? AND machine_id = ? FOR UPDATE');
+    $stmt->execute([$uid, $machineId]);
+    $upload = $stmt->fetch();
+    if (!$upload) {
+        // The uid belongs to another machine's upload
+        $pdo->rollBack();
+        http_response_code(409);
+        echo json_encode(['error' => 'Upload belongs to another machine']);
+        exit;
+    }
+    $received = (int)$upload['received_bytes'];
+    if ((int)$upload['total_bytes'] !== $total) {
+        // The agent re-encoded the image since the last attempt: start over
+        $received = 0;
+        $pdo->prepare('UPDATE screenshot_uploads SET total_bytes = ?, received_bytes = 0 WHERE client_uid = ?')->execute([$total, $uid]);
+    }
+    if ($offset !== $received) {
+        $pdo->commit();
+        http_response_code(409);
+        echo json_encode(['error' => 'Offset mismatch', 'offset' => $received]);
+        exit;
+    }
+
+    // Append straight from the request body; the part is never held in memory as a whole
+    $out = fopen($partPath, 'c');
+    $in = fopen('php://input', 'rb');
+    if (!$out || !$in || fseek($out, $received) !== 0) { throw new RuntimeException('cannot open staging file'); }
+    $written = stream_copy_to_stream($in, $out, $total - $received);
+    fclose($in);
+    if ($written === false) { throw new RuntimeException('cannot write staging file'); }
+    $received += $written;
+    // Drop anything beyond the acknowledged bytes (left by an earlier part whose commit failed)
+    ftruncate($out, $received);
+    fclose($out);
+
+    $stored = false;
+    if ($received >= $total) {
+        if (!is_dir(STORAGE_PATH)) { @mkdir(STORAGE_PATH, 0775, true); }
+        $path = STORAGE_PATH . DIRECTORY_SEPARATOR . $fname;
+        if (!rename($partPath, $path)) { throw new RuntimeException('cannot move ' . $fname . ' into storage'); }
+        $pdo->prepare('INSERT INTO screenshots (user_id, machine_id, client_uid, taken_at, filename, filesize_kb) VALUES (?, ?, ?, ?, ?, ?) ON DUPLICATE KEY UPDATE id = id')
+            ->execute([$userId, $machineId, $uid, $dt, $fname, (int)ceil($total / 1024)]);
+        $pdo->prepare('DELETE FROM screenshot_uploads WHERE client_uid = ?')->execute([$uid]);
+        $stored = true;
+    } else {
+        $pdo->prepare('UPDATE screenshot_uploads SET received_bytes = ? WHERE client_uid = ?')->execute([$received, $uid]);
+    }
+    $pdo->commit();
+} catch (Throwable $e) {
+    if ($pdo->inTransaction()) { $pdo->rollBack(); }
+    error_log('screenshot_parts: ' . $fname . ': ' . $e->getMessage());
+    http_response_code(500);
+    echo json_encode(['error' => 'Could not store part']);
+    exit;
+}
+
+$pdo->prepare('UPDATE machines SET last_seen = NOW() WHERE id = ?')->execute([$machineId]);
+
+// Abandoned uploads (screenshot evicted on the agent, machine gone) are dropped after a week
+if (random_int(1, 100) === 1) {
+    try {
+        $stale = $pdo->query('SELECT client_uid FROM screenshot_uploads WHERE updated_at < NOW() - INTERVAL 7 DAY')->fetchAll(PDO::FETCH_COLUMN);
+        foreach ($stale as $staleUid) { @unlink($uploadDir . DIRECTORY_SEPARATOR . $staleUid . '.part'); }
+        $pdo->exec('DELETE FROM screenshot_uploads WHERE updated_at < NOW() - INTERVAL 7 DAY');
+    } catch (Throwable $e) {
+        error_log('screenshot_parts: could not prune screenshot_uploads: ' . $e->getMessage());
+    }
+}
+
+echo json_encode(['status' => 'ok', 'offset' => $received, 'stored' => $stored]);
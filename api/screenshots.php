@@ -0,0 +1,72 @@
+<?php
+// Binary screenshot upload channel for the agent (raw image bytes, no base64-in-JSON)
+// POST multipart/form-data:
+//   username, machine_id, hostname          form fields
+//   meta           JSON array, one entry per file part, in order: [ { client_uid, filename, taken_at }, ... ]
+//   screenshots[]  file parts holding the encoded images
+// Response: { "status": "ok", "stored": [ indexes into meta that were saved ] }
+// A part whose client_uid is already stored (a resend after a lost response) is reported as stored
+// without being saved again.
+// Large screenshots arrive in resumable parts through api/screenshot_parts.php instead.
+// The machine must already be registered through api/ingest.php (409 otherwise).
+require_once __DIR__ . '/../config.php';
+
+header('Content-Type: application/json');
+
+if ($_SERVER['REQUEST_METHOD'] !== 'POST') { http_response_code(405); echo json_encode(['error' => 'Method not allowed']); exit; }
+
+$machineExtId = trim($_POST['machine_id'] ?? '');
+$meta = json_decode($_POST['meta'] ?? '', true);
+$files = $_FILES['screenshots'] ?? null;
+
+if ($machineExtId === '') { http_response_code(400); echo json_encode(['error' => 'Missing machine_id']); exit; }
+if (!is_array($meta) || !$files || !is_array($files['tmp_name'] ?? null)) {
+    // Also what PHP leaves behind when the body exceeded post_max_size
+    http_response_code(400);
+    echo json_encode(['error' => 'Missing screenshots or meta']);
+    exit;
+}
+
+$pdo = db();
+
+$machineStmt = $pdo->prepare('SELECT id, user_id FROM machines WHERE machine_id = ?');
+$machineStmt->execute([$machineExtId]);
+$machine = $machineStmt->fetch();
+if (!$machine || !$machine['user_id']) { http_response_code(409); echo json_encode(['error' => 'Machine not registered']); exit; }
+$machineId = (int)$machine['id'];
+$userId = (int)$machine['user_id'];
+
+if (!is_dir(STORAGE_PATH)) { @mkdir(STORAGE_PATH, 0775, true); }
+
+$shotSeen = $pdo->prepare('SELECT 1 FROM screenshots WHERE client_uid = ?');
+$shotIns = $pdo->prepare('INSERT INTO screenshots (user_id, machine_id, client_uid, taken_at, filename, filesize_kb) VALUES (?, ?, ?, ?, ?, ?) ON DUPLICATE KEY UPDATE id = id');
+$stored = [];
+foreach ($meta as $i => $m) {
+    $uid = client_uid($m['client_uid'] ?? null);
+    if ($uid !== null) {
+        $shotSeen->execute([$uid]);
+        if ($shotSeen->fetchColumn()) { $stored[] = $i; continue; }
+    }
+    if (!isset($files['tmp_name'][$i]) || ($files['error'][$i] ?? UPLOAD_ERR_NO_FILE) !== UPLOAD_ERR_OK) {
+        error_log('screenshots: part ' . $i . ' not received (error ' . ($files['error'][$i] ?? 'missing') . ')');
+        continue;
+    }
+    $fname = basename($m['filename'] ?? ($files['name'][$i] ?? (uniqid('sc_', true) . '.jpg')));
+    $dt = $m['taken_at'] ?? date('Y-m-d H:i:s');
+    $path = STORAGE_PATH . DIRECTORY_SEPARATOR . $fname;
+    // PHP has already spooled the part to a temp file; moving it never loads the image into memory
+    if (!move_uploaded_file($files['tmp_name'][$i], $path)) {
+        error_log('screenshots: could not store ' . $fname);
+        continue;
+    }
+    try {
+        $shotIns->execute([$userId, $machineId, $uid, $dt, $fname, (int)ceil(filesize($path) / 1024)]);
+        $stored[] = $i;
+    } catch (Throwable $e) {
+        error_log('screenshots: could not record ' . $fname . ': ' . $e->getMessage());
+    }
+}
+
+$pdo->prepare('UPDATE machines SET last_seen = NOW() WHERE id = ?')->execute([$machineId]);
+
+echo json_encode(['status' => 'ok', 'stored' => $stored]);
@@ -33,6 +33,176 @@ function db(): PDO {
 	return $pdo;
 }
 
+// Largest agent request body accepted after decompression
+define('MAX_REQUEST_BODY_BYTES', 64 * 1024 * 1024);
+
+function supported_request_encodings(): array {
+	$encodings = ['gzip'];
+	if (function_exists('zstd_uncompress')) {
+		$encodings[] = 'zstd';
+	}
+	return $encodings;
+}
+
+// Raw request body, decoded according to Content-Encoding (agents compress large bodies).
+// Advertises the accepted encodings in an Accept-Encoding response header so agents can negotiate.
+function read_request_body(): string {
+	header('Accept-Encoding: ' . implode(', ', supported_request_encodings()));
+	$raw = file_get_contents('php://input');
+	$encoding = strtolower(trim($_SERVER['HTTP_CONTENT_ENCODING'] ?? ''));
+	if ($encoding === '' || $encoding === 'identity' || $raw === '') {
+		return $raw;
+	}
+	if ($encoding === 'gzip' || $encoding === 'x-gzip') {
+		$body = @gzdecode($raw, MAX_REQUEST_BODY_BYTES);
+	} elseif ($encoding === 'zstd' && function_exists('zstd_uncompress')) {
+		$body = @zstd_uncompress($raw);
+		if ($body !== false && strlen($body) > MAX_REQUEST_BODY_BYTES) {
+			$body = false;
+		}
+	} else {
+		http_response_code(415);
+		echo json_encode(['error' => 'Unsupported Content-Encoding', 'accept_encoding' => supported_request_encodings()]);
+		exit;
+	}
+	if ($body === false) {
+		http_response_code(400);
+		echo json_encode(['error' => 'Invalid compressed body']);
+		exit;
+	}
+	return $body;
+}
+
+// Columnar agent bodies (agent/columnar.py): a JSON envelope plus row lists sent as fixed-width
+// little-endian columns under a schema header. Decoded into the same array json_decode would give.
+define('COLUMNAR_CONTENT_TYPE', 'application/x-tracker-columnar');
+
+function decode_columnar_body(string $raw): ?array {
+	$len = strlen($raw);
+	if ($len < 10 || substr($raw, 0, 4) !== 'TRKC' || ord($raw[4]) !== 1) {
+		return null;
+	}
+	$envLen = unpack('V', $raw, 5)[1];
+	$pos = 9;
+	if ($pos + $envLen + 1 > $len) {
+		return null;
+	}
+	$payload = json_decode(substr($raw, $pos, $envLen), true);
+	if (!is_array($payload)) {
+		return null;
+	}
+	$pos += $envLen;
+	$readName = function () use ($raw, $len, &$pos): ?string {
+		if ($pos >= $len) { return null; }
+		$n = ord($raw[$pos]);
+		if ($pos + 1 + $n > $len) { return null; }
+		$name = substr($raw, $pos + 1, $n);
+		$pos += 1 + $n;
+		return $name;
+	};
+	$widths = ['I' => 4, 'Q' => 8, 'T' => 8, 'U' => 16];
+	$tableCount = ord($raw[$pos++]);
+	for ($t = 0; $t < $tableCount; $t++) {
+		$table = $readName();
+		if ($table === null || $pos + 5 > $len) { return null; }
+		[$rows, $columnCount] = array_values(unpack('Vrows/Ccolumns', $raw, $pos));
+		$pos += 5;
+		$columns = [];
+		for ($c = 0; $c < $columnCount; $c++) {
+			$column = $readName();
+			if ($column === null || $pos >= $len || !isset($widths[$raw[$pos]])) { return null; }
+			$columns[$column] = $raw[$pos++];
+		}
+		$values = [];
+		$epochs = [];
+		foreach ($columns as $column => $type) {
+			$size = $rows * $widths[$type];
+			if ($pos + $size > $len) { return null; }
+			if ($rows === 0) {
+				$values[$column] = [];
+			} elseif ($type === 'U') {
+				$values[$column] = [];
+				foreach (str_split(bin2hex(substr($raw, $pos, $size)), 32) as $hex) {
+					$values[$column][] = $hex === str_repeat('0', 32) ? null : vsprintf('%s-%s-%s-%s-%s', [substr($hex, 0, 8), substr($hex, 8, 4), substr($hex, 12, 4), substr($hex, 16, 4), substr($hex, 20)]);
+				}
+			} else {
+				$numbers = array_values(unpack(($type === 'I' ? 'V' : 'P') . $rows, $raw, $pos));
+				$values[$column] = $type === 'T' ? array_map(fn($v) => gmdate('Y-m-d H:i:s', $v), $numbers) : $numbers;
+				if ($type === 'T') { $epochs[$column] = $numbers; }
+			}
+			$pos += $size;
+		}
+		$list = [];
+		for ($i = 0; $i < $rows; $i++) {
+			$row = [];
+			foreach ($columns as $column => $type) {
+				$row[$column] = $values[$column][$i];
+			}
+			if (isset($epochs['start_time'], $epochs['end_time'])) {
+				$row['duration_seconds'] = max(0, $epochs['end_time'][$i] - $epochs['start_time'][$i]);
+			}
+			$list[] = $row;
+		}
+		$payload[$table] = $list;
+	}
+	return $payload;
+}
+
+// Client-generated id of an agent row or batch (a UUID), or null when absent or malformed.
+// Ingest keys on these so a resent row is recognised instead of inserted twice.
+function client_uid($value): ?string {
+	if (!is_string($value)) {
+		return null;
+	}
+	$value = strtolower(trim($value));
+	return preg_match('/^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/', $value) ? $value : null;
+}
+
+// Whether an active application block (global, for the user, or for the machine) covers the
+// application, its category or its process name. application.php and ingest.php both report this
+// back so the agent can alert on a blocked application however the session reached the server.
+function application_blocked(PDO $pdo, int $applicationId, string $processName, int $userId, int $machineId): bool {
+	$stmt = $pdo->prepare('
+		SELECT id FROM application_blocks
+		WHERE is_active = 1
+		AND (
+			application_id = ?
+			OR category_id IN (SELECT category_id FROM applications WHERE id = ?)
+			OR process_name = ?
+		)
+		AND (
+			block_type = "global"
+			OR (block_type = "user" AND user_id = ?)
+			OR (block_type = "machine" AND machine_id = ?)
+		)
+		LIMIT 1
+	');
+	$stmt->execute([$applicationId, $applicationId, $processName, $userId, $machineId]);
+	return (bool)$stmt->fetch();
+}
+
+// Bulk upload window as entered by an admin ("18:00-08:00", several separated by commas), normalised
+// to HH:MM-HH:MM[,...]; '' for any time, null when malformed. The agent parses the same format.
+function upload_window(string $value): ?string {
+	$windows = [];
+	foreach (explode(',', $value) as $part) {
+		$part = trim($part);
+		if ($part === '') {
+			continue;
+		}
+		if (!preg_match('/^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$/', $part, $m)) {
+			return null;
+		}
+		foreach ([[$m[1], $m[2]], [$m[3], $m[4]]] as [$h, $i]) {
+			if ((int)$i > 59 || (int)$h * 60 + (int)$i > 1440) {
+				return null;
+			}
+		}
+		$windows[] = sprintf('%02d:%02d-%02d:%02d', $m[1], $m[2], $m[3], $m[4]);
+	}
+	return implode(',', $windows);
+}
+
 function start_session(): void {
 	if (session_status() !== PHP_SESSION_ACTIVE) {
 		session_start();
@@ -92,7 +92,7 @@ def get_server_base():
 
 def download_agent_files(server_base):
     """Download all agent files from server"""
-    files_to_download = ['agent.py', 'config.py', 'monitoring.py', 'permission.py', 'browser_monitoring.py']
+    files_to_download = ['agent.py', 'config.py', 'monitoring.py', 'permission.py', 'browser_monitoring.py', 'application_monitoring.py', 'store.py', 'activity_writer.py', 'outbox.py', 'sync_queue.py', 'storage_governor.py', 'schema.py', 'compaction.py', 'screenshot_store.py', 'http_compression.py', 'http_client.py', 'sync_tuning.py', 'resilience.py', 'client_ids.py', 'sync_worker.py', 'upload_engine.py', 'partition.py', 'columnar.py', 'streaming.py', 'resumable_upload.py', 'sync_lanes.py', 'bandwidth.py', 'degradation.py']
     downloaded_files = {}
     
     print(f"\nDownloading agent files from server...")
@@ -26,6 +26,10 @@ CREATE TABLE IF NOT EXISTS `machines` (
   `email` VARCHAR(255) NULL,
   `upn` VARCHAR(255) NULL,
   `last_seen` TIMESTAMP NULL,
+  `settings_version` VARCHAR(32) NULL,
+  `upload_rate_kb_s` INT UNSIGNED NULL,
+  `upload_burst_kb` INT UNSIGNED NULL,
+  `bulk_upload_window` VARCHAR(64) NULL,
   `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   UNIQUE KEY `uniq_machine` (`machine_id`),
   INDEX `idx_email` (`email`),
@@ -33,13 +37,15 @@ CREATE TABLE IF NOT EXISTS `machines` (
   CONSTRAINT `fk_machines_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
--- Activity aggregates (1-minute windows)
+-- Activity aggregates (1-minute windows, or longer spans rolled up by an agent that was offline)
 CREATE TABLE IF NOT EXISTS `activity` (
   `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
   `user_id` INT NOT NULL,
   `machine_id` INT NULL,
+  `client_uid` CHAR(36) NULL,
   `start_time` DATETIME NOT NULL,
   `end_time` DATETIME NOT NULL,
+  `duration_seconds` INT NOT NULL DEFAULT 60,
   `productive_seconds` INT NOT NULL DEFAULT 0,
   `unproductive_seconds` INT NOT NULL DEFAULT 0,
   `idle_seconds` INT NOT NULL DEFAULT 0,
@@ -47,6 +53,7 @@ CREATE TABLE IF NOT EXISTS `activity` (
   `key_presses` INT NOT NULL DEFAULT 0,
   `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   INDEX `idx_user_time` (`user_id`, `start_time`),
+  UNIQUE KEY `uniq_activity_client_uid` (`client_uid`),
   CONSTRAINT `fk_activity_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE CASCADE,
   CONSTRAINT `fk_activity_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -56,11 +63,13 @@ CREATE TABLE IF NOT EXISTS `screenshots` (
   `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
   `user_id` INT NOT NULL,
   `machine_id` INT NULL,
+  `client_uid` CHAR(36) NULL,
   `taken_at` DATETIME NOT NULL,
   `filename` VARCHAR(255) NOT NULL,
   `filesize_kb` INT NOT NULL,
   `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   INDEX `idx_user_time` (`user_id`, `taken_at`),
+  UNIQUE KEY `uniq_screenshots_client_uid` (`client_uid`),
   CONSTRAINT `fk_screens_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE CASCADE,
   CONSTRAINT `fk_screens_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -262,6 +271,7 @@ CREATE TABLE IF NOT EXISTS `application_usage` (
   `user_id` INT NOT NULL,
   `machine_id` INT NULL,
   `application_id` BIGINT NULL,
+  `client_uid` CHAR(36) NULL,
   `application_name` VARCHAR(255) NOT NULL,
   `process_name` VARCHAR(191) NOT NULL,
   `window_title` VARCHAR(500) NULL,
@@ -274,6 +284,7 @@ CREATE TABLE IF NOT EXISTS `application_usage` (
   INDEX `idx_machine_time` (`machine_id`, `session_start`),
   INDEX `idx_application_time` (`application_id`, `session_start`),
   INDEX `idx_process_time` (`process_name`, `session_start`),
+  UNIQUE KEY `uniq_app_usage_client_uid` (`client_uid`),
   CONSTRAINT `fk_app_usage_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE CASCADE,
   CONSTRAINT `fk_app_usage_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE SET NULL,
   CONSTRAINT `fk_app_usage_application` FOREIGN KEY (`application_id`) REFERENCES `applications`(`id`) ON DELETE SET NULL
@@ -303,8 +314,45 @@ CREATE TABLE IF NOT EXISTS `activity_timeline` (
   CONSTRAINT `fk_timeline_application` FOREIGN KEY (`application_id`) REFERENCES `applications`(`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Data shed by agents to stay within their offline disk budget (reported on sync)
+CREATE TABLE IF NOT EXISTS `agent_evictions` (
+  `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
+  `user_id` INT NULL,
+  `machine_id` INT NOT NULL,
+  `stream` VARCHAR(50) NOT NULL,
+  `items` INT NOT NULL DEFAULT 0,
+  `bytes` BIGINT NOT NULL DEFAULT 0,
+  `reported_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX `idx_machine_time` (`machine_id`, `reported_at`),
+  CONSTRAINT `fk_evictions_user` FOREIGN KEY (`user_id`) REFERENCES `users`(`id`) ON DELETE SET NULL,
+  CONSTRAINT `fk_evictions_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Ingest batches already received, by the agent's client-generated batch id (resends are acknowledged, not re-inserted)
+CREATE TABLE IF NOT EXISTS `agent_batches` (
+  `batch_id` CHAR(36) NOT NULL PRIMARY KEY,
+  `machine_id` INT NOT NULL,
+  `received_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX `idx_received` (`received_at`),
+  CONSTRAINT `fk_batches_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Large screenshots arriving in parts through api/screenshot_parts.php, by the agent's client uid
+CREATE TABLE IF NOT EXISTS `screenshot_uploads` (
+  `client_uid` CHAR(36) NOT NULL PRIMARY KEY,
+  `machine_id` INT NOT NULL,
+  `filename` VARCHAR(255) NOT NULL,
+  `taken_at` DATETIME NOT NULL,
+  `total_bytes` INT UNSIGNED NOT NULL,
+  `received_bytes` INT UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX `idx_updated` (`updated_at`),
+  CONSTRAINT `fk_uploads_machine` FOREIGN KEY (`machine_id`) REFERENCES `machines`(`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('productive_hours_per_day_seconds', '28800');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('agent_sync_interval_seconds', '60');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('settings_revision', '1');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('parallel_sync_workers', '1');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('delete_screenshots_after_sync', '1');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('agent_install_path', '');
@@ -313,6 +361,9 @@ INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('screenshots_enabled', '1')
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('screenshot_interval_seconds', '300');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('website_monitoring_enabled', '1');
 INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('website_monitoring_interval_seconds', '1');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('upload_rate_kb_s', '0');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('upload_burst_kb', '0');
+INSERT IGNORE INTO `settings`(`key`,`value`) VALUES ('bulk_upload_window', '');
 
 -- Default website categories
 INSERT IGNORE INTO `website_categories`(`name`, `description`, `color`) VALUES
@@ -11,7 +11,7 @@ if ($user['role'] !== 'superadmin' && $user['role'] !== 'admin') {
 $pdo = db();
 
 // Load current setting
-$stmt = $pdo->prepare('SELECT `key`, `value` FROM settings WHERE `key` IN ("productive_hours_per_day_seconds","agent_sync_interval_seconds","parallel_sync_workers","delete_screenshots_after_sync","agent_install_path","device_monitoring_enabled","screenshots_enabled","screenshot_interval_seconds","website_monitoring_enabled","website_monitoring_interval_seconds","application_monitoring_enabled","application_monitoring_interval_seconds")');
+$stmt = $pdo->prepare('SELECT `key`, `value` FROM settings WHERE `key` IN ("productive_hours_per_day_seconds","agent_sync_interval_seconds","parallel_sync_workers","delete_screenshots_after_sync","agent_install_path","device_monitoring_enabled","screenshots_enabled","screenshot_interval_seconds","website_monitoring_enabled","website_monitoring_interval_seconds","application_monitoring_enabled","application_monitoring_interval_seconds","upload_rate_kb_s","upload_burst_kb","bulk_upload_window")');
 $stmt->execute();
 $kv = [];
 foreach ($stmt->fetchAll() as $r) { $kv[$r['key']] = $r['value']; }
@@ -28,8 +28,17 @@ $websiteMonitoring = (int)($kv['website_monitoring_enabled'] ?? 1);
 $websiteMonitoringInterval = (int)($kv['website_monitoring_interval_seconds'] ?? 1);
 $applicationMonitoring = (int)($kv['application_monitoring_enabled'] ?? 1);
 $applicationMonitoringInterval = (int)($kv['application_monitoring_interval_seconds'] ?? 2);
+$uploadRate = (int)($kv['upload_rate_kb_s'] ?? 0);
+$uploadBurst = (int)($kv['upload_burst_kb'] ?? 0);
+$bulkWindow = $kv['bulk_upload_window'] ?? '';
 
 if ($_SERVER['REQUEST_METHOD'] === 'POST') {
+    $bulkWindow = upload_window((string)($_POST['bulk_upload_window'] ?? ''));
+    if ($bulkWindow === null) {
+        header('Location: ' . BASE_URL . 'settings.php?error=window');
+        exit;
+    }
+
     $h = (float)($_POST['productive_hours'] ?? 8);
 	if ($h < 0) { $h = 0; }
 	$sec = (int)round($h * 3600);
@@ -74,16 +83,30 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST') {
     $applicationMonitoringInterval = (int)($_POST['application_monitoring_interval_seconds'] ?? 2);
     if ($applicationMonitoringInterval < 1) { $applicationMonitoringInterval = 1; }  // Minimum 1 second
     $up->execute(['application_monitoring_interval_seconds', (string)$applicationMonitoringInterval]);
+
+    $uploadRate = max(0, (int)($_POST['upload_rate_kb_s'] ?? 0));
+    $up->execute(['upload_rate_kb_s', (string)$uploadRate]);
+
+    $uploadBurst = max(0, (int)($_POST['upload_burst_kb'] ?? 0));
+    $up->execute(['upload_burst_kb', (string)$uploadBurst]);
+
+    $up->execute(['bulk_upload_window', $bulkWindow]);
+
+    // New revision: agents pick up the settings on their next sync, unchanged ones are not resent
+    $pdo->exec("INSERT INTO settings (`key`,`value`) VALUES ('settings_revision','1') ON DUPLICATE KEY UPDATE `value` = CAST(`value` AS UNSIGNED) + 1");
     
 	header('Location: ' . BASE_URL . 'settings.php?saved=1');
 	exit;
 }
 
-render_layout('Settings', function() use ($hours, $syncInterval, $parallelWorkers, $deleteScreenshots, $installPath, $deviceMonitoring, $screenshotsEnabled, $screenshotInterval, $websiteMonitoring, $websiteMonitoringInterval, $applicationMonitoring, $applicationMonitoringInterval) { ?>
+render_layout('Settings', function() use ($hours, $syncInterval, $parallelWorkers, $deleteScreenshots, $installPath, $deviceMonitoring, $screenshotsEnabled, $screenshotInterval, $websiteMonitoring, $websiteMonitoringInterval, $applicationMonitoring, $applicationMonitoringInterval, $uploadRate, $uploadBurst, $bulkWindow) { ?>
     <h5>Settings</h5>
     <?php if (!empty($_GET['saved'])): ?>
     <div class="alert alert-success">Saved.</div>
     <?php endif; ?>
+    <?php if (($_GET['error'] ?? '') === 'window'): ?>
+    <div class="alert alert-danger">Bulk upload window must look like 18:00-08:00 (several separated by commas). Nothing was saved.</div>
+    <?php endif; ?>
     <form method="post" class="mt-3" style="max-width:420px;">
         <label class="form-label">Productive hours per day</label>
         <div class="input-group">
@@ -181,6 +204,27 @@ render_layout('Settings', function() use ($hours, $syncInterval, $parallelWorker
             </div>
             <div class="form-text">Interval between application scans (minimum 1 second). 2 seconds = recommended for smooth tracking.</div>
         </div>
+        <div class="mt-3">
+            <label class="form-label">Upload bandwidth limit</label>
+            <div class="input-group">
+                <input type="number" class="form-control" name="upload_rate_kb_s" min="0" step="1" value="<?php echo htmlspecialchars((string)$uploadRate); ?>">
+                <span class="input-group-text">KB/s</span>
+            </div>
+            <div class="form-text">Average upload rate per agent, across all uploads. 0 = unlimited. Can be overridden per machine on the Agents page.</div>
+        </div>
+        <div class="mt-3">
+            <label class="form-label">Upload burst</label>
+            <div class="input-group">
+                <input type="number" class="form-control" name="upload_burst_kb" min="0" step="1" value="<?php echo htmlspecialchars((string)$uploadBurst); ?>">
+                <span class="input-group-text">KB</span>
+            </div>
+            <div class="form-text">Data an agent may send at full speed before the limit applies. 0 = one second at the limit.</div>
+        </div>
+        <div class="mt-3">
+            <label class="form-label">Screenshot upload window</label>
+            <input type="text" class="form-control" name="bulk_upload_window" value="<?php echo htmlspecialchars($bulkWindow); ?>" placeholder="Any time">
+            <div class="form-text">Agent local times during which screenshots upload, e.g. 18:00-08:00 or 12:00-13:00,18:00-08:00. Outside them screenshots wait on the agent; activity and events still sync. Leave empty for any time.</div>
+        </div>
         <button class="btn btn-primary mt-3" type="submit">Save</button>
     </form>
 <?php });